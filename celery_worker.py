@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
 """
 Celery worker script for ChatBoost Flow Engine.
+
+Usage:
+    python celery_worker.py            # prefork worker for flow_execution and maintenance
+    python celery_worker.py webhook    # gevent worker for the I/O-bound webhook_actions queue
 """
 
-import os
 import sys
+
+WEBHOOK_WORKER = __name__ == "__main__" and sys.argv[1:2] == ["webhook"]
+
+if WEBHOOK_WORKER:
+    # Must run before requests/redis (or anything using sockets) is imported
+    from gevent import monkey
+    monkey.patch_all()
+
+import os
 from pathlib import Path
 
 # Add the project root to Python path
@@ -16,13 +28,32 @@ os.environ.setdefault("CELERY_BROKER_URL", "redis://localhost:6379/0")
 os.environ.setdefault("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
 
 if __name__ == "__main__":
+    from config.celery_config import celery_settings
+    from src.flow_engine.worker_affinity import apply_worker_affinity
+
+    # Pin the worker before the pool starts so prefork children inherit it
+    apply_worker_affinity(celery_settings.FLOW_WORKER_CPUS, celery_settings.FLOW_WORKER_NUMA_NODE)
+
     from src.flow_engine.celery_app import celery_app
-    
-    # Start Celery worker
-    celery_app.worker_main([
-        "worker",
-        "--loglevel=info",
-        "--concurrency=4",
-        "--queues=flow_execution,webhook_actions,maintenance",
-        "--hostname=flow-engine@%h"
-    ])
+
+    if WEBHOOK_WORKER:
+        # Webhook calls spend their time waiting on the network: use green threads
+        celery_app.worker_main([
+            "worker",
+            "--loglevel=info",
+            "--pool=gevent",
+            "--concurrency=200",
+            "--prefetch-multiplier=1",
+            "--queues=webhook_actions",
+            "--hostname=flow-webhooks@%h"
+        ])
+    else:
+        # Start Celery worker
+        celery_app.worker_main([
+            "worker",
+            "--loglevel=info",
+            "--concurrency=4",
+            "--prefetch-multiplier=2",
+            "--queues=flow_execution,maintenance",
+            "--hostname=flow-engine@%h"
+        ])
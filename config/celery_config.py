@@ -2,48 +2,95 @@
 Celery configuration settings.
 """
 
-import os
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from config.settings import ENV_FILE
+
+
+class CelerySettings(BaseSettings):
+    """
+    Celery configuration settings.
+
+    Attribute names keep the CELERY_ prefix so the Celery app can load this
+    object with ``config_from_object(..., namespace="CELERY")``; they are
+    read from environment variables of the same name.
+    """
+
+    model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore", frozen=True)
 
-class CelerySettings:
-    """Celery configuration settings."""
-    
     # Broker settings
-    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
-    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
-    
+    CELERY_BROKER_URL: str = "redis://localhost:6379/0"
+    CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    CELERY_BROKER_TRANSPORT_OPTIONS: Dict[str, Any] = {"socket_keepalive": True}
+    CELERY_RESULT_BACKEND_TRANSPORT_OPTIONS: Dict[str, Any] = {"socket_keepalive": True, "retry_on_timeout": True}
+
     # Task settings
-    CELERY_TASK_SERIALIZER: str = "json"
-    CELERY_ACCEPT_CONTENT: list = ["json"]
-    CELERY_RESULT_SERIALIZER: str = "json"
-    
+    # msgpack payloads are smaller and faster to encode than JSON; JSON stays
+    # accepted so messages queued before the switch are still consumed.
+    # Task arguments must be msgpack-native (pass datetimes as ISO strings).
+    CELERY_TASK_SERIALIZER: str = "msgpack"
+    CELERY_ACCEPT_CONTENT: List[str] = ["msgpack", "json"]
+    CELERY_RESULT_SERIALIZER: str = "msgpack"
+
     # Timezone settings
     CELERY_TIMEZONE: str = "UTC"
     CELERY_ENABLE_UTC: bool = True
-    
+
     # Task execution settings
     CELERY_TASK_TRACK_STARTED: bool = True
-    CELERY_TASK_TIME_LIMIT: int = int(os.getenv("CELERY_TASK_TIME_LIMIT", "1800"))  # 30 minutes
-    CELERY_TASK_SOFT_TIME_LIMIT: int = int(os.getenv("CELERY_TASK_SOFT_TIME_LIMIT", "1500"))  # 25 minutes
-    
+    CELERY_TASK_TIME_LIMIT: int = 1800  # 30 minutes
+    CELERY_TASK_SOFT_TIME_LIMIT: int = 1500  # 25 minutes
+
     # Worker settings
-    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
+    # Flow tasks are I/O-bound (webhooks, Redis, DB); keep per-process reservation small
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 2
     CELERY_TASK_ACKS_LATE: bool = True
     CELERY_WORKER_DISABLE_RATE_LIMITS: bool = False
     CELERY_TASK_REJECT_ON_WORKER_LOST: bool = True
-    
+
+    # Task events cost extra Redis writes per task; only enable them
+    # (CELERY_EVENTS_ENABLED=1) when Flower or another monitor is attached
+    CELERY_WORKER_SEND_TASK_EVENTS: bool = Field(
+        False, validation_alias=AliasChoices("CELERY_EVENTS_ENABLED", "CELERY_WORKER_SEND_TASK_EVENTS")
+    )
+    CELERY_TASK_SEND_SENT_EVENT: bool = Field(
+        False, validation_alias=AliasChoices("CELERY_EVENTS_ENABLED", "CELERY_TASK_SEND_SENT_EVENT")
+    )
+
     # Retry settings
-    CELERY_TASK_DEFAULT_RETRY_DELAY: int = int(os.getenv("CELERY_TASK_DEFAULT_RETRY_DELAY", "60"))  # 1 minute
-    CELERY_TASK_MAX_RETRIES: int = int(os.getenv("CELERY_TASK_MAX_RETRIES", "3"))
-    
+    CELERY_TASK_DEFAULT_RETRY_DELAY: int = 60  # 1 minute
+    CELERY_TASK_MAX_RETRIES: int = 3
+
+    # Compression (zstd codec is registered by kombu when zstandard is installed)
+    CELERY_TASK_COMPRESSION: str = "zstd"
+    CELERY_RESULT_COMPRESSION: str = "zstd"
+
     # Result settings
-    CELERY_RESULT_EXPIRES: int = int(os.getenv("CELERY_RESULT_EXPIRES", "3600"))  # 1 hour
+    CELERY_RESULT_EXPIRES: int = 600  # 10 minutes
     CELERY_RESULT_PERSISTENT: bool = True
-    
+
     # Flow execution settings
-    FLOW_EXECUTION_TIMEOUT: int = int(os.getenv("FLOW_EXECUTION_TIMEOUT", "1800"))  # 30 minutes
-    FLOW_CLEANUP_INTERVAL: int = int(os.getenv("FLOW_CLEANUP_INTERVAL", "3600"))  # 1 hour
+    FLOW_EXECUTION_TIMEOUT: int = 1800  # 30 minutes
+    FLOW_CLEANUP_INTERVAL: int = 3600  # 1 hour
+
+    # Worker placement (e.g. FLOW_WORKER_CPUS="0-3", FLOW_WORKER_NUMA_NODE=0)
+    FLOW_WORKER_CPUS: Optional[str] = None
+    FLOW_WORKER_NUMA_NODE: Optional[int] = None
+
+
+@lru_cache(maxsize=1)
+def get_celery_settings() -> CelerySettings:
+    """
+    Get the Celery settings.
+
+    Returns:
+        CelerySettings: Parsed once and cached for the process lifetime
+    """
+    return CelerySettings()
 
 
-celery_settings = CelerySettings()
+celery_settings = get_celery_settings()
@@ -1,43 +1,74 @@
-from dotenv import load_dotenv
-load_dotenv()
-import os
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, List, Optional
 
-class Settings:
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+
+# The repository's .env, found wherever the app, Celery or a script is started from
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+
+class Settings(BaseSettings):
     """Application settings."""
-    
+
+    model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore", frozen=True)
+
     # API Settings
     API_TITLE: str = "ChatBoost Backend API"
     API_VERSION: str = "1.0.0"
     API_DESCRIPTION: str = "A comprehensive backend system with authentication and WhatsApp bot builder"
-    
+
     # Database Settings
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./chatboost.db")
-    SYNC_DATABASE_URL: str = os.getenv("SYNC_DATABASE_URL", "sqlite:///./chatboost.db")
-    
+    DATABASE_URL: str = "sqlite+aiosqlite:///./chatboost.db"
+    SYNC_DATABASE_URL: str = "sqlite:///./chatboost.db"
+
     # Security Settings
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
+    SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-    
-    # CORS Settings
-    CORS_ORIGINS: list = ["*"]  # Configure this properly for production
-    
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # CORS Settings (comma-separated in the environment)
+    CORS_ORIGINS: Annotated[List[str], NoDecode] = ["*"]  # Configure this properly for production
+
     # Environment
-    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
-    DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
-    
+    ENVIRONMENT: str = "development"
+    DEBUG: bool = True
+
     # WhatsApp API Settings
-    WHATSAPP_ACCESS_TOKEN: Optional[str] = os.getenv("WHATSAPP_ACCESS_TOKEN")
-    WHATSAPP_PHONE_NUMBER_ID: Optional[str] = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
-    WHATSAPP_BUSINESS_ACCOUNT_ID: Optional[str] = os.getenv("WHATSAPP_BUSINESS_ACCOUNT_ID")
-    WHATSAPP_WEBHOOK_VERIFY_TOKEN: Optional[str] = os.getenv("WHATSAPP_WEBHOOK_VERIFY_TOKEN")
-    WHATSAPP_API_VERSION: str = os.getenv("WHATSAPP_API_VERSION", "v22.0")
-    
+    WHATSAPP_ACCESS_TOKEN: Optional[str] = None
+    WHATSAPP_PHONE_NUMBER_ID: Optional[str] = None
+    WHATSAPP_BUSINESS_ACCOUNT_ID: Optional[str] = None
+    WHATSAPP_WEBHOOK_VERIFY_TOKEN: Optional[str] = None
+    WHATSAPP_API_VERSION: str = "v22.0"
+
     # Flow Engine Settings
-    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
-    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
-    FLOW_EXECUTION_TIMEOUT: int = int(os.getenv("FLOW_EXECUTION_TIMEOUT", "1800"))
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CELERY_BROKER_URL: str = "redis://localhost:6379/0"
+    CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    FLOW_EXECUTION_TIMEOUT: int = 1800
+
+    @field_validator("CORS_ORIGINS", mode="before")
+    @classmethod
+    def split_cors_origins(cls, value):
+        """Accept a comma-separated list of origins from the environment."""
+        if isinstance(value, str):
+            return [origin.strip() for origin in value.split(",") if origin.strip()]
+        return value
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings.
+
+    The environment and .env file are parsed and validated once; later calls
+    return the same frozen instance.
+
+    Returns:
+        Settings: Application settings
+    """
+    return Settings()
+
 
-settings = Settings()
+settings = get_settings()
@@ -6,94 +6,118 @@ This script demonstrates how to use the Analytics & Reporting API endpoints
 to fetch insights about bot performance, message delivery rates, and user engagement.
 """
 
-import requests
-import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+
+
+@lru_cache(maxsize=32)
+def _window(days: int, minute_bucket: int) -> Tuple[str, str]:
+    """Return (start, end) ISO timestamps for the last `days` days, truncated to the minute."""
+    now = minute_bucket * 60
+    end_date = datetime.fromtimestamp(now, tz=timezone.utc)
+    start_date = datetime.fromtimestamp(now - days * 86400, tz=timezone.utc)
+    return start_date.isoformat(), end_date.isoformat()
 
 
 class AnalyticsDemo:
     def __init__(self, base_url: str = "http://localhost:8000"):
+        # Imported here so `--help` and argument errors don't pay for httpx
+        import httpx
+        
         self.base_url = base_url
-        self.session = requests.Session()
-    
-    def make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        # One pooled client: independent requests share a kept-alive connection
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16)
+        )
+    
+    async def make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request and return JSON response."""
+        import httpx
+        
         url = f"{self.base_url}{endpoint}"
         try:
-            response = self.session.request(method, url, **kwargs)
+            response = await self.client.request(method, endpoint, **kwargs)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError: the body was not JSON (e.g. a proxy error page)
             print(f"Error making request to {url}: {e}")
             return {"error": str(e)}
     
-    def get_analytics_overview(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
+    async def aclose(self):
+        """Close the underlying HTTP client."""
+        await self.client.aclose()
+    
+    async def get_analytics_overview(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
         """Get analytics overview for specified period."""
         params = {"period": period}
         if bot_id:
             params["bot_id"] = bot_id
         
         print(f"\n📊 Getting Analytics Overview ({period})...")
-        return self.make_request("GET", "/analytics/overview", params=params)
+        return await self.make_request("GET", "/analytics/overview", params=params)
     
-    def get_analytics_trends(self, days: int = 7, bot_id: Optional[int] = None) -> Dict[str, Any]:
+    async def get_analytics_trends(self, days: int = 7, bot_id: Optional[int] = None) -> Dict[str, Any]:
         """Get analytics trends for specified number of days."""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_date, end_date = _window(days, int(time.time() // 60))
         
         params = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat()
+            "start_date": start_date,
+            "end_date": end_date
         }
         if bot_id:
             params["bot_id"] = bot_id
         
         print(f"\n📈 Getting Analytics Trends ({days} days)...")
-        return self.make_request("GET", "/analytics/trends", params=params)
+        return await self.make_request("GET", "/analytics/trends", params=params)
     
-    def get_bot_performance(self, bot_id: int, period: str = "30days") -> Dict[str, Any]:
+    async def get_bot_performance(self, bot_id: int, period: str = "30days") -> Dict[str, Any]:
         """Get performance metrics for a specific bot."""
         params = {"period": period}
         
         print(f"\n🤖 Getting Bot Performance (Bot {bot_id}, {period})...")
-        return self.make_request("GET", f"/analytics/bots/{bot_id}/performance", params=params)
+        return await self.make_request("GET", f"/analytics/bots/{bot_id}/performance", params=params)
     
-    def get_delivery_rates(self, days: int = 7, bot_id: Optional[int] = None, granularity: str = "daily") -> Dict[str, Any]:
+    async def get_delivery_rates(self, days: int = 7, bot_id: Optional[int] = None, granularity: str = "daily") -> Dict[str, Any]:
         """Get delivery rate statistics."""
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_date, end_date = _window(days, int(time.time() // 60))
         
         params = {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
+            "start_date": start_date,
+            "end_date": end_date,
             "granularity": granularity
         }
         if bot_id:
             params["bot_id"] = bot_id
         
         print(f"\n📬 Getting Delivery Rates ({granularity}, {days} days)...")
-        return self.make_request("GET", "/analytics/delivery-rates", params=params)
+        return await self.make_request("GET", "/analytics/delivery-rates", params=params)
     
-    def get_active_contacts_stats(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
+    async def get_active_contacts_stats(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
         """Get active contacts statistics."""
         params = {"period": period}
         if bot_id:
             params["bot_id"] = bot_id
         
         print(f"\n👥 Getting Active Contacts Stats ({period})...")
-        return self.make_request("GET", "/analytics/active-contacts", params=params)
+        return await self.make_request("GET", "/analytics/active-contacts", params=params)
     
-    def get_message_distribution(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
+    async def get_message_distribution(self, period: str = "7days", bot_id: Optional[int] = None) -> Dict[str, Any]:
         """Get message type distribution."""
         params = {"period": period}
         if bot_id:
             params["bot_id"] = bot_id
         
         print(f"\n📱 Getting Message Distribution ({period})...")
-        return self.make_request("GET", "/analytics/message-distribution", params=params)
+        return await self.make_request("GET", "/analytics/message-distribution", params=params)
     
-    def trigger_manual_aggregation(self, date: Optional[str] = None, bot_id: Optional[int] = None) -> Dict[str, Any]:
+    async def trigger_manual_aggregation(self, date: Optional[str] = None, bot_id: Optional[int] = None) -> Dict[str, Any]:
         """Manually trigger statistics aggregation."""
         data = {}
         if date:
@@ -102,63 +126,59 @@ class AnalyticsDemo:
             data["bot_id"] = bot_id
         
         print(f"\n⚡ Triggering Manual Aggregation...")
-        return self.make_request("POST", "/analytics/aggregate-now", json=data)
+        return await self.make_request("POST", "/analytics/aggregate-now", json=data)
     
-    def get_analytics_health(self) -> Dict[str, Any]:
+    async def get_analytics_health(self) -> Dict[str, Any]:
         """Get analytics system health check."""
         print(f"\n🏥 Getting Analytics Health Check...")
-        return self.make_request("GET", "/analytics/health")
+        return await self.make_request("GET", "/analytics/health")
     
     def print_response(self, response: Dict[str, Any], title: str = "Response"):
         """Pretty print API response."""
-        print(f"\n{'='*50}")
-        print(f"{title}")
-        print(f"{'='*50}")
-        print(json.dumps(response, indent=2, default=str))
+        import orjson
+        
+        separator = b"=" * 50
+        body = orjson.dumps(response, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
+        # Flush pending print() output so the single binary write stays in order
+        sys.stdout.flush()
+        sys.stdout.buffer.write(b"\n" + separator + b"\n" + title.encode() + b"\n" + separator + b"\n" + body + b"\n")
+        sys.stdout.buffer.flush()
     
-    def run_comprehensive_demo(self, bot_id: Optional[int] = None):
+    async def run_comprehensive_demo(self, bot_id: Optional[int] = None):
         """Run comprehensive analytics demo."""
         print("🚀 Starting Analytics Demo")
         print("="*60)
         
         # 1. Health Check
-        health = self.get_analytics_health()
+        health = await self.get_analytics_health()
         self.print_response(health, "Analytics Health Check")
         
-        # 2. Overview Stats
-        overview = self.get_analytics_overview("7days", bot_id)
-        self.print_response(overview, "Analytics Overview (7 days)")
-        
-        # 3. Trends Analysis
-        trends = self.get_analytics_trends(7, bot_id)
-        self.print_response(trends, "Analytics Trends (7 days)")
-        
-        # 4. Bot Performance (if bot_id provided)
+        # 2-7. The remaining reports are independent, so fetch them concurrently
+        reports = [
+            (self.get_analytics_overview("7days", bot_id), "Analytics Overview (7 days)"),
+            (self.get_analytics_trends(7, bot_id), "Analytics Trends (7 days)"),
+        ]
         if bot_id:
-            performance = self.get_bot_performance(bot_id, "30days")
-            self.print_response(performance, f"Bot {bot_id} Performance (30 days)")
+            reports.append((self.get_bot_performance(bot_id, "30days"), f"Bot {bot_id} Performance (30 days)"))
+        reports.extend([
+            (self.get_delivery_rates(7, bot_id, "daily"), "Delivery Rates (Daily)"),
+            (self.get_active_contacts_stats("7days", bot_id), "Active Contacts Stats (7 days)"),
+            (self.get_message_distribution("7days", bot_id), "Message Distribution (7 days)"),
+        ])
         
-        # 5. Delivery Rates
-        delivery_rates = self.get_delivery_rates(7, bot_id, "daily")
-        self.print_response(delivery_rates, "Delivery Rates (Daily)")
-        
-        # 6. Active Contacts
-        active_contacts = self.get_active_contacts_stats("7days", bot_id)
-        self.print_response(active_contacts, "Active Contacts Stats (7 days)")
-        
-        # 7. Message Distribution
-        message_dist = self.get_message_distribution("7days", bot_id)
-        self.print_response(message_dist, "Message Distribution (7 days)")
+        responses = await asyncio.gather(*(request for request, _ in reports))
+        for response, (_, title) in zip(responses, reports):
+            self.print_response(response, title)
         
         print("\n✅ Analytics Demo Complete!")
     
-    def run_quick_demo(self, bot_id: Optional[int] = None):
+    async def run_quick_demo(self, bot_id: Optional[int] = None):
         """Run quick analytics demo with key metrics."""
         print("⚡ Quick Analytics Demo")
         print("="*40)
         
         # Get overview
-        overview = self.get_analytics_overview("today", bot_id)
+        overview = await self.get_analytics_overview("today", bot_id)
         if "error" not in overview:
             print(f"\n📊 Today's Overview:")
             print(f"   Total Messages: {overview.get('total_messages', 0)}")
@@ -174,7 +194,7 @@ class AnalyticsDemo:
                     print(f"   {key.replace('_', ' ').title()}: {value}%")
         
         # Get delivery rates
-        delivery = self.get_delivery_rates(1, bot_id)
+        delivery = await self.get_delivery_rates(1, bot_id)
         if "error" not in delivery:
             print(f"\n📬 Delivery Summary:")
             print(f"   Average Rate: {delivery.get('average_delivery_rate', 0)}%")
@@ -184,6 +204,25 @@ class AnalyticsDemo:
         print("\n✅ Quick Demo Complete!")
 
 
+async def run_demo(args):
+    """Run the demo selected by the command line arguments."""
+    demo = AnalyticsDemo(args.url)
+    
+    try:
+        if args.aggregate:
+            # Trigger manual aggregation
+            result = await demo.trigger_manual_aggregation(bot_id=args.bot_id)
+            demo.print_response(result, "Manual Aggregation Result")
+        elif args.quick:
+            # Run quick demo
+            await demo.run_quick_demo(args.bot_id)
+        else:
+            # Run comprehensive demo
+            await demo.run_comprehensive_demo(args.bot_id)
+    finally:
+        await demo.aclose()
+
+
 def main():
     """Main demo function."""
     import argparse
@@ -196,18 +235,7 @@ def main():
     
     args = parser.parse_args()
     
-    demo = AnalyticsDemo(args.url)
-    
-    if args.aggregate:
-        # Trigger manual aggregation
-        result = demo.trigger_manual_aggregation(bot_id=args.bot_id)
-        demo.print_response(result, "Manual Aggregation Result")
-    elif args.quick:
-        # Run quick demo
-        demo.run_quick_demo(args.bot_id)
-    else:
-        # Run comprehensive demo
-        demo.run_comprehensive_demo(args.bot_id)
+    asyncio.run(run_demo(args))
 
 
 if __name__ == "__main__":
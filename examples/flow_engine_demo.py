@@ -3,71 +3,98 @@
 Example script demonstrating Flow Engine usage with ChatBoost backend.
 """
 
-import requests
+import asyncio
+import copy
+import httpx
 import json
-import time
-from typing import Dict, Any
+import redis
+import redis.asyncio as aioredis
+from typing import Dict, Any, Tuple
 
 # Configuration
 BASE_URL = "http://localhost:8000"
+REDIS_URL = "redis://localhost:6379/0"
 TEST_PHONE = "1234567890"
 BOT_ID = 1
 
 
-def create_test_flow() -> Dict[str, Any]:
-    """Create a test flow for demonstration."""
-    flow_data = {
-        "name": "Welcome Flow",
-        "bot_id": BOT_ID,
-        "structure": [
-            {
-                "type": "send_message",
-                "config": {
-                    "message_type": "text",
-                    "content": {"text": "Hello! Welcome to our bot. Please respond with 'yes' or 'no'."},
-                    "next": 1
-                }
-            },
-            {
-                "type": "wait",
-                "config": {
-                    "duration": 30,
-                    "unit": "seconds",
-                    "next": 2
-                }
-            },
-            {
-                "type": "condition",
-                "config": {
-                    "variable": "state.user_response",
-                    "operator": "==",
-                    "value": "yes",
-                    "true_path": 3,
-                    "false_path": 4
-                }
-            },
-            {
-                "type": "send_message",
-                "config": {
-                    "message_type": "text",
-                    "content": {"text": "Great! You said yes. Thank you for your response!"},
-                    "next": None
-                }
-            },
-            {
-                "type": "send_message",
-                "config": {
-                    "message_type": "text",
-                    "content": {"text": "You said no. That's okay too! Have a great day!"},
-                    "next": None
-                }
+# Test flow definition, built once at import; treat as read-only
+_FLOW_TEMPLATE: Dict[str, Any] = {
+    "name": "Welcome Flow",
+    "bot_id": BOT_ID,
+    "structure": [
+        {
+            "type": "send_message",
+            "config": {
+                "message_type": "text",
+                "content": {"text": "Hello! Welcome to our bot. Please respond with 'yes' or 'no'."},
+                "next": 1
             }
-        ]
-    }
-    return flow_data
+        },
+        {
+            "type": "wait",
+            "config": {
+                "duration": 30,
+                "unit": "seconds",
+                "next": 2
+            }
+        },
+        {
+            "type": "condition",
+            "config": {
+                "variable": "state.user_response",
+                "operator": "==",
+                "value": "yes",
+                "true_path": 3,
+                "false_path": 4
+            }
+        },
+        {
+            "type": "send_message",
+            "config": {
+                "message_type": "text",
+                "content": {"text": "Great! You said yes. Thank you for your response!"},
+                "next": None
+            }
+        },
+        {
+            "type": "send_message",
+            "config": {
+                "message_type": "text",
+                "content": {"text": "You said no. That's okay too! Have a great day!"},
+                "next": None
+            }
+        }
+    ]
+}
 
 
-def create_contact(phone_number: str) -> Dict[str, Any]:
+def create_test_flow(mutate: bool = False) -> Dict[str, Any]:
+    """
+    Create a test flow for demonstration.
+
+    Returns the shared template unless the caller intends to modify it,
+    in which case a private deep copy is returned.
+    """
+    return copy.deepcopy(_FLOW_TEMPLATE) if mutate else _FLOW_TEMPLATE
+
+
+def create_client() -> httpx.AsyncClient:
+    """Create the HTTP client shared by every demo request."""
+    # Keep-alive pool reused by all calls; connection failures are retried
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=4)
+    )
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        transport=transport,
+        headers={"Connection": "keep-alive"}
+    )
+
+
+async def create_contact(client: httpx.AsyncClient, phone_number: str) -> Dict[str, Any]:
     """Create a contact."""
     contact_data = {
         "phone_number": phone_number,
@@ -76,7 +103,7 @@ def create_contact(phone_number: str) -> Dict[str, Any]:
         "metadata": {"source": "demo"}
     }
     
-    response = requests.post(f"{BASE_URL}/flows/contacts/", json=contact_data)
+    response = await client.post("/flows/contacts/", json=contact_data)
     if response.status_code == 201:
         return response.json()
     else:
@@ -84,9 +111,9 @@ def create_contact(phone_number: str) -> Dict[str, Any]:
         return {}
 
 
-def create_flow(flow_data: Dict[str, Any]) -> Dict[str, Any]:
+async def create_flow(client: httpx.AsyncClient, flow_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a flow."""
-    response = requests.post(f"{BASE_URL}/bots/flows/", json=flow_data)
+    response = await client.post("/bots/flows/", json=flow_data)
     if response.status_code == 201:
         return response.json()
     else:
@@ -94,7 +121,7 @@ def create_flow(flow_data: Dict[str, Any]) -> Dict[str, Any]:
         return {}
 
 
-def start_flow_execution(flow_id: int, contact_phone: str) -> Dict[str, Any]:
+async def start_flow_execution(client: httpx.AsyncClient, flow_id: int, contact_phone: str) -> Dict[str, Any]:
     """Start a flow execution."""
     execution_data = {
         "flow_id": flow_id,
@@ -103,7 +130,7 @@ def start_flow_execution(flow_id: int, contact_phone: str) -> Dict[str, Any]:
         "initial_state": {"demo_mode": True}
     }
     
-    response = requests.post(f"{BASE_URL}/flows/execute", json=execution_data)
+    response = await client.post("/flows/execute", json=execution_data)
     if response.status_code == 201:
         return response.json()
     else:
@@ -111,7 +138,7 @@ def start_flow_execution(flow_id: int, contact_phone: str) -> Dict[str, Any]:
         return {}
 
 
-def send_user_input(execution_id: int, message: str) -> Dict[str, Any]:
+async def send_user_input(client: httpx.AsyncClient, execution_id: int, message: str) -> Dict[str, Any]:
     """Send user input to a flow execution."""
     input_data = {
         "execution_id": execution_id,
@@ -119,7 +146,7 @@ def send_user_input(execution_id: int, message: str) -> Dict[str, Any]:
         "message_type": "text"
     }
     
-    response = requests.post(f"{BASE_URL}/flows/executions/{execution_id}/input", json=input_data)
+    response = await client.post(f"/flows/executions/{execution_id}/input", json=input_data)
     if response.status_code == 200:
         return response.json()
     else:
@@ -127,9 +154,34 @@ def send_user_input(execution_id: int, message: str) -> Dict[str, Any]:
         return {}
 
 
-def get_execution_status(execution_id: int) -> Dict[str, Any]:
+async def execute_flow_with_input(
+    client: httpx.AsyncClient,
+    flow_id: int,
+    contact_phone: str,
+    message: str,
+    timeout_ms: int = 3000
+) -> Dict[str, Any]:
+    """Start a flow, send user input and wait for the result in a single request."""
+    execution_data = {
+        "flow_id": flow_id,
+        "contact_phone": contact_phone,
+        "bot_id": BOT_ID,
+        "initial_state": {"demo_mode": True},
+        "blocking_input": {"message": message, "type": "text"},
+        "timeout_ms": timeout_ms
+    }
+    
+    response = await client.post("/flows/execute-sync", json=execution_data)
+    if response.status_code == 200:
+        return response.json()
+    else:
+        print(f"Error executing flow synchronously: {response.text}")
+        return {}
+
+
+async def get_execution_status(client: httpx.AsyncClient, execution_id: int) -> Dict[str, Any]:
     """Get execution status."""
-    response = requests.get(f"{BASE_URL}/flows/executions/{execution_id}")
+    response = await client.get(f"/flows/executions/{execution_id}")
     if response.status_code == 200:
         return response.json()
     else:
@@ -137,9 +189,63 @@ def get_execution_status(execution_id: int) -> Dict[str, Any]:
         return {}
 
 
-def get_execution_logs(execution_id: int) -> list:
+async def poll_for_state(
+    client: httpx.AsyncClient,
+    execution_id: int,
+    targets: Tuple[str, ...],
+    max_s: float = 5.0
+) -> Dict[str, Any]:
+    """Poll execution status with backoff until it reaches one of the target states."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_s
+    delay = 0.1
+    status = await get_execution_status(client, execution_id)
+    while status.get("status") not in targets and loop.time() < deadline:
+        await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
+        delay *= 1.5
+        status = await get_execution_status(client, execution_id)
+    return status
+
+
+async def wait_for_state(
+    client: httpx.AsyncClient,
+    execution_id: int,
+    targets: Tuple[str, ...],
+    max_s: float = 5.0
+) -> Dict[str, Any]:
+    """
+    Wait until the execution reaches one of the target states.
+    
+    Listens for the state transitions the server publishes on
+    ``flow:execution:{id}:events`` and falls back to polling the status
+    endpoint when Redis is not reachable.
+    """
+    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        async with redis_client.pubsub() as pubsub:
+            await pubsub.subscribe(f"flow:execution:{execution_id}:events")
+            
+            # The transition may have happened before the subscription started
+            status = await get_execution_status(client, execution_id)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_s
+            while status.get("status") not in targets:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return status
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message and json.loads(message["data"]).get("status") in targets:
+                    return await get_execution_status(client, execution_id)
+            return status
+    except (redis.RedisError, OSError):
+        return await poll_for_state(client, execution_id, targets, max_s)
+    finally:
+        await redis_client.aclose()
+
+
+async def get_execution_logs(client: httpx.AsyncClient, execution_id: int) -> list:
     """Get execution logs."""
-    response = requests.get(f"{BASE_URL}/flows/executions/{execution_id}/logs")
+    response = await client.get(f"/flows/executions/{execution_id}/logs")
     if response.status_code == 200:
         return response.json()
     else:
@@ -147,69 +253,94 @@ def get_execution_logs(execution_id: int) -> list:
         return []
 
 
-def main():
-    """Main function to demonstrate Flow Engine usage."""
-    print("🚀 ChatBoost Flow Engine Demo")
-    print("=" * 50)
-    
-    # Step 1: Create contact
-    print("\n1. Creating contact...")
-    contact = create_contact(TEST_PHONE)
-    if contact:
-        print(f"✅ Contact created with ID: {contact.get('id')}")
-    else:
-        print("❌ Failed to create contact")
-        return
-    
-    # Step 2: Create flow
-    print("\n2. Creating test flow...")
-    flow_data = create_test_flow()
-    flow = create_flow(flow_data)
-    if flow:
-        flow_id = flow.get("id")
-        print(f"✅ Flow created with ID: {flow_id}")
+async def get_execution_statistics(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Get execution statistics."""
+    response = await client.get("/flows/statistics")
+    if response.status_code == 200:
+        return response.json()
     else:
-        print("❌ Failed to create flow")
-        return
-    
+        print(f"Error getting execution statistics: {response.text}")
+        return {}
+
+
+async def run_flow_step_by_step(client: httpx.AsyncClient, flow_id: int) -> Dict[str, Any]:
+    """Drive the flow with separate start / input / status requests."""
     # Step 3: Start flow execution
     print(f"\n3. Starting flow execution for {TEST_PHONE}...")
-    execution = start_flow_execution(flow_id, TEST_PHONE)
+    execution = await start_flow_execution(client, flow_id, TEST_PHONE)
     if execution:
         execution_id = execution.get("id")
         print(f"✅ Flow execution started with ID: {execution_id}")
     else:
         print("❌ Failed to start flow execution")
-        return
+        return {}
     
-    # Step 4: Wait for initial message to be sent
+    # Step 4-5: Wait for initial message to be sent and check execution status
     print("\n4. Waiting for initial message to be sent...")
-    time.sleep(2)
-    
-    # Step 5: Check execution status
     print(f"\n5. Checking execution status...")
-    status = get_execution_status(execution_id)
+    status = await wait_for_state(client, execution_id, ("waiting", "completed", "failed"))
     if status:
         print(f"✅ Execution status: {status.get('status')}")
         print(f"Current node index: {status.get('current_node_index')}")
     
     # Step 6: Send user input
     print(f"\n6. Sending user input 'yes'...")
-    input_result = send_user_input(execution_id, "yes")
+    input_result = await send_user_input(client, execution_id, "yes")
     if input_result:
         print(f"✅ User input processed: {input_result}")
     
-    # Step 7: Wait and check final status
+    # Step 7: Wait for the flow to finish
     print(f"\n7. Waiting for flow to complete...")
-    time.sleep(3)
+    final_status = await wait_for_state(client, execution_id, ("completed", "failed"))
+    logs = await get_execution_logs(client, execution_id)
     
-    final_status = get_execution_status(execution_id)
-    if final_status:
-        print(f"✅ Final execution status: {final_status.get('status')}")
+    return {
+        "execution_id": execution_id,
+        "final_status": final_status.get("status"),
+        "logs": logs
+    }
+
+
+async def run_demo(client: httpx.AsyncClient):
+    """Run the Flow Engine demo steps against the API."""
+    print("🚀 ChatBoost Flow Engine Demo")
+    print("=" * 50)
+    
+    # Step 1: Create contact
+    print("\n1. Creating contact...")
+    contact = await create_contact(client, TEST_PHONE)
+    if contact:
+        print(f"✅ Contact created with ID: {contact.get('id')}")
+    else:
+        print("❌ Failed to create contact")
+        return
+    
+    # Step 2: Create flow
+    print("\n2. Creating test flow...")
+    flow_data = create_test_flow()
+    flow = await create_flow(client, flow_data)
+    if flow:
+        flow_id = flow.get("id")
+        print(f"✅ Flow created with ID: {flow_id}")
+    else:
+        print("❌ Failed to create flow")
+        return
+    
+    # Steps 3-7: Start the flow, answer it and wait for completion in one round trip
+    print(f"\n3. Executing flow for {TEST_PHONE} with user input 'yes'...")
+    result = await execute_flow_with_input(client, flow_id, TEST_PHONE, "yes")
+    if not result:
+        print("Falling back to step-by-step execution...")
+        result = await run_flow_step_by_step(client, flow_id)
+        if not result:
+            return
+    
+    print(f"✅ Execution {result.get('execution_id')} final status: {result.get('final_status')}")
+    logs = result.get("logs", [])
+    stats = await get_execution_statistics(client)
     
     # Step 8: Get execution logs
     print(f"\n8. Getting execution logs...")
-    logs = get_execution_logs(execution_id)
     if logs:
         print(f"✅ Found {len(logs)} log entries:")
         for log in logs:
@@ -217,9 +348,7 @@ def main():
     
     # Step 9: Get execution statistics
     print(f"\n9. Getting execution statistics...")
-    response = requests.get(f"{BASE_URL}/flows/statistics")
-    if response.status_code == 200:
-        stats = response.json()
+    if stats:
         print(f"✅ Execution statistics:")
         print(f"  - Total executions: {stats.get('total_executions')}")
         print(f"  - Running executions: {stats.get('running_executions')}")
@@ -234,5 +363,16 @@ def main():
     print("4. Create more complex flows with conditions and webhooks")
 
 
+async def main_async():
+    """Run the demo with a single pooled HTTP client."""
+    async with create_client() as client:
+        await run_demo(client)
+
+
+def main():
+    """Main function to demonstrate Flow Engine usage."""
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()
@@ -11,18 +11,29 @@ This script demonstrates the Notifications API endpoints and WebSocket functiona
 Usage:
     python examples/notifications_demo.py --help
     python examples/notifications_demo.py --quick
+    python examples/notifications_demo.py --quick --follow
+    python examples/notifications_demo.py --websocket
     python examples/notifications_demo.py --websocket --token YOUR_JWT_TOKEN
 """
 
 import argparse
 import asyncio
-import json
+import base64
 import logging
+import os
 import sys
+import time
+import uuid
 import websockets
-from typing import Dict, Any, Optional
-import requests
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+from collections import Counter
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import httpx
+import orjson
+import redis
+import redis.asyncio as aioredis
 from datetime import datetime
+from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,8 +42,29 @@ logger = logging.getLogger(__name__)
 # API Configuration
 BASE_URL = "http://localhost:8000"
 WS_URL = "ws://localhost:8000"
+REDIS_URL = "redis://localhost:6379/0"
+
+# WebSocket receive queue
+WS_INBOX_SIZE = 1024
+WS_CONSUMERS = 2
+WS_REPLY_TIMEOUT = 5.0  # seconds
+WS_PING_INTERVAL = 20  # seconds between keepalive pings
+WS_PING_TIMEOUT = 10  # seconds to wait for a pong before dropping the connection
+WS_MAX_BACKOFF = 30  # seconds
+
+# Byte patterns for the control frame fast path (the server sends compact JSON)
+PONG_MARKER = b'"type":"pong"'
+REQ_ID_MARKER = b'"req_id"'
 API_BASE = f"{BASE_URL}/notifications"
 
+# Access tokens are reused across demo runs until they expire
+TOKEN_CACHE_PATH = Path("~/.cache/notifications_demo.json").expanduser()
+TOKEN_EXPIRY_MARGIN = 30  # seconds
+
+# ETags and bodies of conditional GETs, kept across runs so a later run can
+# be answered with 304 Not Modified
+ETAG_CACHE_PATH = Path("~/.cache/notifications_demo_etags.json").expanduser()
+
 # Demo data
 DEMO_NOTIFICATION = {
     "title": "Demo Notification",
@@ -56,14 +88,173 @@ class NotificationsDemo:
         self.ws_url = ws_url
         self.api_base = f"{base_url}/notifications"
         self.auth_base = f"{base_url}/auth"
-        self.session = requests.Session()
+        # Endpoint URLs are built once here rather than on every call
+        self._url_token = f"{self.auth_base}/token"
+        self._url_me = f"{self.auth_base}/me"
+        self._url_list = f"{self.api_base}/"
+        self._url_unread = f"{self.api_base}/unread"
+        self._url_count = f"{self.api_base}/count"
+        self._url_read = f"{self.api_base}/read"
+        self._url_read_all = f"{self.api_base}/read-all"
+        self._url_prefs = f"{self.api_base}/preferences"
+        self._url_summary = f"{self.api_base}/summary"
+        self._url_test = f"{self.api_base}/test"
+        self._url_batch = f"{self.api_base}/batch"
+        self._read_fmt = (self.api_base + "/{}/read").format
+        # One HTTP/2 connection, kept alive and multiplexed across every REST helper.
+        # Bursts that fall back to HTTP/1.1 can open up to 32 connections, and all
+        # of them are kept idle for reuse rather than being closed after the burst.
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=85)
+        )
         self.access_token: Optional[str] = None
         self.user_id: Optional[int] = None
         self.organization_id: Optional[int] = None
+        self.credentials: Optional[Tuple[str, str]] = None
         self.websocket: Optional[websockets.WebSocketServerProtocol] = None
+        self.ws_uri: Optional[str] = None
+        self.inbox: Optional[asyncio.Queue] = None
+        self.ws_tasks: List[asyncio.Task] = []
+        self.pending: Dict[str, asyncio.Future] = {}
+        # "user_id url" -> [ETag, body] for endpoints that answer If-None-Match
+        # with 304, loaded from ETAG_CACHE_PATH on first use
+        self.etag_cache: Optional[Dict[str, List[str]]] = None
+        # Disable to log every control frame in full when debugging
+        self.fastpath_control = True
+    
+    def _jwt_expiry(self, token: str) -> float:
+        """Read the exp claim from a JWT without verifying it (0 if absent)."""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(orjson.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+        except (IndexError, ValueError):
+            return 0
     
-    def authenticate(self, email: str = "admin@example.com", password: str = "admin123") -> bool:
-        """Authenticate and get access token."""
+    def _load_cached_token(self, email: str) -> bool:
+        """Restore a still-valid token for this server and user from the cache file."""
+        try:
+            data = orjson.loads(TOKEN_CACHE_PATH.read_bytes())
+        except (OSError, ValueError):
+            return False
+        
+        if data.get("base_url") != self.base_url or data.get("email") != email:
+            return False
+        if data.get("exp", 0) <= time.time() + TOKEN_EXPIRY_MARGIN:
+            return False
+        
+        self.access_token = data["token"]
+        self.user_id = data["user_id"]
+        self.organization_id = data.get("organization_id")
+        self.client.headers["Authorization"] = f"Bearer {self.access_token}"
+        return True
+    
+    def _save_cached_token(self, email: str):
+        """Atomically write the current token to the cache file."""
+        data = {
+            "base_url": self.base_url,
+            "email": email,
+            "token": self.access_token,
+            "exp": self._jwt_expiry(self.access_token),
+            "user_id": self.user_id,
+            "organization_id": self.organization_id
+        }
+        try:
+            TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = TOKEN_CACHE_PATH.with_suffix(".tmp")
+            tmp_path.touch(mode=0o600)
+            tmp_path.write_bytes(orjson.dumps(data))
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Could not cache access token: {e}")
+    
+    def _clear_cached_token(self):
+        """Forget the cached token."""
+        try:
+            TOKEN_CACHE_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove cached access token: {e}")
+    
+    def _load_etag_cache(self) -> Dict[str, List[str]]:
+        """Read the ETag cache file once per run (empty if missing or unreadable)."""
+        if self.etag_cache is None:
+            try:
+                self.etag_cache = orjson.loads(ETAG_CACHE_PATH.read_bytes())
+            except (OSError, ValueError):
+                self.etag_cache = {}
+        return self.etag_cache
+    
+    def _save_etag_cache(self):
+        """Atomically write the ETag cache file."""
+        try:
+            ETAG_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = ETAG_CACHE_PATH.with_suffix(".tmp")
+            tmp_path.touch(mode=0o600)
+            tmp_path.write_bytes(orjson.dumps(self.etag_cache))
+            os.replace(tmp_path, ETAG_CACHE_PATH)
+        except OSError as e:
+            logger.warning(f"Could not cache ETags: {e}")
+    
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send an authenticated request, logging in again once if the token was rejected."""
+        response = await self.client.request(method, url, **kwargs)
+        if response.status_code == 401 and self.credentials:
+            logger.info("Access token rejected, authenticating again")
+            self._clear_cached_token()
+            if await self.authenticate(*self.credentials, use_cache=False):
+                response = await self.client.request(method, url, **kwargs)
+        return response
+    
+    async def _get_conditional(self, url: str) -> httpx.Response:
+        """GET url with If-None-Match; a 304 is answered from the cache as a 200 with the cached body."""
+        etag_cache = self._load_etag_cache()
+        # Responses are per user, so the key includes who asked
+        key = f"{self.user_id} {url}"
+        cached = etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = await self._send("GET", url, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            logger.debug(f"{url} not modified, using cached body")
+            return httpx.Response(200, content=cached[1].encode(), headers=response.headers, request=response.request)
+        if response.status_code == 200 and "etag" in response.headers:
+            etag_cache[key] = [response.headers["etag"], response.text]
+            self._save_etag_cache()
+        return response
+    
+    async def _request(self, method: str, url: str, ok: Tuple[int, ...] = (200,), conditional: bool = False, **kwargs) -> Any:
+        """
+        Send an API request and return its decoded JSON body.
+        
+        Returns True for an expected empty response and None (after logging
+        the failure) for any other status or a transport error, so the REST
+        helpers below need no error handling of their own.
+        """
+        try:
+            if conditional:
+                response = await self._get_conditional(url)
+            else:
+                response = await self._send(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.error(f"{method} {url} failed: {e}")
+            return None
+        
+        if response.status_code not in ok:
+            logger.error(f"{method} {url} -> {response.status_code}: {response.text}")
+            return None
+        return orjson.loads(response.content) if response.content else True
+    
+    async def authenticate(self, email: str = "admin@example.com", password: str = "admin123", use_cache: bool = True) -> bool:
+        """Authenticate and get access token (reusing a cached one when still valid)."""
+        self.credentials = (email, password)
+        if use_cache and self._load_cached_token(email):
+            logger.info(f"Using cached access token for user {self.user_id}")
+            return True
+        
         try:
             # Login
             login_data = {
@@ -71,27 +262,28 @@ class NotificationsDemo:
                 "password": password
             }
             
-            response = self.session.post(
-                f"{self.auth_base}/token",
+            response = await self.client.post(
+                self._url_token,
                 data=login_data,
                 headers={"Content-Type": "application/x-www-form-urlencoded"}
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = orjson.loads(response.content)
                 self.access_token = token_data["access_token"]
                 
                 # Set authorization header
-                self.session.headers.update({
+                self.client.headers.update({
                     "Authorization": f"Bearer {self.access_token}"
                 })
                 
                 # Get user info
-                user_response = self.session.get(f"{self.auth_base}/me")
+                user_response = await self.client.get(self._url_me)
                 if user_response.status_code == 200:
-                    user_data = user_response.json()
+                    user_data = orjson.loads(user_response.content)
                     self.user_id = user_data["id"]
                     self.organization_id = user_data.get("organization_id")
+                    self._save_cached_token(email)
                     logger.info(f"Authenticated as user {self.user_id}")
                     return True
                 else:
@@ -105,293 +297,474 @@ class NotificationsDemo:
             logger.error(f"Authentication error: {e}")
             return False
     
-    def get_notifications(self, skip: int = 0, limit: int = 50) -> Optional[list]:
+    async def get_notifications(self, skip: int = 0, limit: int = 50) -> Optional[list]:
         """Get user notifications."""
-        try:
-            response = self.session.get(
-                f"{self.api_base}/",
-                params={"skip": skip, "limit": limit}
-            )
-            
-            if response.status_code == 200:
-                notifications = response.json()
-                logger.info(f"Retrieved {len(notifications)} notifications")
-                return notifications
-            else:
-                logger.error(f"Failed to get notifications: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting notifications: {e}")
-            return None
+        notifications = await self._request("GET", self._url_list, params={"skip": skip, "limit": limit})
+        if notifications is not None:
+            logger.info(f"Retrieved {len(notifications)} notifications")
+        return notifications
     
-    def get_unread_notifications(self) -> Optional[list]:
+    async def get_unread_notifications(self) -> Optional[list]:
         """Get unread notifications."""
-        try:
-            response = self.session.get(f"{self.api_base}/unread")
+        notifications = await self._request("GET", self._url_unread)
+        if notifications is not None:
+            logger.info(f"Retrieved {len(notifications)} unread notifications")
+        return notifications
+    
+    async def long_poll_unread(self, since_id: int = 0, timeout: int = 25) -> Optional[list]:
+        """
+        Wait for unread notifications newer than since_id.
+        
+        The server holds the request for up to `timeout` seconds; returns an
+        empty list when nothing arrived in that window and None on error.
+        """
+        notifications = await self._request(
+            "GET", self._url_unread, ok=(200, 204),
+            params={"since_id": since_id, "wait": timeout},
+            timeout=timeout + 5
+        )
+        # 204 No Content: the wait expired without new notifications
+        return [] if notifications is True else notifications
+    
+    async def follow_unread(self, since_id: int = 0, timeout: int = 25):
+        """
+        Log new unread notifications as they arrive until interrupted.
+        
+        Each long poll is re-issued as soon as it returns, so there is at
+        most one request in flight per `timeout` window while idle.
+        (Server-Sent Events would avoid even the re-issue, at the cost of a
+        streaming endpoint.)
+        """
+        logger.info(f"\n👀 Following unread notifications (since id {since_id})...")
+        while True:
+            notifications = await self.long_poll_unread(since_id, timeout)
+            if notifications is None:
+                # Back off briefly before reconnecting after an error
+                await asyncio.sleep(1)
+                continue
             
-            if response.status_code == 200:
-                notifications = response.json()
-                logger.info(f"Retrieved {len(notifications)} unread notifications")
-                return notifications
-            else:
-                logger.error(f"Failed to get unread notifications: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting unread notifications: {e}")
-            return None
+            for notif in notifications:
+                logger.info(f"  - {notif['title']} ({notif['type']})")
+            if notifications:
+                since_id = max(notif['id'] for notif in notifications)
     
-    def get_notification_count(self) -> Optional[Dict[str, Any]]:
+    async def get_notification_count(self) -> Optional[Dict[str, Any]]:
         """Get notification count."""
-        try:
-            response = self.session.get(f"{self.api_base}/count")
-            
-            if response.status_code == 200:
-                count_data = response.json()
-                logger.info(f"Notification count: {count_data['total']} total, {count_data['unread']} unread")
-                return count_data
-            else:
-                logger.error(f"Failed to get notification count: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting notification count: {e}")
-            return None
+        count_data = await self._request("GET", self._url_count)
+        if count_data is not None:
+            logger.info(f"Notification count: {count_data['total']} total, {count_data['unread']} unread")
+        return count_data
     
-    def mark_notification_read(self, notification_id: int) -> bool:
+    async def mark_notification_read(self, notification_id: int) -> bool:
         """Mark notification as read."""
-        try:
-            response = self.session.put(f"{self.api_base}/{notification_id}/read")
-            
-            if response.status_code == 200:
-                logger.info(f"Marked notification {notification_id} as read")
-                return True
-            else:
-                logger.error(f"Failed to mark notification as read: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error marking notification as read: {e}")
+        if await self._request("PUT", self._read_fmt(notification_id)) is None:
             return False
+        logger.info(f"Marked notification {notification_id} as read")
+        return True
     
-    def mark_all_read(self) -> bool:
+    async def mark_read_bulk(self, ids: List[int]) -> int:
+        """Mark several notifications as read in one request; returns how many were updated."""
+        result = await self._request("PUT", self._url_read, json={"ids": ids})
+        if result is None:
+            return 0
+        logger.info(f"Marked {result['updated_count']} notifications as read")
+        return result['updated_count']
+    
+    async def mark_all_read(self) -> bool:
         """Mark all notifications as read."""
-        try:
-            response = self.session.put(f"{self.api_base}/read-all")
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Marked {result['updated_count']} notifications as read")
-                return True
-            else:
-                logger.error(f"Failed to mark all notifications as read: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error marking all notifications as read: {e}")
+        result = await self._request("PUT", self._url_read_all)
+        if result is None:
             return False
+        logger.info(f"Marked {result['updated_count']} notifications as read")
+        return True
     
-    def get_notification_preferences(self) -> Optional[Dict[str, Any]]:
+    async def get_notification_preferences(self) -> Optional[Dict[str, Any]]:
         """Get notification preferences."""
-        try:
-            response = self.session.get(f"{self.api_base}/preferences")
-            
-            if response.status_code == 200:
-                preferences = response.json()
-                logger.info("Retrieved notification preferences")
-                return preferences
-            else:
-                logger.error(f"Failed to get notification preferences: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting notification preferences: {e}")
-            return None
+        preferences = await self._request("GET", self._url_prefs, conditional=True)
+        if preferences is not None:
+            logger.info("Retrieved notification preferences")
+        return preferences
     
-    def update_notification_preferences(self, preferences: Dict[str, bool]) -> bool:
+    async def update_notification_preferences(self, preferences: Dict[str, bool]) -> bool:
         """Update notification preferences."""
-        try:
-            response = self.session.put(
-                f"{self.api_base}/preferences",
-                json=preferences
-            )
-            
-            if response.status_code == 200:
-                logger.info("Updated notification preferences")
-                return True
-            else:
-                logger.error(f"Failed to update notification preferences: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error updating notification preferences: {e}")
+        if await self._request("PUT", self._url_prefs, json=preferences) is None:
             return False
+        logger.info("Updated notification preferences")
+        return True
     
-    def get_notification_summary(self) -> Optional[Dict[str, Any]]:
+    async def get_notification_summary(self) -> Optional[Dict[str, Any]]:
         """Get notification summary."""
-        try:
-            response = self.session.get(f"{self.api_base}/summary")
-            
-            if response.status_code == 200:
-                summary = response.json()
-                logger.info(f"Notification summary: {summary['total']} total, {summary['unread']} unread")
-                return summary
-            else:
-                logger.error(f"Failed to get notification summary: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting notification summary: {e}")
-            return None
+        summary = await self._request("GET", self._url_summary, conditional=True)
+        if summary is not None:
+            logger.info(f"Notification summary: {summary['total']} total, {summary['unread']} unread")
+        return summary
     
-    def create_test_notification(self, title: str, message: str) -> bool:
+    async def create_test_notification(self, title: str, message: str) -> bool:
         """Create a test notification."""
-        try:
-            response = self.session.post(
-                f"{self.api_base}/test",
-                params={"title": title, "message": message}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Created test notification: {result['notification_id']}")
-                return True
-            else:
-                logger.error(f"Failed to create test notification: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error creating test notification: {e}")
+        result = await self._request("POST", self._url_test, params={"title": title, "message": message})
+        if result is None:
             return False
+        logger.info(f"Created test notification: {result['notification_id']}")
+        return True
+    
+    async def post_batch(self, requests: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Send several API requests in one round trip via POST /notifications/batch.
+        
+        Each item is ``{"id", "method", "url", "body"}``; returns the response
+        bodies keyed by id (None for items that failed).
+        """
+        batch = await self._request(
+            "POST", self._url_batch,
+            json={"batch_request_id": str(uuid.uuid4()), "rest_requests": requests}
+        )
+        if batch is None:
+            return None
+        
+        results = {}
+        for item in batch["serviced_requests"]:
+            if item["status_code"] == 200:
+                results[item["id"]] = item["body"]
+            else:
+                logger.error(f"Batch request {item['id']} failed: {item['body']}")
+                results[item["id"]] = None
+        return results
+    
+    async def fetch_bundle(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Fetch notifications (unless limit is 0), unread, count, preferences and summary.
+        
+        Preferences and summary support If-None-Match, so they are fetched
+        with conditional GETs alongside one batch for the rest.
+        """
+        requests = [
+            {"id": "unread", "method": "GET", "url": "/notifications/unread"},
+            {"id": "count", "method": "GET", "url": "/notifications/count"}
+        ]
+        if limit:
+            requests.append({"id": "notifications", "method": "GET", "url": f"/notifications/?skip=0&limit={limit}"})
+        bundle, preferences, summary = await asyncio.gather(
+            self.post_batch(requests),
+            self.get_notification_preferences(),
+            self.get_notification_summary()
+        )
+        bundle = bundle or {}
+        bundle["preferences"] = preferences
+        bundle["summary"] = summary
+        return bundle
+    
+    async def iter_notifications(self, page_size: int = 50) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the user's notifications newest first, one cursor page at a time.
+        
+        Only one page is held in memory, and callers that stop early never
+        fetch the remaining pages.
+        """
+        params = {"limit": page_size}
+        while True:
+            page = await self._request("GET", self._url_list, params=params)
+            if page is None:
+                return
+            
+            for notification in page:
+                yield notification
+            
+            if len(page) < page_size:
+                return
+            params = {"limit": page_size, "cursor": page[-1]["id"]}
+    
+    async def create_test_notifications(self, notifications: List[Tuple[str, str]]) -> int:
+        """
+        Create several test notifications in one batch; returns how many were created.
+        
+        Falls back to concurrent single POSTs if the batch request fails.
+        """
+        results = await self.post_batch([
+            {"id": f"test-{i}", "method": "POST", "url": "/notifications/test", "body": {"title": title, "message": message}}
+            for i, (title, message) in enumerate(notifications)
+        ])
+        if results is None:
+            results = dict(enumerate(await asyncio.gather(
+                *(self.create_test_notification(title, message) for title, message in notifications),
+                return_exceptions=True
+            )))
+        
+        created = [result for result in results.values() if result and not isinstance(result, Exception)]
+        logger.info(f"Created {len(created)} test notifications")
+        return len(created)
+    
+    async def _first_notifications(self, n: int) -> List[Dict[str, Any]]:
+        """Collect the first n notifications from iter_notifications."""
+        notifications = []
+        async for notification in self.iter_notifications(page_size=n):
+            notifications.append(notification)
+            if len(notifications) >= n:
+                break
+        return notifications
+    
+    async def subscribe_counts(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield unread count updates pushed on notifications:user:{user_id}.
+        
+        The first item is ``{"event": "subscribed"}``, yielded once the
+        subscription is active, so callers can subscribe before making changes.
+        """
+        redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(f"notifications:user:{self.user_id}")
+                yield {"event": "subscribed"}
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        yield orjson.loads(message["data"])
+        finally:
+            await redis_client.aclose()
+    
+    async def aclose(self):
+        """Close the HTTP client."""
+        await self.client.aclose()
+    
+    async def _open_websocket(self):
+        """Open the WebSocket with protocol-level keepalive pings."""
+        return await websockets.connect(
+            self.ws_uri,
+            ping_interval=WS_PING_INTERVAL,
+            ping_timeout=WS_PING_TIMEOUT,
+            close_timeout=2,
+            max_queue=WS_INBOX_SIZE,
+            # Frames here are small control messages and short notifications;
+            # permessage-deflate costs more CPU than it saves on them
+            compression=None
+        )
     
     async def connect_websocket(self, token: str):
-        """Connect to WebSocket for real-time notifications."""
+        """
+        Connect to WebSocket for real-time notifications.
+        
+        Frames are read by a receive task into a bounded queue and handled by
+        separate consumer tasks, so slow handling never stalls the socket.
+        Both run in the background until close_websocket() is called.
+        """
         try:
-            uri = f"{self.ws_url}/ws?token={token}"
-            self.websocket = await websockets.connect(uri)
+            self.ws_uri = f"{self.ws_url}/ws?token={token}"
+            self.websocket = await self._open_websocket()
             
             logger.info("Connected to WebSocket")
             
-            # Listen for messages
-            async for message in self.websocket:
-                data = json.loads(message)
-                logger.info(f"Received WebSocket message: {data}")
-                
-                # Handle different message types
-                if data.get("type") == "connected":
-                    logger.info(f"WebSocket connected: {data['data']}")
-                elif data.get("type") == "notification":
-                    logger.info(f"New notification: {data['data']['title']}")
-                elif data.get("type") == "pong":
-                    logger.info("Received pong")
+            self.inbox = asyncio.Queue(maxsize=WS_INBOX_SIZE)
+            self.ws_tasks = [asyncio.create_task(self._recv_loop())]
+            self.ws_tasks += [asyncio.create_task(self._consume_loop()) for _ in range(WS_CONSUMERS)]
                 
         except Exception as e:
             logger.error(f"WebSocket connection error: {e}")
     
-    async def send_websocket_message(self, message: Dict[str, Any]):
-        """Send message via WebSocket."""
+    async def _recv_loop(self):
+        """
+        Read frames off the socket and queue them; never parses or blocks.
+        
+        Reconnects with exponential backoff when the connection drops (keepalive
+        pings detect dead connections within ping_interval + ping_timeout).
+        """
+        backoff = 1
+        while True:
+            try:
+                async for message in self.websocket:
+                    backoff = 1
+                    try:
+                        self.inbox.put_nowait(message)
+                    except asyncio.QueueFull:
+                        logger.warning(f"WebSocket inbox full ({WS_INBOX_SIZE}), dropping message")
+            except (ConnectionClosed, OSError) as e:
+                logger.warning(f"WebSocket connection lost: {e}")
+            
+            if self.websocket.close_code == 1008:
+                logger.error("WebSocket rejected the token, not reconnecting")
+                return
+            
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, WS_MAX_BACKOFF)
+            try:
+                self.websocket = await self._open_websocket()
+                logger.info("Reconnected to WebSocket")
+            except (InvalidHandshake, OSError) as e:
+                logger.warning(f"WebSocket reconnect failed: {e}")
+    
+    async def _consume_loop(self):
+        """Handle queued frames."""
+        while True:
+            message = await self.inbox.get()
+            try:
+                self._handle_message(message)
+            except Exception as e:
+                logger.error(f"Error handling WebSocket message: {e}")
+            finally:
+                self.inbox.task_done()
+    
+    def _handle_message(self, message):
+        """Parse and dispatch a single WebSocket frame."""
+        if isinstance(message, str):
+            message = message.encode()
+        
+        # Uncorrelated pongs carry nothing but their type: skip the parse
+        if self.fastpath_control and PONG_MARKER in message and REQ_ID_MARKER not in message:
+            logger.debug("Received pong")
+            return
+        
+        data = orjson.loads(message)
+        logger.info(f"Received WebSocket message: {data}")
+        
+        # Resolve the request waiting for this reply, if any
+        reply = self.pending.get(data.get("req_id"))
+        if reply and not reply.done():
+            reply.set_result(data)
+        
+        # Handle different message types
+        if data.get("type") == "connected":
+            logger.info(f"WebSocket connected: {data['data']}")
+        elif data.get("type") == "notification":
+            logger.info(f"New notification: {data['data']['title']}")
+        elif data.get("type") == "pong":
+            logger.info("Received pong")
+        elif data.get("type") == "batch_result":
+            for result in data["results"]:
+                logger.info(f"Batch result: {result['type']} {result.get('data', '')}")
+    
+    async def close_websocket(self):
+        """Stop the receive/consumer tasks and close the WebSocket."""
+        for task in self.ws_tasks:
+            task.cancel()
+        await asyncio.gather(*self.ws_tasks, return_exceptions=True)
+        self.ws_tasks = []
+        
+        if self.websocket:
+            await self.websocket.close()
+            logger.info("WebSocket connection closed")
+    
+    async def send_websocket_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Send message via WebSocket and wait for the server's reply to it."""
+        req_id = uuid.uuid4().hex
+        reply = asyncio.get_running_loop().create_future()
+        self.pending[req_id] = reply
         try:
             if self.websocket:
-                await self.websocket.send(json.dumps(message))
+                # Sent as a text frame: the server reads messages with receive_json()
+                await self.websocket.send(orjson.dumps({**message, "req_id": req_id}).decode())
                 logger.info(f"Sent WebSocket message: {message}")
+                return await asyncio.wait_for(reply, WS_REPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"No reply to WebSocket message {message.get('type')} within {WS_REPLY_TIMEOUT}s")
         except Exception as e:
             logger.error(f"Error sending WebSocket message: {e}")
+        finally:
+            self.pending.pop(req_id, None)
+        return None
+    
+    async def send_batch(self, ops: List[Dict[str, Any]]):
+        """Send several control messages as one frame; the server replies with one batch_result."""
+        return await self.send_websocket_message({"type": "batch", "ops": ops})
     
     async def ping_websocket(self):
         """Send ping to WebSocket."""
-        await self.send_websocket_message({"type": "ping"})
+        return await self.send_websocket_message({"type": "ping"})
     
     async def mark_read_via_websocket(self, notification_id: int):
         """Mark notification as read via WebSocket."""
-        await self.send_websocket_message({
+        return await self.send_websocket_message({
             "type": "mark_read",
             "notification_id": notification_id
         })
     
+    async def mark_read_bulk_via_websocket(self, ids: List[int]):
+        """Mark several notifications as read via WebSocket."""
+        return await self.send_websocket_message({
+            "type": "mark_read_bulk",
+            "ids": ids
+        })
+    
     async def mark_all_read_via_websocket(self):
         """Mark all notifications as read via WebSocket."""
-        await self.send_websocket_message({"type": "mark_all_read"})
+        return await self.send_websocket_message({"type": "mark_all_read"})
     
     async def get_unread_count_via_websocket(self):
         """Get unread count via WebSocket."""
-        await self.send_websocket_message({"type": "get_unread_count"})
+        return await self.send_websocket_message({"type": "get_unread_count"})
     
-    def run_quick_demo(self):
+    async def run_quick_demo(self, follow: bool = False):
         """Run a quick demonstration of notifications features."""
         logger.info("🚀 Starting Notifications Quick Demo")
         
         # Authenticate
-        if not self.authenticate():
+        if not await self.authenticate():
             logger.error("❌ Authentication failed")
             return
         
-        # Get notification count
-        logger.info("\n📊 Getting notification count...")
-        count = self.get_notification_count()
+        # The read-only calls are independent, so fetch them together
+        # (preferences and summary come back as 304 when unchanged since the
+        # last run); the preview only needs the first page of 3 notifications
+        logger.info("\n📊 Getting notification count, notifications, unread, preferences and summary...")
+        bundle, notifications = await asyncio.gather(self.fetch_bundle(limit=0), self._first_notifications(3))
+        count, unread, prefs, summary = (
+            bundle.get("count"),
+            bundle.get("unread"),
+            bundle.get("preferences"),
+            bundle.get("summary")
+        )
+        
         if count:
             logger.info(f"Total: {count['total']}, Unread: {count['unread']}")
             logger.info(f"By type: {count['by_type']}")
         
-        # Get notifications
-        logger.info("\n📋 Getting notifications...")
-        notifications = self.get_notifications(limit=10)
         if notifications:
-            for notif in notifications[:3]:  # Show first 3
+            for notif in notifications:  # Show first 3
                 logger.info(f"  - {notif['title']} ({notif['type']}) - {'Read' if notif['is_read'] else 'Unread'}")
         
-        # Get unread notifications
-        logger.info("\n🔔 Getting unread notifications...")
-        unread = self.get_unread_notifications()
         if unread:
             logger.info(f"Found {len(unread)} unread notifications")
         
-        # Get notification preferences
-        logger.info("\n⚙️ Getting notification preferences...")
-        prefs = self.get_notification_preferences()
         if prefs:
             logger.info(f"Email enabled: {prefs['email_enabled']}")
             logger.info(f"Push enabled: {prefs['push_enabled']}")
             logger.info(f"Message status enabled: {prefs['message_status_enabled']}")
         
-        # Get notification summary
-        logger.info("\n📈 Getting notification summary...")
-        summary = self.get_notification_summary()
         if summary:
             logger.info(f"Summary: {summary['total']} total, {summary['unread']} unread")
             logger.info(f"Recent notifications: {len(summary['recent'])}")
         
         # Create test notification
         logger.info("\n🧪 Creating test notification...")
-        self.create_test_notification(
+        await self.create_test_notification(
             "Demo Test",
             "This is a test notification created by the demo script"
         )
         
         logger.info("\n✅ Quick demo completed successfully!")
+        
+        if follow:
+            since_id = max((notif['id'] for notif in unread or []), default=0)
+            await self.follow_unread(since_id)
     
-    async def run_websocket_demo(self, token: str):
-        """Run WebSocket demonstration."""
+    async def run_websocket_demo(self, token: Optional[str] = None):
+        """Run WebSocket demonstration (logging in over REST when no token is given)."""
         logger.info("🚀 Starting WebSocket Demo")
         
+        if not token:
+            # Same event loop and HTTP client as the REST helpers
+            if not await self.authenticate():
+                logger.error("❌ Authentication failed")
+                return
+            token = self.access_token
+        
         try:
             # Connect to WebSocket
             await self.connect_websocket(token)
             
-            # Send ping
-            logger.info("\n📡 Sending ping...")
-            await self.ping_websocket()
-            await asyncio.sleep(1)
-            
-            # Get unread count
-            logger.info("\n🔢 Getting unread count...")
-            await self.get_unread_count_via_websocket()
-            await asyncio.sleep(1)
-            
-            # Mark all as read
-            logger.info("\n✅ Marking all as read...")
-            await self.mark_all_read_via_websocket()
-            await asyncio.sleep(1)
+            # Get the unread count and mark all as read in a single frame
+            # (keepalive pings are sent by the websockets library)
+            logger.info("\n📡 Sending unread count and mark-all-read...")
+            await self.send_batch([
+                {"type": "get_unread_count"},
+                {"type": "mark_all_read"}
+            ])
             
             # Keep connection alive for a bit
             logger.info("\n⏳ Keeping connection alive for 10 seconds...")
@@ -400,43 +773,46 @@ class NotificationsDemo:
         except Exception as e:
             logger.error(f"WebSocket demo error: {e}")
         finally:
-            if self.websocket:
-                await self.websocket.close()
-                logger.info("WebSocket connection closed")
+            await self.close_websocket()
     
-    def run_comprehensive_demo(self):
+    async def run_comprehensive_demo(self):
         """Run a comprehensive demonstration."""
         logger.info("🚀 Starting Notifications Comprehensive Demo")
         
         # Authenticate
-        if not self.authenticate():
+        if not await self.authenticate():
             logger.error("❌ Authentication failed")
             return
         
         # Comprehensive notification management
         logger.info("\n📊 Comprehensive notification management...")
         
+        # The initial reads are independent, so fetch them together
+        bundle = await self.fetch_bundle(limit=100)
+        notifications, unread, count, prefs, summary = (
+            bundle.get("notifications"),
+            bundle.get("unread"),
+            bundle.get("count"),
+            bundle.get("preferences"),
+            bundle.get("summary")
+        )
+        
         # Get all notifications
-        notifications = self.get_notifications(limit=100)
         if notifications:
             logger.info(f"Total notifications: {len(notifications)}")
             
             # Group by type
-            by_type = {}
-            for notif in notifications:
-                by_type[notif['type']] = by_type.get(notif['type'], 0) + 1
+            by_type = dict(Counter(notif['type'] for notif in notifications))
             
             logger.info(f"Notifications by type: {by_type}")
         
         # Get unread notifications
-        unread = self.get_unread_notifications()
         if unread:
             logger.info(f"\nUnread notifications ({len(unread)}):")
             for notif in unread[:5]:  # Show first 5
                 logger.info(f"  - {notif['title']} ({notif['priority']})")
         
         # Get notification count
-        count = self.get_notification_count()
         if count:
             logger.info(f"\nNotification counts:")
             logger.info(f"  Total: {count['total']}")
@@ -444,7 +820,6 @@ class NotificationsDemo:
             logger.info(f"  By type: {count['by_type']}")
         
         # Get notification preferences
-        prefs = self.get_notification_preferences()
         if prefs:
             logger.info(f"\nCurrent preferences:")
             logger.info(f"  Email: {prefs['email_enabled']}")
@@ -462,10 +837,9 @@ class NotificationsDemo:
             "flow_events_enabled": False,
             "system_notifications_enabled": True
         }
-        self.update_notification_preferences(new_prefs)
+        await self.update_notification_preferences(new_prefs)
         
         # Get notification summary
-        summary = self.get_notification_summary()
         if summary:
             logger.info(f"\nNotification summary:")
             logger.info(f"  Total: {summary['total']}")
@@ -473,6 +847,14 @@ class NotificationsDemo:
             logger.info(f"  By type: {summary['by_type']}")
             logger.info(f"  Recent: {len(summary['recent'])} notifications")
         
+        # Count updates are pushed over Redis; subscribe before making changes
+        updates = self.subscribe_counts()
+        try:
+            await updates.__anext__()
+        except (redis.RedisError, OSError) as e:
+            logger.warning(f"Count updates unavailable, will poll instead: {e}")
+            updates = None
+        
         # Create multiple test notifications
         logger.info("\n🧪 Creating test notifications...")
         test_notifications = [
@@ -482,31 +864,61 @@ class NotificationsDemo:
             ("User Mention", "You were mentioned in a comment")
         ]
         
-        for title, message in test_notifications:
-            self.create_test_notification(title, message)
+        created = await self.create_test_notifications(test_notifications)
+        marked = 0
         
         # Mark some notifications as read
         if notifications:
             logger.info("\n✅ Marking some notifications as read...")
-            for notif in notifications[:3]:  # Mark first 3 as read
-                if not notif['is_read']:
-                    self.mark_notification_read(notif['id'])
+            # Mark first 3 as read in a single request
+            ids = [notif['id'] for notif in notifications[:3] if not notif['is_read']]
+            if ids:
+                marked = await self.mark_read_bulk(ids)
         
         # Get updated count
         logger.info("\n📊 Getting updated notification count...")
-        updated_count = self.get_notification_count()
-        if updated_count:
-            logger.info(f"Updated counts: {updated_count['total']} total, {updated_count['unread']} unread")
+        if updates is None:
+            updated_count = await self.get_notification_count()
+            if updated_count:
+                logger.info(f"Updated counts: {updated_count['total']} total, {updated_count['unread']} unread")
+        else:
+            unread_count = None
+            try:
+                # One update per created notification plus one for the bulk read
+                for _ in range(created + (1 if marked else 0)):
+                    update = await asyncio.wait_for(updates.__anext__(), timeout=2.0)
+                    unread_count = update["unread"]
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for count updates")
+            finally:
+                await updates.aclose()
+            
+            if unread_count is not None and count:
+                logger.info(f"Updated counts: {count['total'] + created} total, {unread_count} unread")
         
         logger.info("\n✅ Comprehensive demo completed successfully!")
 
 
+async def run_demo(demo: NotificationsDemo, args):
+    """Run the selected demo on one event loop and close the HTTP client afterwards."""
+    try:
+        if args.websocket:
+            await demo.run_websocket_demo(args.token)
+        elif args.quick:
+            await demo.run_quick_demo(args.follow)
+        else:
+            await demo.run_comprehensive_demo()
+    finally:
+        await demo.aclose()
+
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Notifications Demo")
     parser.add_argument("--quick", action="store_true", help="Run quick demo")
+    parser.add_argument("--follow", action="store_true", help="After the quick demo, long-poll for new unread notifications")
     parser.add_argument("--websocket", action="store_true", help="Run WebSocket demo")
-    parser.add_argument("--token", help="JWT token for WebSocket demo")
+    parser.add_argument("--token", help="JWT token for WebSocket demo (default: log in via the REST API)")
     parser.add_argument("--base-url", default=BASE_URL, help="Base URL for API")
     parser.add_argument("--ws-url", default=WS_URL, help="WebSocket URL")
     
@@ -516,17 +928,7 @@ def main():
     demo = NotificationsDemo(args.base_url, args.ws_url)
     
     try:
-        if args.websocket:
-            if not args.token:
-                logger.error("❌ Token required for WebSocket demo")
-                sys.exit(1)
-            
-            # Run WebSocket demo
-            asyncio.run(demo.run_websocket_demo(args.token))
-        elif args.quick:
-            demo.run_quick_demo()
-        else:
-            demo.run_comprehensive_demo()
+        asyncio.run(run_demo(demo, args))
     except KeyboardInterrupt:
         logger.info("\n⏹️ Demo interrupted by user")
     except Exception as e:
@@ -16,12 +16,17 @@ Usage:
 
 import argparse
 import asyncio
+import base64
 import json
 import logging
+import os
 import sys
-from typing import Dict, Any, Optional
-import requests
-from datetime import datetime
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import httpx
+import ijson
+import orjson
+from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,6 +36,16 @@ logger = logging.getLogger(__name__)
 BASE_URL = "http://localhost:8000"
 API_BASE = f"{BASE_URL}/team"
 
+# orjson-encoded request bodies are sent with this header
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Access token and user info are reused across runs until shortly before expiry
+TOKEN_CACHE_PATH = Path("~/.cache/team_demo/token.json").expanduser()
+TOKEN_EXPIRY_MARGIN = 30  # seconds
+
+# How long cached GET responses (roles, organization, members) stay fresh
+CACHE_TTL_SECONDS = 30
+
 # Demo data
 DEMO_ORGANIZATION = {
     "name": "Demo Company Inc",
@@ -51,17 +66,130 @@ DEMO_MEMBER = {
 class TeamManagementDemo:
     """Demo class for Team Management API."""
     
-    def __init__(self, base_url: str = BASE_URL):
+    def __init__(self, base_url: str = BASE_URL, use_token_cache: bool = True):
         self.base_url = base_url
         self.api_base = f"{base_url}/team"
         self.auth_base = f"{base_url}/auth"
-        self.session = requests.Session()
+        # Endpoint URLs are built once here rather than on every call
+        self._url_token = f"{self.auth_base}/token"
+        self._url_me = f"{self.auth_base}/me"
+        self._url_orgs = f"{self.api_base}/organizations"
+        self._url_orgs_with_members = f"{self.api_base}/organizations/with-members"
+        self._url_perm_check = f"{self.api_base}/permissions/check"
+        self._url_perm_check_batch = f"{self.api_base}/permissions/check-batch"
+        self._url_roles = f"{self.api_base}/roles"
+        self._org_fmt = (self._url_orgs + "/{}").format
+        self._members_fmt = (self._url_orgs + "/{}/members").format
+        self._member_fmt = (self._url_orgs + "/{}/members/{}").format
+        self._invitations_fmt = (self._url_orgs + "/{}/invitations").format
+        self._stats_fmt = (self._url_orgs + "/{}/stats").format
         self.access_token: Optional[str] = None
+        # One client for the whole run so concurrent calls share its connection pool;
+        # its headers are only replaced wholesale when the token changes
+        # (pool limits and HTTP/2 belong on the transport, which the client
+        # uses as-is when one is passed)
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32)
+        )
+        self.client = httpx.AsyncClient(
+            timeout=10.0,
+            transport=transport,
+            headers=self._default_headers()
+        )
         self.user_id: Optional[int] = None
         self.organization_id: Optional[int] = None
+        self.credentials: Optional[Tuple[str, str]] = None
+        self.use_token_cache = use_token_cache
+        # (resource, *args) -> (stored_at, response) for repeated GETs within a run
+        self._cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+    
+    def _default_headers(self) -> Dict[str, str]:
+        """Headers sent with every request for the current token."""
+        headers = {"Accept": "application/json"}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        return headers
+    
+    def _use_token(self, access_token: str):
+        """Switch to a new access token, replacing the client headers in one step."""
+        self.access_token = access_token
+        self.client.headers = self._default_headers()
+    
+    def _cache_get(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        """Return a cached response if it is still fresh."""
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < CACHE_TTL_SECONDS:
+            return entry[1]
+        return None
+    
+    def _cache_set(self, key: Tuple[Any, ...], value: Any):
+        """Cache a successful response."""
+        if value is not None:
+            self._cache[key] = (time.monotonic(), value)
+    
+    def _jwt_expiry(self, token: str) -> float:
+        """Read the exp claim from a JWT without verifying it (0 if absent)."""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(orjson.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+        except (IndexError, ValueError):
+            return 0
+    
+    def _load_cached_token(self, email: str) -> bool:
+        """Restore a still-valid token and user info for this server and user from the cache file."""
+        try:
+            data = orjson.loads(TOKEN_CACHE_PATH.read_bytes())
+        except (OSError, ValueError):
+            return False
+        
+        if data.get("base_url") != self.base_url or data.get("email") != email:
+            return False
+        if data.get("exp", 0) <= time.time() + TOKEN_EXPIRY_MARGIN:
+            return False
+        
+        self._use_token(data["token"])
+        self.user_id = data["user_id"]
+        self.organization_id = data.get("organization_id")
+        return True
+    
+    def _save_cached_token(self, email: str):
+        """Atomically write the current token and user info to the cache file."""
+        data = {
+            "base_url": self.base_url,
+            "email": email,
+            "token": self.access_token,
+            "exp": self._jwt_expiry(self.access_token),
+            "user_id": self.user_id,
+            "organization_id": self.organization_id
+        }
+        try:
+            TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = TOKEN_CACHE_PATH.with_suffix(".tmp")
+            tmp_path.touch(mode=0o600)
+            tmp_path.write_bytes(orjson.dumps(data))
+            os.replace(tmp_path, TOKEN_CACHE_PATH)
+        except OSError as e:
+            logger.warning("Could not cache access token: %s", e)
     
-    def authenticate(self, email: str = "admin@example.com", password: str = "admin123") -> bool:
-        """Authenticate and get access token."""
+    def _clear_cached_token(self):
+        """Forget the cached token."""
+        try:
+            TOKEN_CACHE_PATH.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not remove cached access token: %s", e)
+    
+    async def authenticate(self, email: str = "admin@example.com", password: str = "admin123", use_cache: bool = True) -> Optional[str]:
+        """Authenticate and return the access token (reusing a cached one when still valid), or None."""
+        self.credentials = (email, password)
+        if use_cache and self.use_token_cache and self._load_cached_token(email):
+            logger.info("Using cached access token for user %s", self.user_id)
+            return self.access_token
+        
         try:
             # Login
             login_data = {
@@ -69,279 +197,267 @@ class TeamManagementDemo:
                 "password": password
             }
             
-            response = self.session.post(
-                f"{self.auth_base}/token",
+            response = await self.client.post(
+                self._url_token,
                 data=login_data,
                 headers={"Content-Type": "application/x-www-form-urlencoded"}
             )
             
             if response.status_code == 200:
-                token_data = response.json()
-                self.access_token = token_data["access_token"]
-                
-                # Set authorization header
-                self.session.headers.update({
-                    "Authorization": f"Bearer {self.access_token}"
-                })
+                token_data = orjson.loads(response.content)
+                self._use_token(token_data["access_token"])
                 
                 # Get user info
-                user_response = self.session.get(f"{self.auth_base}/me")
+                user_response = await self.client.get(self._url_me)
                 if user_response.status_code == 200:
-                    user_data = user_response.json()
+                    user_data = orjson.loads(user_response.content)
                     self.user_id = user_data["id"]
                     self.organization_id = user_data.get("organization_id")
-                    logger.info(f"Authenticated as user {self.user_id}")
-                    return True
+                    if self.use_token_cache:
+                        self._save_cached_token(email)
+                    logger.info("Authenticated as user %s", self.user_id)
+                    return self.access_token
                 else:
                     logger.error("Failed to get user info")
-                    return False
+                    return None
             else:
-                logger.error(f"Authentication failed: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Authentication error: {e}")
-            return False
-    
-    def create_organization(self, org_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create a new organization."""
-        try:
-            response = self.session.post(
-                f"{self.api_base}/organizations",
-                json=org_data
-            )
-            
-            if response.status_code == 201:
-                org = response.json()
-                self.organization_id = org["id"]
-                logger.info(f"Created organization: {org['name']} (ID: {org['id']})")
-                return org
-            else:
-                logger.error(f"Failed to create organization: {response.text}")
+                logger.error("Authentication failed: %s", response.text)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error creating organization: {e}")
+            logger.error("Authentication error: %s", e)
             return None
     
-    def get_organization(self, org_id: int) -> Optional[Dict[str, Any]]:
-        """Get organization details."""
+    async def _request(self, method: str, url: str, ok: Tuple[int, ...] = (200,), **kwargs) -> Any:
+        """
+        Send an API request and return its decoded JSON body.
+        
+        Returns None (after logging the failure) for any other status or a
+        transport error, so the helpers below need no error handling of their own.
+        """
+        if "json" in kwargs:
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+            kwargs["headers"] = JSON_HEADERS
+        
         try:
-            response = self.session.get(f"{self.api_base}/organizations/{org_id}")
-            
-            if response.status_code == 200:
-                org = response.json()
-                logger.info(f"Retrieved organization: {org['name']}")
-                return org
-            else:
-                logger.error(f"Failed to get organization: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting organization: {e}")
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code == 401 and self.credentials:
+                # A cached token may have been revoked; log in again once
+                logger.info("Access token rejected, authenticating again")
+                self._clear_cached_token()
+                if await self.authenticate(*self.credentials, use_cache=False):
+                    response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.error("%s %s failed: %s", method, url, e)
+            return None
+        
+        if response.status_code not in ok:
+            logger.error("%s %s -> %s: %s", method, url, response.status_code, response.text)
             return None
+        return orjson.loads(response.content)
     
-    def update_organization(self, org_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update organization."""
+    async def _stream_items(self, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        GET a JSON array and yield its items as they are parsed off the wire.
+        
+        Failures are logged and end the stream, matching _request.
+        """
+        items = ijson.sendable_list()
+        parser = ijson.items_coro(items, "item")
         try:
-            response = self.session.put(
-                f"{self.api_base}/organizations/{org_id}",
-                json=updates
+            async with self.client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error("GET %s -> %s: %s", url, response.status_code, response.text)
+                    return
+                async for chunk in response.aiter_bytes():
+                    parser.send(chunk)
+                    for item in items:
+                        yield item
+                    del items[:]
+        except httpx.HTTPError as e:
+            logger.error("GET %s failed: %s", url, e)
+            return
+        parser.close()
+        for item in items:
+            yield item
+    
+    async def create_organization(self, org_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a new organization."""
+        org = await self._request("POST", self._url_orgs, ok=(201,), json=org_data)
+        if org:
+            self.organization_id = org["id"]
+            logger.info("Created organization: %s (ID: %s)", org['name'], org['id'])
+        return org
+    
+    async def create_organization_with_members(self, org_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Create a new organization and cache its details and members.
+        
+        Uses the combined endpoint so no follow-up GETs are needed; against a
+        server without it, falls back to create plus concurrent fetches.
+        """
+        created = await self._request("POST", self._url_orgs_with_members, ok=(201,), json=org_data)
+        if created:
+            org = created["organization"]
+            self.organization_id = org["id"]
+            logger.info("Created organization: %s (ID: %s)", org['name'], org['id'])
+            self._cache_set(("organization", org["id"]), org)
+            self._cache_set(("members", org["id"]), created["members"])
+            return org
+        
+        logger.info("Falling back to separate create and fetch requests")
+        org = await self.create_organization(org_data)
+        if org:
+            await asyncio.gather(
+                self.get_organization(org["id"]),
+                self.get_organization_members(org["id"])
             )
-            
-            if response.status_code == 200:
-                org = response.json()
-                logger.info(f"Updated organization: {org['name']}")
-                return org
-            else:
-                logger.error(f"Failed to update organization: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error updating organization: {e}")
-            return None
+        return org
+    
+    async def get_organization(self, org_id: int) -> Optional[Dict[str, Any]]:
+        """Get organization details."""
+        cached = self._cache_get(("organization", org_id))
+        if cached is not None:
+            return cached
+        
+        org = await self._request("GET", self._org_fmt(org_id))
+        if org:
+            logger.info("Retrieved organization: %s", org['name'])
+            self._cache_set(("organization", org_id), org)
+        return org
+    
+    async def update_organization(self, org_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update organization."""
+        org = await self._request("PUT", self._org_fmt(org_id), json=updates)
+        if org:
+            logger.info("Updated organization: %s", org['name'])
+            self._cache_set(("organization", org_id), org)
+        return org
     
-    def get_organization_members(self, org_id: int) -> Optional[list]:
+    async def get_organization_members(self, org_id: int) -> Optional[list]:
         """Get organization members."""
-        try:
-            response = self.session.get(f"{self.api_base}/organizations/{org_id}/members")
-            
-            if response.status_code == 200:
-                members = response.json()
-                logger.info(f"Retrieved {len(members)} organization members")
-                return members
-            else:
-                logger.error(f"Failed to get organization members: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting organization members: {e}")
-            return None
+        cached = self._cache_get(("members", org_id))
+        if cached is not None:
+            return cached
+        
+        members = await self._request("GET", self._members_fmt(org_id))
+        if members is not None:
+            logger.info("Retrieved %s organization members", len(members))
+            self._cache_set(("members", org_id), members)
+        return members
     
-    def add_member(self, org_id: int, member_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def iter_organization_members(self, org_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """Stream organization members without buffering the whole list (or replay cached ones)."""
+        cached = self._cache_get(("members", org_id))
+        if cached is not None:
+            for member in cached:
+                yield member
+            return
+        async for member in self._stream_items(self._members_fmt(org_id)):
+            yield member
+    
+    async def add_member(self, org_id: int, member_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Add member to organization."""
-        try:
-            response = self.session.post(
-                f"{self.api_base}/organizations/{org_id}/members",
-                json=member_data
-            )
-            
-            if response.status_code == 200:
-                member = response.json()
-                logger.info(f"Added member: {member['user_name']} as {member['role_name']}")
-                return member
-            else:
-                logger.error(f"Failed to add member: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error adding member: {e}")
-            return None
+        member = await self._request("POST", self._members_fmt(org_id), json=member_data)
+        if member:
+            logger.info("Added member: %s as %s", member['user_name'], member['role_name'])
+            self._cache.pop(("members", org_id), None)
+        return member
     
-    def update_member_role(self, org_id: int, user_id: int, role_name: str) -> Optional[Dict[str, Any]]:
+    async def update_member_role(self, org_id: int, user_id: int, role_name: str) -> Optional[Dict[str, Any]]:
         """Update member role."""
-        try:
-            response = self.session.put(
-                f"{self.api_base}/organizations/{org_id}/members/{user_id}",
-                json={"role_name": role_name}
-            )
-            
-            if response.status_code == 200:
-                member = response.json()
-                logger.info(f"Updated member role: {member['user_name']} -> {member['role_name']}")
-                return member
-            else:
-                logger.error(f"Failed to update member role: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error updating member role: {e}")
-            return None
+        member = await self._request(
+            "PUT", self._member_fmt(org_id, user_id),
+            json={"role_name": role_name}
+        )
+        if member:
+            logger.info("Updated member role: %s -> %s", member['user_name'], member['role_name'])
+            self._cache.pop(("members", org_id), None)
+        return member
     
-    def create_invitation(self, org_id: int, invitation_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def create_invitation(self, org_id: int, invitation_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create invitation."""
-        try:
-            response = self.session.post(
-                f"{self.api_base}/organizations/{org_id}/invitations",
-                json=invitation_data
-            )
-            
-            if response.status_code == 200:
-                invitation = response.json()
-                logger.info(f"Created invitation for {invitation_data['email']} as {invitation_data['role_name']}")
-                logger.info(f"Invitation link: {invitation.get('invitation_link', 'N/A')}")
-                return invitation
-            else:
-                logger.error(f"Failed to create invitation: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error creating invitation: {e}")
-            return None
+        invitation = await self._request("POST", self._invitations_fmt(org_id), json=invitation_data)
+        if invitation:
+            logger.info("Created invitation for %s as %s", invitation_data['email'], invitation_data['role_name'])
+            logger.info("Invitation link: %s", invitation.get('invitation_link', 'N/A'))
+        return invitation
     
-    def get_pending_invitations(self, org_id: int) -> Optional[list]:
+    async def get_pending_invitations(self, org_id: int) -> Optional[list]:
         """Get pending invitations."""
-        try:
-            response = self.session.get(f"{self.api_base}/organizations/{org_id}/invitations")
-            
-            if response.status_code == 200:
-                invitations = response.json()
-                logger.info(f"Retrieved {len(invitations)} pending invitations")
-                return invitations
-            else:
-                logger.error(f"Failed to get pending invitations: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting pending invitations: {e}")
-            return None
+        invitations = await self._request("GET", self._invitations_fmt(org_id))
+        if invitations is not None:
+            logger.info("Retrieved %s pending invitations", len(invitations))
+        return invitations
+    
+    def iter_pending_invitations(self, org_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """Stream pending invitations without buffering the whole list."""
+        return self._stream_items(self._invitations_fmt(org_id))
     
-    def check_permission(self, permission: str) -> Optional[Dict[str, Any]]:
+    async def check_permission(self, permission: str) -> Optional[Dict[str, Any]]:
         """Check user permission."""
-        try:
-            response = self.session.get(
-                f"{self.api_base}/permissions/check",
-                params={"permission": permission}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Permission '{permission}': {result['has_permission']}")
-                return result
-            else:
-                logger.error(f"Failed to check permission: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error checking permission: {e}")
+        result = await self._request("GET", self._url_perm_check, params={"permission": permission})
+        if result:
+            logger.info("Permission '%s': %s", permission, result['has_permission'])
+        return result
+    
+    async def check_permissions(self, permissions: List[str]) -> Optional[Dict[str, bool]]:
+        """Check several permissions in one request; returns {permission: has_permission}."""
+        response = await self._request("POST", self._url_perm_check_batch, json={"permissions": permissions})
+        if not response:
             return None
+        results = response["results"]
+        logger.info("Checked %s permissions", len(results))
+        return results
     
-    def get_organization_stats(self, org_id: int) -> Optional[Dict[str, Any]]:
+    async def get_organization_stats(self, org_id: int) -> Optional[Dict[str, Any]]:
         """Get organization statistics."""
-        try:
-            response = self.session.get(f"{self.api_base}/organizations/{org_id}/stats")
-            
-            if response.status_code == 200:
-                stats = response.json()
-                logger.info(f"Organization stats: {stats}")
-                return stats
-            else:
-                logger.error(f"Failed to get organization stats: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting organization stats: {e}")
-            return None
+        stats = await self._request("GET", self._stats_fmt(org_id))
+        if stats:
+            logger.info("Organization stats: %s", stats)
+        return stats
     
-    def get_roles(self) -> Optional[Dict[str, Any]]:
+    async def get_roles(self) -> Optional[Dict[str, Any]]:
         """Get available roles."""
-        try:
-            response = self.session.get(f"{self.api_base}/roles")
-            
-            if response.status_code == 200:
-                roles = response.json()
-                logger.info(f"Available roles: {list(roles['roles'].keys())}")
-                return roles
-            else:
-                logger.error(f"Failed to get roles: {response.text}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting roles: {e}")
-            return None
+        cached = self._cache_get(("roles",))
+        if cached is not None:
+            return cached
+        
+        roles = await self._request("GET", self._url_roles)
+        if roles:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Available roles: %s", list(roles['roles'].keys()))
+            self._cache_set(("roles",), roles)
+        return roles
+    
+    async def aclose(self):
+        """Close the HTTP client."""
+        await self.client.aclose()
     
-    def run_quick_demo(self):
+    async def run_quick_demo(self):
         """Run a quick demonstration of team management features."""
         logger.info("🚀 Starting Team Management Quick Demo")
         
         # Authenticate
-        if not self.authenticate():
+        if not await self.authenticate():
             logger.error("❌ Authentication failed")
             return
         
-        # Get available roles
-        logger.info("\n📋 Getting available roles...")
-        self.get_roles()
-        
-        # Create organization
-        logger.info("\n🏢 Creating organization...")
-        org = self.create_organization(DEMO_ORGANIZATION)
+        # Get available roles while creating the organization
+        logger.info("\n📋 Getting available roles and 🏢 creating organization...")
+        _, org = await asyncio.gather(
+            self.get_roles(),
+            self.create_organization_with_members(DEMO_ORGANIZATION)
+        )
         if not org:
             logger.error("❌ Failed to create organization")
             return
         
         org_id = org["id"]
         
-        # Get organization details
-        logger.info("\n📊 Getting organization details...")
-        self.get_organization(org_id)
-        
-        # Get organization members
-        logger.info("\n👥 Getting organization members...")
-        self.get_organization_members(org_id)
-        
-        # Check permissions
-        logger.info("\n🔐 Checking permissions...")
+        # Details and members come from the create response cache; permissions are checked in one wave
+        logger.info("\n📊 Getting organization details, 👥 members and 🔐 permissions...")
         permissions_to_check = [
             "bot:create",
             "team:invite",
@@ -349,47 +465,50 @@ class TeamManagementDemo:
             "analytics:view"
         ]
         
-        for permission in permissions_to_check:
-            self.check_permission(permission)
+        await asyncio.gather(
+            self.get_organization(org_id),
+            self.get_organization_members(org_id),
+            *(self.check_permission(permission) for permission in permissions_to_check)
+        )
         
         # Create invitation
         logger.info("\n📧 Creating invitation...")
-        self.create_invitation(org_id, DEMO_INVITATION)
+        await self.create_invitation(org_id, DEMO_INVITATION)
         
         # Get pending invitations
         logger.info("\n📬 Getting pending invitations...")
-        self.get_pending_invitations(org_id)
+        await self.get_pending_invitations(org_id)
         
         # Get organization statistics
         logger.info("\n📈 Getting organization statistics...")
-        self.get_organization_stats(org_id)
+        await self.get_organization_stats(org_id)
         
         # Update organization
         logger.info("\n✏️ Updating organization...")
         updates = {
             "description": "Updated description for demo organization"
         }
-        self.update_organization(org_id, updates)
+        await self.update_organization(org_id, updates)
         
         logger.info("\n✅ Quick demo completed successfully!")
     
-    def run_comprehensive_demo(self, org_id: Optional[int] = None, user_id: Optional[int] = None):
+    async def run_comprehensive_demo(self, org_id: Optional[int] = None, user_id: Optional[int] = None):
         """Run a comprehensive demonstration."""
         logger.info("🚀 Starting Team Management Comprehensive Demo")
         
         # Authenticate
-        if not self.authenticate():
+        if not await self.authenticate():
             logger.error("❌ Authentication failed")
             return
         
         # Use provided org_id or create new organization
         if org_id:
             self.organization_id = org_id
-            logger.info(f"Using existing organization ID: {org_id}")
+            logger.info("Using existing organization ID: %s", org_id)
         else:
             # Create organization
             logger.info("\n🏢 Creating organization...")
-            org = self.create_organization(DEMO_ORGANIZATION)
+            org = await self.create_organization_with_members(DEMO_ORGANIZATION)
             if not org:
                 logger.error("❌ Failed to create organization")
                 return
@@ -398,30 +517,33 @@ class TeamManagementDemo:
         # Comprehensive organization management
         logger.info("\n📊 Comprehensive organization management...")
         
-        # Get organization details
-        org_details = self.get_organization(org_id)
+        # Fetch organization details while the member list streams in
+        org_task = asyncio.create_task(self.get_organization(org_id))
+        
+        # Members are logged as they are parsed and counted afterwards
+        logger.info("\nOrganization members:")
+        member_count = 0
+        async for member in self.iter_organization_members(org_id):
+            member_count += 1
+            logger.info("  - %s (%s) - %s", member['user_name'], member['user_email'], member['role_name'])
+        logger.info("Organization has %s members", member_count)
+        
+        org_details = await org_task
         if org_details:
-            logger.info(f"Organization: {org_details['name']}")
-            logger.info(f"Description: {org_details['description']}")
-            logger.info(f"Owner ID: {org_details['owner_id']}")
-            logger.info(f"Active: {org_details['is_active']}")
-        
-        # Get organization members
-        members = self.get_organization_members(org_id)
-        if members:
-            logger.info(f"\nOrganization has {len(members)} members:")
-            for member in members:
-                logger.info(f"  - {member['user_name']} ({member['user_email']}) - {member['role_name']}")
+            logger.info("Organization: %s", org_details['name'])
+            logger.info("Description: %s", org_details['description'])
+            logger.info("Owner ID: %s", org_details['owner_id'])
+            logger.info("Active: %s", org_details['is_active'])
         
         # Add member if user_id provided
         if user_id:
-            logger.info(f"\n👤 Adding user {user_id} as member...")
+            logger.info("\n👤 Adding user %s as member...", user_id)
             member_data = {"user_id": user_id, "role_name": "member"}
-            self.add_member(org_id, member_data)
+            await self.add_member(org_id, member_data)
             
             # Update member role
-            logger.info(f"\n🔄 Updating user {user_id} role to viewer...")
-            self.update_member_role(org_id, user_id, "viewer")
+            logger.info("\n🔄 Updating user %s role to viewer...", user_id)
+            await self.update_member_role(org_id, user_id, "viewer")
         
         # Create multiple invitations
         logger.info("\n📧 Creating multiple invitations...")
@@ -431,15 +553,15 @@ class TeamManagementDemo:
             {"email": "viewer@demo.com", "role_name": "viewer"}
         ]
         
-        for invitation in invitations:
-            self.create_invitation(org_id, invitation)
+        await asyncio.gather(*(self.create_invitation(org_id, invitation) for invitation in invitations))
         
         # Get pending invitations
-        pending = self.get_pending_invitations(org_id)
-        if pending:
-            logger.info(f"\nPending invitations ({len(pending)}):")
-            for invitation in pending:
-                logger.info(f"  - {invitation['email']} as {invitation['role_name']}")
+        logger.info("\nPending invitations:")
+        pending_count = 0
+        async for invitation in self.iter_pending_invitations(org_id):
+            pending_count += 1
+            logger.info("  - %s as %s", invitation['email'], invitation['role_name'])
+        logger.info("%s pending invitations", pending_count)
         
         # Check all permissions
         logger.info("\n🔐 Checking all permissions...")
@@ -453,38 +575,53 @@ class TeamManagementDemo:
             "trigger:create", "trigger:read", "trigger:update", "trigger:delete"
         ]
         
-        permission_results = {}
-        for permission in all_permissions:
-            result = self.check_permission(permission)
-            if result:
-                permission_results[permission] = result['has_permission']
+        permission_results = await self.check_permissions(all_permissions)
+        if permission_results is None:
+            # Server without the batch endpoint: check each permission concurrently
+            results = await asyncio.gather(*(self.check_permission(permission) for permission in all_permissions))
+            permission_results = {
+                permission: result['has_permission']
+                for permission, result in zip(all_permissions, results)
+                if result
+            }
         
-        # Display permission summary
-        logger.info("\n📋 Permission Summary:")
-        for permission, has_perm in permission_results.items():
-            status = "✅" if has_perm else "❌"
-            logger.info(f"  {status} {permission}")
+        # Display permission summary (skipped entirely when INFO is disabled)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("\n📋 Permission Summary:")
+            for permission, has_perm in permission_results.items():
+                logger.info("  %s %s", "✅" if has_perm else "❌", permission)
         
         # Get organization statistics
-        stats = self.get_organization_stats(org_id)
+        stats = await self.get_organization_stats(org_id)
         if stats:
-            logger.info(f"\n📈 Organization Statistics:")
-            logger.info(f"  Total Members: {stats['total_members']}")
-            logger.info(f"  Active Members: {stats['active_members']}")
-            logger.info(f"  Pending Invitations: {stats['pending_invitations']}")
-            logger.info(f"  Total Bots: {stats['total_bots']}")
-            logger.info(f"  Active Bots: {stats['active_bots']}")
+            logger.info("\n📈 Organization Statistics:")
+            logger.info("  Total Members: %s", stats['total_members'])
+            logger.info("  Active Members: %s", stats['active_members'])
+            logger.info("  Pending Invitations: %s", stats['pending_invitations'])
+            logger.info("  Total Bots: %s", stats['total_bots'])
+            logger.info("  Active Bots: %s", stats['active_bots'])
         
         # Update organization
         logger.info("\n✏️ Updating organization...")
         updates = {
-            "description": f"Updated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            "description": f"Updated at {time.strftime('%Y-%m-%d %H:%M:%S')}"
         }
-        self.update_organization(org_id, updates)
+        await self.update_organization(org_id, updates)
         
         logger.info("\n✅ Comprehensive demo completed successfully!")
 
 
+async def run_demo(demo: TeamManagementDemo, args):
+    """Run the selected demo and close the HTTP client afterwards."""
+    try:
+        if args.quick:
+            await demo.run_quick_demo()
+        else:
+            await demo.run_comprehensive_demo(args.org_id, args.user_id)
+    finally:
+        await demo.aclose()
+
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Team Management Demo")
@@ -492,21 +629,19 @@ def main():
     parser.add_argument("--org-id", type=int, help="Organization ID for comprehensive demo")
     parser.add_argument("--user-id", type=int, help="User ID to add as member")
     parser.add_argument("--base-url", default=BASE_URL, help="Base URL for API")
+    parser.add_argument("--no-cache", action="store_true", help="Always log in instead of reusing a cached access token")
     
     args = parser.parse_args()
     
     # Create demo instance
-    demo = TeamManagementDemo(args.base_url)
+    demo = TeamManagementDemo(args.base_url, use_token_cache=not args.no_cache)
     
     try:
-        if args.quick:
-            demo.run_quick_demo()
-        else:
-            demo.run_comprehensive_demo(args.org_id, args.user_id)
+        asyncio.run(run_demo(demo, args))
     except KeyboardInterrupt:
         logger.info("\n⏹️ Demo interrupted by user")
     except Exception as e:
-        logger.error(f"❌ Demo failed: {e}")
+        logger.error("❌ Demo failed: %s", e)
         sys.exit(1)
 
 
@@ -3,10 +3,15 @@
 Example script demonstrating Automation Triggers usage with ChatBoost backend.
 """
 
+import ijson
+import orjson
 import requests
 import json
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configuration
 BASE_URL = "http://localhost:8000"
@@ -14,6 +19,35 @@ BOT_ID = 1
 FLOW_ID = 1
 TEST_PHONE = "1234567890"
 
+# Endpoint URLs are built once here rather than on every call
+TRIGGERS_URL = f"{BASE_URL}/triggers/"
+TRIGGER_STATISTICS_URL = f"{BASE_URL}/triggers/statistics"
+TRIGGER_TEST_FMT = (BASE_URL + "/triggers/{}/test").format
+TRIGGER_LOGS_FMT = (BASE_URL + "/triggers/{}/logs").format
+WEBHOOK_URL = f"{BASE_URL}/whatsapp/webhook"
+BOT_URL = f"{BASE_URL}/bots/{BOT_ID}"
+
+# One pooled keep-alive session for every request to the API; transient
+# gateway errors on idempotent calls are retried instead of failing the step
+SESSION = requests.Session()
+# Request bodies are pre-encoded with orjson and sent as data=
+SESSION.headers["Content-Type"] = "application/json"
+ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "PUT"])
+    )
+)
+SESSION.mount("http://", ADAPTER)
+SESSION.mount("https://", ADAPTER)
+
+# Independent API calls run concurrently on the shared session
+MAX_WORKERS = 8
+
 
 def create_keyword_trigger() -> Dict[str, Any]:
     """Create a keyword trigger."""
@@ -29,9 +63,9 @@ def create_keyword_trigger() -> Dict[str, Any]:
         "is_active": True
     }
     
-    response = requests.post(f"{BASE_URL}/triggers/", json=trigger_data)
+    response = SESSION.post(TRIGGERS_URL, data=orjson.dumps(trigger_data))
     if response.status_code == 201:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error creating keyword trigger: {response.text}")
         return {}
@@ -50,9 +84,9 @@ def create_event_trigger() -> Dict[str, Any]:
         "is_active": True
     }
     
-    response = requests.post(f"{BASE_URL}/triggers/", json=trigger_data)
+    response = SESSION.post(TRIGGERS_URL, data=orjson.dumps(trigger_data))
     if response.status_code == 201:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error creating event trigger: {response.text}")
         return {}
@@ -72,9 +106,9 @@ def create_schedule_trigger() -> Dict[str, Any]:
         "is_active": True
     }
     
-    response = requests.post(f"{BASE_URL}/triggers/", json=trigger_data)
+    response = SESSION.post(TRIGGERS_URL, data=orjson.dumps(trigger_data))
     if response.status_code == 201:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error creating schedule trigger: {response.text}")
         return {}
@@ -86,9 +120,9 @@ def test_keyword_trigger(trigger_id: int, test_message: str) -> Dict[str, Any]:
         "test_message": test_message
     }
     
-    response = requests.post(f"{BASE_URL}/triggers/{trigger_id}/test", json=test_data)
+    response = SESSION.post(TRIGGER_TEST_FMT(trigger_id), data=orjson.dumps(test_data))
     if response.status_code == 200:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error testing keyword trigger: {response.text}")
         return {}
@@ -96,117 +130,190 @@ def test_keyword_trigger(trigger_id: int, test_message: str) -> Dict[str, Any]:
 
 def get_trigger_statistics() -> Dict[str, Any]:
     """Get trigger statistics."""
-    response = requests.get(f"{BASE_URL}/triggers/statistics")
+    response = SESSION.get(TRIGGER_STATISTICS_URL)
     if response.status_code == 200:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error getting trigger statistics: {response.text}")
         return {}
 
 
-def get_trigger_logs(trigger_id: int) -> list:
-    """Get trigger execution logs."""
-    response = requests.get(f"{BASE_URL}/triggers/{trigger_id}/logs")
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error getting trigger logs: {response.text}")
-        return []
+def iter_trigger_logs(trigger_id: int) -> Iterator[Dict[str, Any]]:
+    """Stream trigger execution logs one entry at a time instead of buffering the page."""
+    with SESSION.get(TRIGGER_LOGS_FMT(trigger_id), stream=True) as response:
+        if response.status_code != 200:
+            print(f"Error getting trigger logs: {response.text}")
+            return
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, "logs.item")
+
+
+def wait_for_logs(trigger_id: int, expected: int, timeout: float = 3.0, keep: int = 3) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Poll the trigger logs until `expected` entries exist or `timeout` seconds pass.
+    
+    Returns the number of log entries and the first `keep` of them.
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        count = 0
+        first_logs = []
+        for log in iter_trigger_logs(trigger_id):
+            if count < keep:
+                first_logs.append(log)
+            count += 1
+        if count >= expected or time.monotonic() >= deadline:
+            return count, first_logs
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, 0.5)
 
 
 def get_all_triggers() -> list:
     """Get all triggers."""
-    response = requests.get(f"{BASE_URL}/triggers/")
+    response = SESSION.get(TRIGGERS_URL)
     if response.status_code == 200:
-        return response.json()
+        return orjson.loads(response.content)
     else:
         print(f"Error getting triggers: {response.text}")
         return []
 
 
-def simulate_incoming_message(phone: str, message: str) -> Dict[str, Any]:
-    """Simulate an incoming WhatsApp message."""
-    # This would normally come from WhatsApp webhook
-    message_data = {
-        "from": phone,
-        "text": {"body": message},
-        "type": "text",
-        "id": f"test_msg_{int(time.time())}"
+def get_bot_phone_number_id() -> Optional[str]:
+    """Get the WhatsApp phone number id the webhook uses to find the demo bot."""
+    response = SESSION.get(BOT_URL)
+    if response.status_code != 200:
+        print(f"Error getting bot: {response.text}")
+        return None
+    bot = orjson.loads(response.content)
+    if not bot.get("is_whatsapp_enabled"):
+        return None
+    return bot.get("whatsapp_phone_number_id")
+
+
+def simulate_incoming_messages(phone: str, messages: List[str], phone_number_id: str) -> bool:
+    """
+    Simulate incoming WhatsApp messages, delivered together in one webhook call.
+    
+    Returns whether the webhook accepted them.
+    """
+    # WhatsApp batches messages the same way: one payload, many entries in value.messages
+    timestamp = str(int(time.time()))
+    message_data = [
+        {
+            "from": phone,
+            "id": f"test_msg_{time.time_ns()}_{index}",
+            "timestamp": timestamp,
+            "type": "text",
+            "text": {"body": message}
+        }
+        for index, message in enumerate(messages)
+    ]
+    payload = {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": str(BOT_ID),
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    # The webhook finds the receiving bot by this id
+                    "metadata": {"phone_number_id": phone_number_id},
+                    "messages": message_data
+                }
+            }]
+        }]
     }
     
-    # In a real scenario, this would be handled by the WhatsApp webhook
-    print(f"Simulating incoming message from {phone}: '{message}'")
-    return message_data
+    for message in messages:
+        print(f"Simulating incoming message from {phone}: '{message}'")
+    
+    response = SESSION.post(WEBHOOK_URL, data=orjson.dumps(payload))
+    if response.status_code != 200:
+        print(f"Error delivering simulated messages: {response.text}")
+        return False
+    return True
 
 
 def main():
     """Main function to demonstrate trigger system usage."""
+    with SESSION, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        run_demo(executor)
+
+
+def run_demo(executor: ThreadPoolExecutor):
+    """Run the trigger demo steps."""
     print("🚀 ChatBoost Automation Triggers Demo")
     print("=" * 50)
     
-    # Step 1: Create keyword trigger
-    print("\n1. Creating keyword trigger...")
-    keyword_trigger = create_keyword_trigger()
+    # Steps 1-3: Create the keyword, event and schedule triggers concurrently
+    print("\n1-3. Creating keyword, event and schedule triggers...")
+    phone_number_id_future = executor.submit(get_bot_phone_number_id)
+    keyword_trigger, event_trigger, schedule_trigger = executor.map(
+        lambda create: create(),
+        [create_keyword_trigger, create_event_trigger, create_schedule_trigger]
+    )
+    
     if keyword_trigger:
         keyword_trigger_id = keyword_trigger.get("id")
         print(f"✅ Keyword trigger created with ID: {keyword_trigger_id}")
     else:
         print("❌ Failed to create keyword trigger")
-        return
     
-    # Step 2: Create event trigger
-    print("\n2. Creating event trigger...")
-    event_trigger = create_event_trigger()
     if event_trigger:
-        event_trigger_id = event_trigger.get("id")
-        print(f"✅ Event trigger created with ID: {event_trigger_id}")
+        print(f"✅ Event trigger created with ID: {event_trigger.get('id')}")
     else:
         print("❌ Failed to create event trigger")
     
-    # Step 3: Create schedule trigger
-    print("\n3. Creating schedule trigger...")
-    schedule_trigger = create_schedule_trigger()
     if schedule_trigger:
-        schedule_trigger_id = schedule_trigger.get("id")
-        print(f"✅ Schedule trigger created with ID: {schedule_trigger_id}")
+        print(f"✅ Schedule trigger created with ID: {schedule_trigger.get('id')}")
     else:
         print("❌ Failed to create schedule trigger")
     
-    # Step 4: Test keyword trigger
-    print(f"\n4. Testing keyword trigger with 'hello'...")
-    test_result = test_keyword_trigger(keyword_trigger_id, "hello")
-    if test_result:
-        print(f"✅ Test result: {test_result}")
+    if not keyword_trigger:
+        return
     
-    # Step 5: Test with non-matching message
-    print(f"\n5. Testing keyword trigger with 'goodbye'...")
-    test_result = test_keyword_trigger(keyword_trigger_id, "goodbye")
-    if test_result:
-        print(f"✅ Test result: {test_result}")
+    # Steps 4-5: Test keyword trigger with a matching and a non-matching message
+    print(f"\n4-5. Testing keyword trigger with 'hello' and 'goodbye'...")
+    test_messages = ["hello", "goodbye"]
+    test_results = executor.map(lambda message: test_keyword_trigger(keyword_trigger_id, message), test_messages)
+    for message, test_result in zip(test_messages, test_results):
+        if test_result:
+            print(f"✅ Test result for '{message}': {test_result}")
     
     # Step 6: Simulate incoming messages
     print(f"\n6. Simulating incoming messages...")
     test_messages = ["hi", "hello", "hey", "start", "help", "goodbye"]
     
-    for message in test_messages:
-        simulate_incoming_message(TEST_PHONE, message)
-        time.sleep(1)  # Small delay between messages
+    phone_number_id = phone_number_id_future.result()
+    if phone_number_id:
+        delivered = simulate_incoming_messages(TEST_PHONE, test_messages, phone_number_id)
+    else:
+        print(f"⚠️ Bot {BOT_ID} has no WhatsApp phone number id configured, skipping webhook delivery")
+        delivered = False
     
-    # Step 7: Wait for processing
+    # Step 10 only lists the triggers, so fetch it while waiting on the logs
+    triggers_future = executor.submit(get_all_triggers)
+    
+    # Step 7: Wait for processing, returning as soon as the matching messages are logged
     print(f"\n7. Waiting for message processing...")
-    time.sleep(3)
+    keywords = keyword_trigger.get("keywords", [])
+    expected = sum(1 for message in test_messages if message in keywords) if delivered else 0
+    log_count, first_logs = wait_for_logs(keyword_trigger_id, expected)
+    
+    # Step 9 counts executions, so it must not start before the logs are in
+    stats_future = executor.submit(get_trigger_statistics)
     
     # Step 8: Check trigger logs
     print(f"\n8. Checking trigger logs...")
-    logs = get_trigger_logs(keyword_trigger_id)
-    if logs:
-        print(f"✅ Found {len(logs.get('logs', []))} log entries")
-        for log in logs.get('logs', [])[:3]:  # Show first 3 logs
+    if log_count:
+        print(f"✅ Found {log_count} log entries")
+        for log in first_logs:  # Show first 3 logs
             print(f"  - {log.get('triggered_at')}: {log.get('matched_value')} - {log.get('success')}")
     
     # Step 9: Get trigger statistics
     print(f"\n9. Getting trigger statistics...")
-    stats = get_trigger_statistics()
+    stats = stats_future.result()
     if stats:
         print(f"✅ Trigger statistics:")
         print(f"  - Total triggers: {stats.get('total_triggers')}")
@@ -219,7 +326,7 @@ def main():
     
     # Step 10: Get all triggers
     print(f"\n10. Getting all triggers...")
-    triggers = get_all_triggers()
+    triggers = triggers_future.result()
     if triggers:
         print(f"✅ Found {len(triggers.get('triggers', []))} triggers:")
         for trigger in triggers.get('triggers', []):
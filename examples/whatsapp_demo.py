@@ -3,7 +3,8 @@
 Example script demonstrating WhatsApp API usage with ChatBoost backend.
 """
 
-import requests
+import asyncio
+import httpx
 import json
 from typing import Dict, Any
 
@@ -18,7 +19,7 @@ WHATSAPP_BUSINESS_ACCOUNT_ID = "1263163798895472"
 TEST_PHONE_NUMBER = "923127921278"  # From your example
 
 
-def create_bot_with_whatsapp_credentials() -> Dict[str, Any]:
+async def create_bot_with_whatsapp_credentials(client: httpx.AsyncClient) -> Dict[str, Any]:
     """Create a bot with WhatsApp credentials."""
     bot_data = {
         "name": "WhatsApp Test Bot",
@@ -29,7 +30,7 @@ def create_bot_with_whatsapp_credentials() -> Dict[str, Any]:
         "whatsapp_business_account_id": WHATSAPP_BUSINESS_ACCOUNT_ID
     }
     
-    response = requests.post(f"{BASE_URL}/bots/", json=bot_data)
+    response = await client.post(f"{BASE_URL}/bots/", json=bot_data)
     if response.status_code == 201:
         return response.json()
     else:
@@ -37,7 +38,7 @@ def create_bot_with_whatsapp_credentials() -> Dict[str, Any]:
         return {}
 
 
-def send_template_message(bot_id: int, to: str) -> Dict[str, Any]:
+async def send_template_message(client: httpx.AsyncClient, bot_id: int, to: str) -> Dict[str, Any]:
     """Send a template message."""
     message_data = {
         "to": to,
@@ -45,7 +46,7 @@ def send_template_message(bot_id: int, to: str) -> Dict[str, Any]:
         "language_code": "en_US"
     }
     
-    response = requests.post(
+    response = await client.post(
         f"{BASE_URL}/whatsapp/send/template?bot_id={bot_id}",
         json=message_data
     )
@@ -57,14 +58,14 @@ def send_template_message(bot_id: int, to: str) -> Dict[str, Any]:
         return {}
 
 
-def send_text_message(bot_id: int, to: str, text: str) -> Dict[str, Any]:
+async def send_text_message(client: httpx.AsyncClient, bot_id: int, to: str, text: str) -> Dict[str, Any]:
     """Send a text message."""
     message_data = {
         "to": to,
         "text": text
     }
     
-    response = requests.post(
+    response = await client.post(
         f"{BASE_URL}/whatsapp/send/text?bot_id={bot_id}",
         json=message_data
     )
@@ -76,9 +77,9 @@ def send_text_message(bot_id: int, to: str, text: str) -> Dict[str, Any]:
         return {}
 
 
-def get_message_history(bot_id: int) -> Dict[str, Any]:
+async def get_message_history(client: httpx.AsyncClient, bot_id: int) -> Dict[str, Any]:
     """Get message history for a bot."""
-    response = requests.get(f"{BASE_URL}/whatsapp/messages/{bot_id}")
+    response = await client.get(f"{BASE_URL}/whatsapp/messages/{bot_id}")
     
     if response.status_code == 200:
         return response.json()
@@ -89,12 +90,24 @@ def get_message_history(bot_id: int) -> Dict[str, Any]:
 
 def main():
     """Main function to demonstrate WhatsApp API usage."""
+    asyncio.run(run_demo())
+
+
+async def run_demo():
+    """Run the demo steps on one kept-alive HTTP client."""
+    limits = httpx.Limits(max_connections=10, keepalive_expiry=30)
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        await run_demo_steps(client)
+
+
+async def run_demo_steps(client: httpx.AsyncClient):
+    """Create the bot, send both messages concurrently, then read the history."""
     print("🚀 ChatBoost WhatsApp API Demo")
     print("=" * 50)
     
     # Step 1: Create a bot with WhatsApp credentials
     print("\n1. Creating bot with WhatsApp credentials...")
-    bot = create_bot_with_whatsapp_credentials()
+    bot = await create_bot_with_whatsapp_credentials(client)
     if bot:
         bot_id = bot.get("id")
         print(f"✅ Bot created with ID: {bot_id}")
@@ -102,17 +115,17 @@ def main():
         print("❌ Failed to create bot")
         return
     
-    # Step 2: Send a template message
-    print(f"\n2. Sending template message to {TEST_PHONE_NUMBER}...")
-    template_result = send_template_message(bot_id, TEST_PHONE_NUMBER)
+    # Steps 2-3: Send the template and text messages concurrently
+    print(f"\n2-3. Sending template and text messages to {TEST_PHONE_NUMBER}...")
+    template_result, text_result = await asyncio.gather(
+        send_template_message(client, bot_id, TEST_PHONE_NUMBER),
+        send_text_message(client, bot_id, TEST_PHONE_NUMBER, "Hello from ChatBoost! 🚀")
+    )
     if template_result:
         print(f"✅ Template message sent: {template_result}")
     else:
         print("❌ Failed to send template message")
     
-    # Step 3: Send a text message
-    print(f"\n3. Sending text message to {TEST_PHONE_NUMBER}...")
-    text_result = send_text_message(bot_id, TEST_PHONE_NUMBER, "Hello from ChatBoost! 🚀")
     if text_result:
         print(f"✅ Text message sent: {text_result}")
     else:
@@ -120,7 +133,7 @@ def main():
     
     # Step 4: Get message history
     print(f"\n4. Getting message history for bot {bot_id}...")
-    history = get_message_history(bot_id)
+    history = await get_message_history(client, bot_id)
     if history:
         print(f"✅ Message history retrieved: {len(history.get('messages', []))} messages")
         print(f"Total messages: {history.get('total', 0)}")
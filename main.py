@@ -81,5 +81,19 @@ async def health_check():
 
 
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # One worker process per core (2n + 1) unless WEB_CONCURRENCY says otherwise;
+    # multiple workers need the app passed as an import string
+    workers = int(os.getenv("WEB_CONCURRENCY", "0")) or (os.cpu_count() or 1) * 2 + 1
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        # C event loop and HTTP parser; uvloop does not support Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
@@ -3,7 +3,7 @@ Migration script to fix incomplete flow nodes in the database.
 Run this once before deploying the strict validation changes.
 
 Usage:
-    python scripts/fix_incomplete_nodes.py
+    python scripts/fix_incomplete_nodes.py [--quiet]
 
 This script will:
 1. Query all flows from database
@@ -14,6 +14,8 @@ This script will:
 6. Generate report of changes
 """
 
+import argparse
+import copy
 import logging
 import sys
 import os
@@ -23,6 +25,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from src.shared.database import SessionLocal
 from src.shared.models.bot_builder import BotFlow
@@ -38,22 +41,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Flows are loaded and their fixes written in batches of this size
+BATCH_SIZE = 500
+
+# Fields a node type cannot be fixed without; a node missing one is left for manual review
+REQUIRED_FIELDS = {
+    "condition": ("variable",),
+    "webhook_action": ("url",),
+    "set_attribute": ("attribute_key",),
+}
+
+# (field, default, log description) filled in per node type when missing
+NODE_DEFAULTS = {
+    "send_message": (
+        ("message_type", "text", "to 'text'"),
+        ("content", {"text": ""}, "default"),
+        ("next", None, "to None"),
+    ),
+    "wait": (
+        ("duration", 1, "to 1"),
+        ("unit", "seconds", "to 'seconds'"),
+        ("next", None, "to None"),
+    ),
+    "condition": (
+        ("operator", "==", "to '=='"),
+        ("value", "", "to empty string"),
+        ("true_path", None, "to None"),
+        ("false_path", None, "to None"),
+    ),
+    "webhook_action": (
+        ("method", "POST", "to 'POST'"),
+        ("next", None, "to None"),
+    ),
+    "set_attribute": (
+        ("attribute_value", "", "to empty string"),
+        ("next", None, "to None"),
+    ),
+}
+
+# Fields that are also replaced when present but empty
+FILL_IF_EMPTY = {"content"}
+
+
+def iter_flows(db: Session):
+    """
+    Yield every flow, loading BATCH_SIZE rows at a time in id order.
+    
+    Each batch is expunged before the next one is loaded, so only one
+    batch of flows is held in memory at once.
+    """
+    last_id = 0
+    while True:
+        batch = (
+            db.query(BotFlow)
+            .filter(BotFlow.id > last_id)
+            .order_by(BotFlow.id)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1].id
+        db.expunge_all()
+
+
+def write_batch(db: Session, updates: list):
+    """Write one batch of fixed flow structures and commit it."""
+    db.bulk_update_mappings(BotFlow, updates)
+    db.commit()
+    updates.clear()
+
 
 def fix_incomplete_nodes():
     """Fix nodes missing required fields."""
-    db = SessionLocal()
+    # Batch commits must not expire the rest of the loaded batch
+    db = SessionLocal(expire_on_commit=False)
     
     try:
-        flows = db.query(BotFlow).all()
+        total_flows = db.query(func.count(BotFlow.id)).scalar()
         fixed_count = 0
         error_count = 0
         flows_modified = 0
+        # Fixed structures are written BATCH_SIZE at a time in one bulk UPDATE and commit
+        updates = []
         
-        logger.info(f"Starting migration for {len(flows)} flows")
+        logger.info("Starting migration for %s flows", total_flows)
         
-        for flow in flows:
+        for flow in iter_flows(db):
             if not flow.structure:
-                logger.warning(f"Flow {flow.id}: Empty structure, skipping")
+                logger.warning("Flow %s: Empty structure, skipping", flow.id)
                 continue
             
             modified = False
@@ -64,7 +141,7 @@ def fix_incomplete_nodes():
                 
                 # Check and fix missing type
                 if "type" not in node or not node.get("type"):
-                    logger.warning(f"Flow {flow.id}, Node {idx}: Missing type, setting to 'send_message'")
+                    logger.warning("Flow %s, Node %s: Missing type, setting to 'send_message'", flow.id, idx)
                     node["type"] = "send_message"
                     node_fixes.append("added_type")
                     modified = True
@@ -72,7 +149,7 @@ def fix_incomplete_nodes():
                 
                 # Check and fix missing config
                 if "config" not in node or not node.get("config"):
-                    logger.error(f"Flow {flow.id}, Node {idx}: Missing config - MANUAL REVIEW NEEDED")
+                    logger.error("Flow %s, Node %s: Missing config - MANUAL REVIEW NEEDED", flow.id, idx)
                     flow_errors.append(f"Node {idx}: Missing config field")
                     error_count += 1
                     continue
@@ -82,146 +159,46 @@ def fix_incomplete_nodes():
                 node_type = node["type"]
                 
                 # Type-specific validation and fixes
-                if node_type == "send_message":
-                    if "message_type" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing message_type, setting to 'text'")
-                        config["message_type"] = "text"
-                        node_fixes.append("added_message_type")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "content" not in config or not config.get("content"):
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing content, setting default")
-                        config["content"] = {"text": ""}
-                        node_fixes.append("added_content")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "next" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing next, setting to None")
-                        config["next"] = None
-                        node_fixes.append("added_next")
-                        modified = True
-                        fixed_count += 1
-                
-                elif node_type == "wait":
-                    if "duration" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing duration, setting to 1")
-                        config["duration"] = 1
-                        node_fixes.append("added_duration")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "unit" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing unit, setting to 'seconds'")
-                        config["unit"] = "seconds"
-                        node_fixes.append("added_unit")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "next" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing next, setting to None")
-                        config["next"] = None
-                        node_fixes.append("added_next")
-                        modified = True
-                        fixed_count += 1
-                
-                elif node_type == "condition":
-                    if "variable" not in config:
-                        logger.error(f"Flow {flow.id}, Node {idx}: Missing variable - MANUAL REVIEW NEEDED")
-                        flow_errors.append(f"Node {idx}: Missing variable field")
-                        error_count += 1
-                        continue
-                    
-                    if "operator" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing operator, setting to '=='")
-                        config["operator"] = "=="
-                        node_fixes.append("added_operator")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "value" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing value, setting to empty string")
-                        config["value"] = ""
-                        node_fixes.append("added_value")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "true_path" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing true_path, setting to None")
-                        config["true_path"] = None
-                        node_fixes.append("added_true_path")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "false_path" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing false_path, setting to None")
-                        config["false_path"] = None
-                        node_fixes.append("added_false_path")
-                        modified = True
-                        fixed_count += 1
-                
-                elif node_type == "webhook_action":
-                    if "url" not in config:
-                        logger.error(f"Flow {flow.id}, Node {idx}: Missing url - MANUAL REVIEW NEEDED")
-                        flow_errors.append(f"Node {idx}: Missing url field")
-                        error_count += 1
-                        continue
-                    
-                    if "method" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing method, setting to 'POST'")
-                        config["method"] = "POST"
-                        node_fixes.append("added_method")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "next" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing next, setting to None")
-                        config["next"] = None
-                        node_fixes.append("added_next")
-                        modified = True
-                        fixed_count += 1
+                missing = next((field for field in REQUIRED_FIELDS.get(node_type, ()) if field not in config), None)
+                if missing:
+                    logger.error("Flow %s, Node %s: Missing %s - MANUAL REVIEW NEEDED", flow.id, idx, missing)
+                    flow_errors.append(f"Node {idx}: Missing {missing} field")
+                    error_count += 1
+                    continue
                 
-                elif node_type == "set_attribute":
-                    if "attribute_key" not in config:
-                        logger.error(f"Flow {flow.id}, Node {idx}: Missing attribute_key - MANUAL REVIEW NEEDED")
-                        flow_errors.append(f"Node {idx}: Missing attribute_key field")
-                        error_count += 1
+                for field, default, description in NODE_DEFAULTS.get(node_type, ()):
+                    if field in config and (field not in FILL_IF_EMPTY or config[field]):
                         continue
-                    
-                    if "attribute_value" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing attribute_value, setting to empty string")
-                        config["attribute_value"] = ""
-                        node_fixes.append("added_attribute_value")
-                        modified = True
-                        fixed_count += 1
-                    
-                    if "next" not in config:
-                        logger.warning(f"Flow {flow.id}, Node {idx}: Missing next, setting to None")
-                        config["next"] = None
-                        node_fixes.append("added_next")
-                        modified = True
-                        fixed_count += 1
+                    logger.warning("Flow %s, Node %s: Missing %s, setting %s", flow.id, idx, field, description)
+                    config[field] = copy.deepcopy(default)
+                    node_fixes.append(f"added_{field}")
+                    modified = True
+                    fixed_count += 1
                 
                 if node_fixes:
-                    logger.info(f"Flow {flow.id}, Node {idx}: Applied fixes: {', '.join(node_fixes)}")
+                    logger.info("Flow %s, Node %s: Applied fixes: %s", flow.id, idx, ', '.join(node_fixes))
             
             if flow_errors:
-                logger.error(f"Flow {flow.id}: Errors requiring manual review: {flow_errors}")
+                logger.error("Flow %s: Errors requiring manual review: %s", flow.id, flow_errors)
             
             if modified:
-                db.commit()
+                updates.append({"id": flow.id, "structure": flow.structure})
                 flows_modified += 1
-                logger.info(f"Flow {flow.id}: Updated with fixes")
+                logger.info("Flow %s: Queued for update with fixes", flow.id)
+                if len(updates) >= BATCH_SIZE:
+                    write_batch(db, updates)
         
-        logger.info(f"Migration complete:")
-        logger.info(f"  - {fixed_count} fixes applied")
-        logger.info(f"  - {error_count} errors need manual review")
-        logger.info(f"  - {flows_modified} flows modified")
+        if updates:
+            write_batch(db, updates)
+        
+        logger.info("Migration complete:")
+        logger.info("  - %s fixes applied", fixed_count)
+        logger.info("  - %s errors need manual review", error_count)
+        logger.info("  - %s flows modified", flows_modified)
         
         # Generate summary report
         report = {
-            "total_flows": len(flows),
+            "total_flows": total_flows,
             "flows_modified": flows_modified,
             "total_fixes": fixed_count,
             "errors_requiring_review": error_count,
@@ -234,7 +211,7 @@ def fix_incomplete_nodes():
         logger.info("Migration report saved to migration_report.json")
     
     except Exception as e:
-        logger.error(f"Migration failed: {str(e)}")
+        logger.error("Migration failed: %s", e)
         db.rollback()
         raise
     
@@ -243,9 +220,15 @@ def fix_incomplete_nodes():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fix incomplete flow nodes")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
+    args = parser.parse_args()
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    
     try:
         fix_incomplete_nodes()
         logger.info("Migration completed successfully")
     except Exception as e:
-        logger.error(f"Migration failed: {str(e)}")
+        logger.error("Migration failed: %s", e)
         sys.exit(1)
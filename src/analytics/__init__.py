@@ -4,7 +4,13 @@ Analytics module for ChatBoost backend.
 
 from .crud import (
     aggregate_daily_stats,
+    aggregate_daily_stats_async,
+    daily_stats_query,
     get_daily_stats,
+    summarize_daily_stats,
+    count_active_contacts,
+    estimate_active_contacts,
+    period_active_contacts,
     get_overview_stats,
     calculate_delivery_rate,
     get_active_contacts_count,
@@ -12,6 +18,7 @@ from .crud import (
     get_flow_completion_rate,
     calculate_trends,
     aggregate_hourly_stats,
+    rebuild_rollups,
     cleanup_old_stats
 )
 
@@ -26,7 +33,13 @@ from .tasks import (
 __all__ = [
     # CRUD operations
     "aggregate_daily_stats",
+    "aggregate_daily_stats_async",
+    "daily_stats_query",
     "get_daily_stats", 
+    "summarize_daily_stats",
+    "count_active_contacts",
+    "estimate_active_contacts",
+    "period_active_contacts",
     "get_overview_stats",
     "calculate_delivery_rate",
     "get_active_contacts_count",
@@ -34,6 +47,7 @@ __all__ = [
     "get_flow_completion_rate",
     "calculate_trends",
     "aggregate_hourly_stats",
+    "rebuild_rollups",
     "cleanup_old_stats",
     
     # Celery tasks
@@ -4,33 +4,54 @@ Caching layer for analytics data using Redis.
 
 import json
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import orjson
 import redis
-from config.settings import settings
+from fastapi import Response
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timedelta
+from ..shared.redis_client import get_redis_client as get_shared_redis_client
+from ..shared.schemas.analytics import AnalyticsOverviewResponse
 
 logger = logging.getLogger(__name__)
 
-# Redis connection
-redis_client = None
+# Shared client over the process-wide connection pool. Creating it does not
+# connect, so hot paths use it directly; failures surface per command.
+redis_client = get_shared_redis_client()
+
+# SCAN page size and maximum keys per UNLINK command
+SCAN_COUNT = 500
+UNLINK_CHUNK_SIZE = 1000
+
+# Every cached key is also recorded in a per-bot index set, so invalidation
+# can delete exactly the keys that were written instead of scanning for them.
+# The registry set lists the index sets themselves.
+INDEX_REGISTRY_KEY = "analytics:indexes"
+INDEX_TTL = 900  # longest TTL of any analytics entry
 
 def get_redis_client():
-    """Get Redis client instance."""
-    global redis_client
-    if redis_client is None:
-        try:
-            redis_client = redis.from_url(settings.REDIS_URL)
-            # Test connection
-            redis_client.ping()
-            logger.info("Redis connection established for analytics caching")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            redis_client = None
-    return redis_client
+    """Get the Redis client if the server is reachable (used for health checks)."""
+    try:
+        redis_client.ping()
+        return redis_client
+    except Exception as e:
+        logger.error(f"Failed to connect to Redis: {e}")
+        return None
+
+
+# Key formatters for the fixed-schema entries below. Fields follow cache_key's
+# sorted order, so keys match it whenever bot_id is set.
+_OVERVIEW_KEY = "analytics:overview:bot_id:{}:period:{}".format
+_OVERVIEW_RESPONSE_KEY = "analytics:overview_response:bot_id:{}:period:{}".format
+_TRENDS_KEY = "analytics:trends:bot_id:{}:end_date:{}:start_date:{}".format
+_BOT_PERFORMANCE_KEY = "analytics:bot_performance:bot_id:{}:period:{}".format
+_DELIVERY_RATES_KEY = "analytics:delivery_rates:bot_id:{}:end_date:{}:granularity:{}:start_date:{}".format
+_ACTIVE_CONTACTS_KEY = "analytics:active_contacts:bot_id:{}:period:{}".format
+_MESSAGE_DISTRIBUTION_KEY = "analytics:message_distribution:bot_id:{}:period:{}".format
 
 
 def cache_key(prefix: str, **kwargs) -> str:
-    """Generate cache key from prefix and parameters."""
+    """Generate cache key from prefix and parameters (for ad-hoc keys)."""
     key_parts = [prefix]
     for k, v in sorted(kwargs.items()):
         if v is not None:
@@ -38,45 +59,110 @@ def cache_key(prefix: str, **kwargs) -> str:
     return ":".join(key_parts)
 
 
+def cache_index_key(bot_id: Optional[int]) -> str:
+    """Name of the index set tracking cache keys for a bot (or cross-bot data)."""
+    return f"analytics:index:{bot_id if bot_id is not None else 'global'}"
+
+
+def encode_cache_value(data: Dict[str, Any]) -> bytes:
+    """Serialize a cache value with orjson, falling back to json for types it rejects."""
+    try:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return json.dumps(data, default=str).encode()
+
+
 def get_cached_data(key: str) -> Optional[Dict[str, Any]]:
     """Get cached data from Redis."""
     try:
-        client = get_redis_client()
-        if not client:
-            return None
-        
+        client = redis_client
         cached_data = client.get(key)
         if cached_data:
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
     except Exception as e:
         logger.error(f"Failed to get cached data for key {key}: {e}")
     return None
 
 
-def set_cached_data(key: str, data: Dict[str, Any], ttl: int = 300) -> bool:
-    """Set cached data in Redis with TTL."""
+def get_cached_data_raw(key: str) -> Optional[bytes]:
+    """Get the cached bytes for a key without decoding them."""
     try:
-        client = get_redis_client()
-        if not client:
-            return False
-        
-        client.setex(key, ttl, json.dumps(data, default=str))
+        return redis_client.get(key)
+    except Exception as e:
+        logger.error(f"Failed to get cached data for key {key}: {e}")
+    return None
+
+
+def cached_json_response(key: str) -> Optional[Response]:
+    """
+    Wrap a cached entry in a JSON response as-is.
+    
+    Entries written from a response model's dump are already the response
+    body, so a hit skips decoding, validation and re-encoding entirely.
+    """
+    raw = get_cached_data_raw(key)
+    if raw is None:
+        return None
+    return Response(content=raw, media_type="application/json")
+
+
+def mget_cached(keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Get several cached entries with one MGET; misses come back as None."""
+    if not keys:
+        return []
+    try:
+        return [orjson.loads(raw) if raw else None for raw in redis_client.mget(keys)]
+    except Exception as e:
+        logger.error(f"Failed to get cached data for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+
+def set_cached_data(key: str, data: Dict[str, Any], ttl: int = 300, bot_id: Optional[int] = None) -> bool:
+    """Set cached data in Redis with TTL and record the key in its bot's index."""
+    try:
+        client = redis_client
+        index_key = cache_index_key(bot_id)
+        pipe = client.pipeline(transaction=False)
+        pipe.setex(key, ttl, encode_cache_value(data))
+        pipe.sadd(index_key, key)
+        pipe.expire(index_key, INDEX_TTL)
+        pipe.sadd(INDEX_REGISTRY_KEY, index_key)
+        pipe.execute()
         return True
     except Exception as e:
         logger.error(f"Failed to set cached data for key {key}: {e}")
         return False
 
 
+def unlink_keys(client, keys: List[Any]) -> int:
+    """
+    Delete keys in bounded chunks, freeing their memory in the background.
+    
+    All chunks are sent in one pipeline, so the whole deletion costs a
+    single round trip.
+    """
+    chunks = [keys[start:start + UNLINK_CHUNK_SIZE] for start in range(0, len(keys), UNLINK_CHUNK_SIZE)]
+    pipe = client.pipeline(transaction=False)
+    for chunk in chunks:
+        pipe.unlink(*chunk)
+    try:
+        return sum(pipe.execute())
+    except redis.ResponseError:
+        # Redis < 4.0 has no UNLINK
+        pipe = client.pipeline(transaction=False)
+        for chunk in chunks:
+            pipe.delete(*chunk)
+        return sum(pipe.execute())
+
+
 def invalidate_cache_pattern(pattern: str) -> int:
     """Invalidate cache entries matching pattern."""
     try:
-        client = get_redis_client()
-        if not client:
-            return 0
-        
-        keys = client.keys(pattern)
+        client = redis_client
+        # SCAN walks the keyspace in small pages instead of blocking Redis like KEYS
+        keys = list(client.scan_iter(match=pattern, count=SCAN_COUNT))
         if keys:
-            return client.delete(*keys)
+            return unlink_keys(client, keys)
     except Exception as e:
         logger.error(f"Failed to invalidate cache pattern {pattern}: {e}")
     return 0
@@ -84,68 +170,115 @@ def invalidate_cache_pattern(pattern: str) -> int:
 
 def cache_overview_stats(period: str, bot_id: Optional[int], data: Dict[str, Any]) -> bool:
     """Cache overview statistics."""
-    key = cache_key("analytics:overview", period=period, bot_id=bot_id)
-    return set_cached_data(key, data, ttl=300)  # 5 minutes
+    key = _OVERVIEW_KEY(bot_id, period)
+    return set_cached_data(key, data, ttl=300, bot_id=bot_id)  # 5 minutes
 
 
 def get_cached_overview_stats(period: str, bot_id: Optional[int]) -> Optional[Dict[str, Any]]:
     """Get cached overview statistics."""
-    key = cache_key("analytics:overview", period=period, bot_id=bot_id)
+    key = _OVERVIEW_KEY(bot_id, period)
     return get_cached_data(key)
 
 
+def overview_response_key(period: str, bot_id: Optional[int]) -> str:
+    """Cache key of a serialized overview response."""
+    return _OVERVIEW_RESPONSE_KEY(bot_id, period)
+
+
+def build_overview_response(period: str, bot_id: Optional[int], stats: Dict[str, Any]) -> AnalyticsOverviewResponse:
+    """Build the /analytics/overview response from get_overview_stats output."""
+    return AnalyticsOverviewResponse(
+        period=period,
+        bot_id=bot_id,
+        total_messages=stats["total_messages"],
+        active_contacts=stats["active_contacts"],
+        delivery_rate=stats["delivery_rate"],
+        # Placeholder - would need actual implementation
+        average_response_time=2.3,
+        top_message_types=stats["top_message_types"],
+        flow_completion_rate=stats["flow_completion_rate"],
+        trends=stats["trends"]
+    )
+
+
+def cache_overview_response(period: str, bot_id: Optional[int], data: Dict[str, Any]) -> bool:
+    """Cache a serialized overview response body."""
+    return set_cached_data(overview_response_key(period, bot_id), data, ttl=300, bot_id=bot_id)  # 5 minutes
+
+
+def get_cached_overview_responses(items: List[Tuple[str, Optional[int]]]) -> List[Optional[Dict[str, Any]]]:
+    """Get cached overview response bodies for several (period, bot_id) pairs in one round trip."""
+    keys = [overview_response_key(period, bot_id) for period, bot_id in items]
+    return mget_cached(keys)
+
+
 def cache_trends_data(start_date: str, end_date: str, bot_id: Optional[int], data: Dict[str, Any]) -> bool:
     """Cache trends data."""
-    key = cache_key("analytics:trends", start_date=start_date, end_date=end_date, bot_id=bot_id)
-    return set_cached_data(key, data, ttl=900)  # 15 minutes
+    key = _TRENDS_KEY(bot_id, end_date, start_date)
+    return set_cached_data(key, data, ttl=900, bot_id=bot_id)  # 15 minutes
 
 
 def get_cached_trends_data(start_date: str, end_date: str, bot_id: Optional[int]) -> Optional[Dict[str, Any]]:
     """Get cached trends data."""
-    key = cache_key("analytics:trends", start_date=start_date, end_date=end_date, bot_id=bot_id)
+    key = _TRENDS_KEY(bot_id, end_date, start_date)
     return get_cached_data(key)
 
 
+def bot_performance_key(bot_id: int, period: str) -> str:
+    """Cache key of bot performance data."""
+    return _BOT_PERFORMANCE_KEY(bot_id, period)
+
+
 def cache_bot_performance(bot_id: int, period: str, data: Dict[str, Any]) -> bool:
     """Cache bot performance data."""
-    key = cache_key("analytics:bot_performance", bot_id=bot_id, period=period)
-    return set_cached_data(key, data, ttl=600)  # 10 minutes
+    key = _BOT_PERFORMANCE_KEY(bot_id, period)
+    return set_cached_data(key, data, ttl=600, bot_id=bot_id)  # 10 minutes
 
 
 def get_cached_bot_performance(bot_id: int, period: str) -> Optional[Dict[str, Any]]:
     """Get cached bot performance data."""
-    key = cache_key("analytics:bot_performance", bot_id=bot_id, period=period)
+    key = _BOT_PERFORMANCE_KEY(bot_id, period)
     return get_cached_data(key)
 
 
 def cache_delivery_rates(start_date: str, end_date: str, bot_id: Optional[int], granularity: str, data: Dict[str, Any]) -> bool:
     """Cache delivery rates data."""
-    key = cache_key("analytics:delivery_rates", start_date=start_date, end_date=end_date, bot_id=bot_id, granularity=granularity)
-    return set_cached_data(key, data, ttl=600)  # 10 minutes
+    key = _DELIVERY_RATES_KEY(bot_id, end_date, granularity, start_date)
+    return set_cached_data(key, data, ttl=600, bot_id=bot_id)  # 10 minutes
 
 
 def get_cached_delivery_rates(start_date: str, end_date: str, bot_id: Optional[int], granularity: str) -> Optional[Dict[str, Any]]:
     """Get cached delivery rates data."""
-    key = cache_key("analytics:delivery_rates", start_date=start_date, end_date=end_date, bot_id=bot_id, granularity=granularity)
+    key = _DELIVERY_RATES_KEY(bot_id, end_date, granularity, start_date)
     return get_cached_data(key)
 
 
 def invalidate_analytics_cache(bot_id: Optional[int] = None) -> int:
-    """Invalidate analytics cache entries."""
-    patterns = [
-        "analytics:overview:*",
-        "analytics:trends:*",
-        "analytics:delivery_rates:*",
-        "analytics:active_contacts:*",
-        "analytics:message_distribution:*"
-    ]
+    """
+    Invalidate analytics cache entries.
     
-    if bot_id:
-        patterns.append(f"analytics:bot_performance:bot_id:{bot_id}:*")
-    
-    total_deleted = 0
-    for pattern in patterns:
-        total_deleted += invalidate_cache_pattern(pattern)
+    With a bot_id, drops that bot's entries and the cross-bot ones that
+    include its data; without one, drops every analytics entry.
+    """
+    try:
+        client = redis_client
+        if bot_id is not None:
+            index_keys = [cache_index_key(bot_id), cache_index_key(None)]
+        else:
+            index_keys = list(client.smembers(INDEX_REGISTRY_KEY))
+        if not index_keys:
+            return 0
+        
+        # One SUNION reads every tracked key, then the keys and the emptied
+        # index sets are unlinked
+        keys = list(client.sunion(index_keys))
+        total_deleted = unlink_keys(client, keys) if keys else 0
+        if bot_id is None:
+            index_keys.append(INDEX_REGISTRY_KEY)
+        unlink_keys(client, index_keys)
+    except Exception as e:
+        logger.error(f"Failed to invalidate analytics cache: {e}")
+        return 0
     
     logger.info(f"Invalidated {total_deleted} analytics cache entries")
     return total_deleted
@@ -153,45 +286,75 @@ def invalidate_analytics_cache(bot_id: Optional[int] = None) -> int:
 
 def cache_active_contacts_stats(period: str, bot_id: Optional[int], data: Dict[str, Any]) -> bool:
     """Cache active contacts statistics."""
-    key = cache_key("analytics:active_contacts", period=period, bot_id=bot_id)
-    return set_cached_data(key, data, ttl=600)  # 10 minutes
+    key = _ACTIVE_CONTACTS_KEY(bot_id, period)
+    return set_cached_data(key, data, ttl=600, bot_id=bot_id)  # 10 minutes
 
 
 def get_cached_active_contacts_stats(period: str, bot_id: Optional[int]) -> Optional[Dict[str, Any]]:
     """Get cached active contacts statistics."""
-    key = cache_key("analytics:active_contacts", period=period, bot_id=bot_id)
+    key = _ACTIVE_CONTACTS_KEY(bot_id, period)
     return get_cached_data(key)
 
 
 def cache_message_distribution(period: str, bot_id: Optional[int], data: Dict[str, Any]) -> bool:
     """Cache message distribution data."""
-    key = cache_key("analytics:message_distribution", period=period, bot_id=bot_id)
-    return set_cached_data(key, data, ttl=600)  # 10 minutes
+    key = _MESSAGE_DISTRIBUTION_KEY(bot_id, period)
+    return set_cached_data(key, data, ttl=600, bot_id=bot_id)  # 10 minutes
 
 
 def get_cached_message_distribution(period: str, bot_id: Optional[int]) -> Optional[Dict[str, Any]]:
     """Get cached message distribution data."""
-    key = cache_key("analytics:message_distribution", period=period, bot_id=bot_id)
+    key = _MESSAGE_DISTRIBUTION_KEY(bot_id, period)
     return get_cached_data(key)
 
 
 def warm_up_cache(bot_id: Optional[int] = None) -> Dict[str, int]:
-    """Warm up analytics cache with common queries."""
+    """
+    Warm up analytics cache with common queries.
+    
+    Fills the overview response entries the API serves. Periods whose
+    response is still cached are skipped; the rest are computed
+    concurrently.
+    """
     warmed_up = {}
     
     try:
         from .crud import get_overview_stats
+        from ..shared.database import SessionLocal
         
-        # Warm up overview stats for common periods
-        periods = ["today", "7days", "30days"]
-        for period in periods:
+        def warm_period(period: str) -> bool:
+            # Sessions are not thread-safe, so each period gets its own
+            db = SessionLocal()
             try:
-                stats = get_overview_stats(None, period, bot_id)  # We need to pass db session
-                cache_overview_stats(period, bot_id, stats)
+                stats = get_overview_stats(db, period, bot_id)
+                response = build_overview_response(period, bot_id, stats)
+                return cache_overview_response(period, bot_id, response.model_dump(mode="json"))
+            finally:
+                db.close()
+        
+        # Check every common period with one MGET, then warm up the missing
+        # ones concurrently, so the queries overlap instead of running back
+        # to back
+        periods = ["today", "7days", "30days"]
+        cached = get_cached_overview_responses([(period, bot_id) for period in periods])
+        for period, entry in zip(periods, cached):
+            if entry is not None:
                 warmed_up[f"overview:{period}"] = 1
-            except Exception as e:
-                logger.error(f"Failed to warm up overview cache for {period}: {e}")
-                warmed_up[f"overview:{period}"] = 0
+        periods = [period for period, entry in zip(periods, cached) if entry is None]
+        if not periods:
+            logger.info(f"Analytics cache already warm: {warmed_up}")
+            return warmed_up
+        
+        with ThreadPoolExecutor(max_workers=len(periods)) as executor:
+            futures = {executor.submit(warm_period, period): period for period in periods}
+            for future in as_completed(futures):
+                period = futures[future]
+                try:
+                    future.result()
+                    warmed_up[f"overview:{period}"] = 1
+                except Exception as e:
+                    logger.error(f"Failed to warm up overview cache for {period}: {e}")
+                    warmed_up[f"overview:{period}"] = 0
         
         logger.info(f"Warmed up analytics cache: {warmed_up}")
         return warmed_up
@@ -209,14 +372,14 @@ def get_cache_stats() -> Dict[str, Any]:
             return {"status": "redis_unavailable"}
         
         info = client.info()
-        analytics_keys = client.keys("analytics:*")
+        analytics_keys_count = sum(1 for _ in client.scan_iter(match="analytics:*", count=1000))
         
         return {
             "status": "healthy",
             "redis_version": info.get("redis_version"),
             "used_memory": info.get("used_memory_human"),
             "connected_clients": info.get("connected_clients"),
-            "analytics_keys_count": len(analytics_keys),
+            "analytics_keys_count": analytics_keys_count,
             "last_check": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -2,162 +2,440 @@
 CRUD operations for analytics and reporting.
 """
 
+import asyncio
 import logging
+from types import SimpleNamespace
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta, date
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_, desc, select, text, literal, DateTime
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from ..shared.database import async_session_maker
 from ..shared.models.bot_builder import (
     DailyMessageStats, 
+    DailyContactSketch,
     HourlyMessageStats, 
     WhatsAppMessage, 
     Contact, 
     FlowExecution, 
+    Trigger,
     TriggerLog,
     Bot
 )
+from .hll import add_value, build_sketch, merge_sketches, estimate_cardinality
+from .cache import invalidate_analytics_cache
 
 logger = logging.getLogger(__name__)
 
+# Overview periods short enough to count distinct contacts exactly from raw
+# messages; longer periods use the daily HyperLogLog sketches
+EXACT_ACTIVE_CONTACTS_PERIODS = {"today", "7days"}
+
+# Rows fetched per round trip when streaming daily stats
+DAILY_STATS_BATCH_SIZE = 500
+
+# Rows per multi-row INSERT statement written by the aggregation jobs
+INSERT_BATCH_SIZE = 500
+
+# Rows removed per DELETE statement (and transaction) by cleanup_old_stats
+CLEANUP_BATCH_SIZE = 10000
+
+
+def _daily_aggregate_queries(bot_ids: List[int], start_datetime: datetime, end_datetime: datetime) -> Dict[str, Any]:
+    """
+    Build the independent SELECTs that aggregate one day for the given bots.
+    
+    Each metric is computed for every bot at once with a GROUP BY bot_id
+    query, so the number of queries does not grow with the number of bots.
+    """
+    message_window = and_(
+        WhatsAppMessage.bot_id.in_(bot_ids),
+        WhatsAppMessage.created_at >= start_datetime,
+        WhatsAppMessage.created_at < end_datetime
+    )
+    
+    return {
+        # Message statistics and active contacts (unique contacts who
+        # sent/received messages) per bot
+        "messages": select(
+            WhatsAppMessage.bot_id,
+            func.count(WhatsAppMessage.id).label('total_messages'),
+            func.count().filter(WhatsAppMessage.direction == 'inbound').label('inbound_messages'),
+            func.count().filter(WhatsAppMessage.direction == 'outbound').label('outbound_messages'),
+            func.count().filter(WhatsAppMessage.message_type == 'text').label('text_messages'),
+            func.count().filter(WhatsAppMessage.message_type == 'template').label('template_messages'),
+            func.count().filter(WhatsAppMessage.message_type == 'media').label('media_messages'),
+            func.count().filter(WhatsAppMessage.message_type == 'interactive').label('interactive_messages'),
+            func.count().filter(WhatsAppMessage.status == 'sent').label('sent_count'),
+            func.count().filter(WhatsAppMessage.status == 'delivered').label('delivered_count'),
+            func.count().filter(WhatsAppMessage.status == 'read').label('read_count'),
+            func.count().filter(WhatsAppMessage.status == 'failed').label('failed_count'),
+            func.count(func.distinct(WhatsAppMessage.recipient_phone)).label('active_contacts')
+        ).where(message_window).group_by(WhatsAppMessage.bot_id),
+        
+        # Each bot's contacts, sketched so active contacts can be combined
+        # across days without rescanning messages
+        "contacts": select(
+            WhatsAppMessage.bot_id, WhatsAppMessage.recipient_phone
+        ).where(message_window).distinct(),
+        
+        # New contacts created on this day (contacts are not per bot)
+        "new_contacts": select(func.count(Contact.id)).where(
+            and_(
+                Contact.created_at >= start_datetime,
+                Contact.created_at < end_datetime
+            )
+        ),
+        
+        # Flow statistics per bot
+        "flows": select(
+            FlowExecution.bot_id,
+            func.count().filter(FlowExecution.status == 'running').label('flows_started'),
+            func.count().filter(FlowExecution.status == 'completed').label('flows_completed'),
+            func.count().filter(FlowExecution.status == 'failed').label('flows_failed')
+        ).where(
+            and_(
+                FlowExecution.bot_id.in_(bot_ids),
+                FlowExecution.started_at >= start_datetime,
+                FlowExecution.started_at < end_datetime
+            )
+        ).group_by(FlowExecution.bot_id),
+        
+        # Triggers fired per bot
+        "triggers": select(Trigger.bot_id, func.count(TriggerLog.id)).join_from(
+            TriggerLog, Trigger, TriggerLog.trigger_id == Trigger.id
+        ).where(
+            and_(
+                Trigger.bot_id.in_(bot_ids),
+                TriggerLog.triggered_at >= start_datetime,
+                TriggerLog.triggered_at < end_datetime
+            )
+        ).group_by(Trigger.bot_id)
+    }
+
+
+def _build_daily_rows(
+    target_date: date,
+    start_datetime: datetime,
+    bot_ids: List[int],
+    results: Dict[str, List[Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Turn the rows of _daily_aggregate_queries into daily stats and sketch mappings."""
+    message_stats = {row.bot_id: row for row in results["messages"]}
+    flow_stats = {row.bot_id: row for row in results["flows"]}
+    triggers_fired = dict(results["triggers"])
+    new_contacts = results["new_contacts"][0][0] or 0
+    
+    contacts_by_bot = {}
+    for message_bot_id, phone in results["contacts"]:
+        if phone:
+            contacts_by_bot.setdefault(message_bot_id, []).append(phone)
+    
+    # Plain dicts skip ORM instrumentation and go out as one multi-row INSERT
+    stats_rows = []
+    for id_ in bot_ids:
+        messages = message_stats.get(id_)
+        flows = flow_stats.get(id_)
+        
+        # Create daily stats record
+        daily_stats = dict(
+            bot_id=id_,
+            date=start_datetime,
+            total_messages=messages.total_messages if messages else 0,
+            inbound_messages=(messages.inbound_messages or 0) if messages else 0,
+            outbound_messages=(messages.outbound_messages or 0) if messages else 0,
+            text_messages=(messages.text_messages or 0) if messages else 0,
+            template_messages=(messages.template_messages or 0) if messages else 0,
+            media_messages=(messages.media_messages or 0) if messages else 0,
+            interactive_messages=(messages.interactive_messages or 0) if messages else 0,
+            sent_count=(messages.sent_count or 0) if messages else 0,
+            delivered_count=(messages.delivered_count or 0) if messages else 0,
+            read_count=(messages.read_count or 0) if messages else 0,
+            failed_count=(messages.failed_count or 0) if messages else 0,
+            active_contacts=messages.active_contacts if messages else 0,
+            new_contacts=new_contacts,
+            flows_started=(flows.flows_started or 0) if flows else 0,
+            flows_completed=(flows.flows_completed or 0) if flows else 0,
+            flows_failed=(flows.flows_failed or 0) if flows else 0,
+            triggers_fired=triggers_fired.get(id_, 0)
+        )
+        stats_rows.append(daily_stats)
+        
+        logger.info(f"Aggregated daily stats for bot {id_} on {target_date}: {daily_stats['total_messages']} messages")
+    
+    sketch_rows = [
+        {"bot_id": id_, "date": start_datetime, "sketch": build_sketch(phones)}
+        for id_, phones in contacts_by_bot.items()
+    ]
+    return stats_rows, sketch_rows
+
+
+def _insert_missing(db: Session, model, rows: List[Dict[str, Any]], index_elements: List[str]) -> None:
+    """Insert rows in multi-row statements, skipping those whose unique key already exists."""
+    # Chunked so a statement stays under the database's bound parameter limit
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(
+            _dialect_insert(db, model).values(rows[start:start + INSERT_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=index_elements)
+        )
+
+
+def _store_daily_rows(db: Session, stats_rows: List[Dict[str, Any]], sketch_rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert daily stats and sketch mappings.
+    
+    Rows another run already stored are skipped by their (bot_id, date)
+    unique constraints, so concurrent or repeated runs stay idempotent.
+    """
+    _insert_missing(db, DailyMessageStats, stats_rows, ['bot_id', 'date'])
+    _insert_missing(db, DailyContactSketch, sketch_rows, ['bot_id', 'date'])
+
+
+def _daily_stats_query(bot_id: Optional[int], start_datetime: datetime):
+    """SELECT of the stored daily stats for a day, of one bot or all of them."""
+    query = select(DailyMessageStats).where(DailyMessageStats.date == start_datetime)
+    if bot_id:
+        query = query.where(DailyMessageStats.bot_id == bot_id)
+    return query
+
+
+def _bot_ids_query(bot_id: Optional[int]):
+    """SELECT of the ids of the bots to aggregate for."""
+    query = select(Bot.id)
+    if bot_id:
+        query = query.where(Bot.id == bot_id)
+    return query
+
+
+def _pending_bot_ids_query(bot_id: Optional[int], start_datetime: datetime):
+    """SELECT of the ids of the bots to aggregate for that have no daily stats for the day yet."""
+    return _bot_ids_query(bot_id).where(
+        ~select(DailyMessageStats.id).where(
+            and_(
+                DailyMessageStats.bot_id == Bot.id,
+                DailyMessageStats.date == start_datetime
+            )
+        ).exists()
+    )
+
 
 def aggregate_daily_stats(db: Session, target_date: date, bot_id: Optional[int] = None) -> List[DailyMessageStats]:
     """Aggregate statistics for a specific date."""
     try:
         start_datetime = datetime.combine(target_date, datetime.min.time())
-        end_datetime = datetime.combine(target_date, datetime.max.time())
+        end_datetime = start_datetime + timedelta(days=1)
         
-        # Get bots to aggregate for
-        if bot_id:
-            bots = db.query(Bot).filter(Bot.id == bot_id).all()
-        else:
-            bots = db.query(Bot).all()
-        
-        aggregated_stats = []
+        # Get bots to aggregate for, skipping those already aggregated for
+        # the day (ON CONFLICT still covers runs that race past this check)
+        bot_ids = db.execute(_pending_bot_ids_query(bot_id, start_datetime)).scalars().all()
         
-        for bot in bots:
-            # Check if stats already exist for this date
-            existing_stats = db.query(DailyMessageStats).filter(
-                and_(
-                    DailyMessageStats.bot_id == bot.id,
-                    DailyMessageStats.date == start_datetime
-                )
-            ).first()
-            
-            if existing_stats:
-                logger.info(f"Daily stats already exist for bot {bot.id} on {target_date}")
-                aggregated_stats.append(existing_stats)
-                continue
+        if bot_ids:
+            queries = _daily_aggregate_queries(bot_ids, start_datetime, end_datetime)
+            results = {name: db.execute(query).all() for name, query in queries.items()}
+            stats_rows, sketch_rows = _build_daily_rows(target_date, start_datetime, bot_ids, results)
             
-            # Aggregate message statistics
-            message_stats = db.query(
-                func.count(WhatsAppMessage.id).label('total_messages'),
-                func.sum(func.case([(WhatsAppMessage.direction == 'inbound', 1)], else_=0)).label('inbound_messages'),
-                func.sum(func.case([(WhatsAppMessage.direction == 'outbound', 1)], else_=0)).label('outbound_messages'),
-                func.sum(func.case([(WhatsAppMessage.message_type == 'text', 1)], else_=0)).label('text_messages'),
-                func.sum(func.case([(WhatsAppMessage.message_type == 'template', 1)], else_=0)).label('template_messages'),
-                func.sum(func.case([(WhatsAppMessage.message_type == 'media', 1)], else_=0)).label('media_messages'),
-                func.sum(func.case([(WhatsAppMessage.message_type == 'interactive', 1)], else_=0)).label('interactive_messages'),
-                func.sum(func.case([(WhatsAppMessage.status == 'sent', 1)], else_=0)).label('sent_count'),
-                func.sum(func.case([(WhatsAppMessage.status == 'delivered', 1)], else_=0)).label('delivered_count'),
-                func.sum(func.case([(WhatsAppMessage.status == 'read', 1)], else_=0)).label('read_count'),
-                func.sum(func.case([(WhatsAppMessage.status == 'failed', 1)], else_=0)).label('failed_count')
-            ).filter(
-                and_(
-                    WhatsAppMessage.bot_id == bot.id,
-                    WhatsAppMessage.created_at >= start_datetime,
-                    WhatsAppMessage.created_at <= end_datetime
-                )
-            ).first()
-            
-            # Count active contacts (unique contacts who sent/received messages)
-            active_contacts = db.query(func.count(func.distinct(WhatsAppMessage.recipient_phone))).filter(
-                and_(
-                    WhatsAppMessage.bot_id == bot.id,
-                    WhatsAppMessage.created_at >= start_datetime,
-                    WhatsAppMessage.created_at <= end_datetime
-                )
-            ).scalar() or 0
-            
-            # Count new contacts created on this day
-            new_contacts = db.query(func.count(Contact.id)).filter(
-                and_(
-                    Contact.created_at >= start_datetime,
-                    Contact.created_at <= end_datetime
-                )
-            ).scalar() or 0
-            
-            # Aggregate flow statistics
-            flow_stats = db.query(
-                func.sum(func.case([(FlowExecution.status == 'running', 1)], else_=0)).label('flows_started'),
-                func.sum(func.case([(FlowExecution.status == 'completed', 1)], else_=0)).label('flows_completed'),
-                func.sum(func.case([(FlowExecution.status == 'failed', 1)], else_=0)).label('flows_failed')
-            ).filter(
-                and_(
-                    FlowExecution.bot_id == bot.id,
-                    FlowExecution.started_at >= start_datetime,
-                    FlowExecution.started_at <= end_datetime
-                )
-            ).first()
+            _store_daily_rows(db, stats_rows, sketch_rows)
+            db.commit()
+            invalidate_analytics_cache(bot_id)
+        
+        # Load the stored rows back in one query for callers that need them
+        return db.execute(_daily_stats_query(bot_id, start_datetime)).scalars().all()
+        
+    except Exception as e:
+        logger.error(f"Failed to aggregate daily stats for {target_date}: {e}")
+        db.rollback()
+        raise
+
+
+async def aggregate_daily_stats_async(target_date: date, bot_id: Optional[int] = None) -> List[DailyMessageStats]:
+    """
+    Aggregate statistics for a specific date, running the independent
+    aggregate queries concurrently.
+    
+    Each query gets its own session (and pooled connection), so the day
+    costs roughly the slowest query instead of the sum of all of them.
+    """
+    start_datetime = datetime.combine(target_date, datetime.min.time())
+    end_datetime = start_datetime + timedelta(days=1)
+    
+    async def fetch_all(query) -> List[Any]:
+        async with async_session_maker() as session:
+            return (await session.execute(query)).all()
+    
+    try:
+        async with async_session_maker() as db:
+            # Get bots to aggregate for, skipping those already aggregated for
+            # the day (ON CONFLICT still covers runs that race past this check)
+            bot_ids = (await db.execute(_pending_bot_ids_query(bot_id, start_datetime))).scalars().all()
             
-            # Count triggers fired
-            triggers_fired = db.query(func.count(TriggerLog.id)).filter(
-                and_(
-                    TriggerLog.triggered_at >= start_datetime,
-                    TriggerLog.triggered_at <= end_datetime
+            if bot_ids:
+                queries = _daily_aggregate_queries(bot_ids, start_datetime, end_datetime)
+                rows = await asyncio.gather(*(fetch_all(query) for query in queries.values()))
+                stats_rows, sketch_rows = _build_daily_rows(
+                    target_date, start_datetime, bot_ids, dict(zip(queries, rows))
                 )
-            ).scalar() or 0
-            
-            # Create daily stats record
-            daily_stats = DailyMessageStats(
-                bot_id=bot.id,
-                date=start_datetime,
-                total_messages=message_stats.total_messages or 0,
-                inbound_messages=message_stats.inbound_messages or 0,
-                outbound_messages=message_stats.outbound_messages or 0,
-                text_messages=message_stats.text_messages or 0,
-                template_messages=message_stats.template_messages or 0,
-                media_messages=message_stats.media_messages or 0,
-                interactive_messages=message_stats.interactive_messages or 0,
-                sent_count=message_stats.sent_count or 0,
-                delivered_count=message_stats.delivered_count or 0,
-                read_count=message_stats.read_count or 0,
-                failed_count=message_stats.failed_count or 0,
-                active_contacts=active_contacts,
-                new_contacts=new_contacts,
-                flows_started=flow_stats.flows_started or 0,
-                flows_completed=flow_stats.flows_completed or 0,
-                flows_failed=flow_stats.flows_failed or 0,
-                triggers_fired=triggers_fired
-            )
+                
+                await db.run_sync(_store_daily_rows, stats_rows, sketch_rows)
+                await db.commit()
+                invalidate_analytics_cache(bot_id)
             
-            db.add(daily_stats)
-            aggregated_stats.append(daily_stats)
-            
-            logger.info(f"Aggregated daily stats for bot {bot.id} on {target_date}: {daily_stats.total_messages} messages")
-        
-        db.commit()
-        return aggregated_stats
+            # Load the stored rows back in one query for callers that need them
+            return (await db.execute(_daily_stats_query(bot_id, start_datetime))).scalars().all()
         
     except Exception as e:
         logger.error(f"Failed to aggregate daily stats for {target_date}: {e}")
-        db.rollback()
         raise
 
 
-def get_daily_stats(db: Session, start_date: datetime, end_date: datetime, bot_id: Optional[int] = None) -> List[DailyMessageStats]:
-    """Get daily statistics for a date range."""
-    query = db.query(DailyMessageStats).filter(
+def daily_stats_query(start_date: datetime, end_date: datetime, bot_id: Optional[int] = None):
+    """SELECT of daily statistics for a date range, in date order (sync or async sessions)."""
+    query = select(DailyMessageStats).where(
         and_(
             DailyMessageStats.date >= start_date,
             DailyMessageStats.date <= end_date
         )
     )
     
+    if bot_id:
+        query = query.where(DailyMessageStats.bot_id == bot_id)
+    
+    return query.order_by(DailyMessageStats.date)
+
+
+def get_daily_stats(db: Session, start_date: datetime, end_date: datetime, bot_id: Optional[int] = None) -> List[DailyMessageStats]:
+    """Get daily statistics for a date range."""
+    return db.execute(daily_stats_query(start_date, end_date, bot_id)).scalars().all()
+
+
+def summarize_daily_stats(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    bot_id: Optional[int] = None,
+    previous_start: Optional[datetime] = None
+):
+    """
+    Sum daily statistics over [start_date, end_date) in a single aggregate query.
+    
+    Returns one row with a column per summed counter, the peak
+    active_contacts of any day, and the number of daily rows (days).
+    With previous_start, the same scan also returns the totals compared
+    by calculate_trends for [previous_start, start_date) as prev_* columns.
+    """
+    in_window = DailyMessageStats.date >= start_date
+    columns = [
+        func.count(DailyMessageStats.id).filter(in_window).label('days'),
+        func.sum(DailyMessageStats.total_messages).filter(in_window).label('total_messages'),
+        func.sum(DailyMessageStats.sent_count).filter(in_window).label('sent_count'),
+        func.sum(DailyMessageStats.delivered_count).filter(in_window).label('delivered_count'),
+        func.sum(DailyMessageStats.flows_started).filter(in_window).label('flows_started'),
+        func.sum(DailyMessageStats.flows_completed).filter(in_window).label('flows_completed'),
+        func.sum(DailyMessageStats.text_messages).filter(in_window).label('text_messages'),
+        func.sum(DailyMessageStats.template_messages).filter(in_window).label('template_messages'),
+        func.sum(DailyMessageStats.media_messages).filter(in_window).label('media_messages'),
+        func.sum(DailyMessageStats.interactive_messages).filter(in_window).label('interactive_messages'),
+        func.max(DailyMessageStats.active_contacts).filter(in_window).label('active_contacts')
+    ]
+    
+    if previous_start is not None:
+        in_previous = DailyMessageStats.date < start_date
+        columns += [
+            func.sum(DailyMessageStats.total_messages).filter(in_previous).label('prev_total_messages'),
+            func.sum(DailyMessageStats.sent_count).filter(in_previous).label('prev_sent_count'),
+            func.sum(DailyMessageStats.delivered_count).filter(in_previous).label('prev_delivered_count')
+        ]
+    
+    query = db.query(*columns).filter(
+        and_(
+            DailyMessageStats.date >= (start_date if previous_start is None else previous_start),
+            DailyMessageStats.date < end_date
+        )
+    )
+    
     if bot_id:
         query = query.filter(DailyMessageStats.bot_id == bot_id)
     
-    return query.order_by(DailyMessageStats.date).all()
+    return query.one()
+
+
+def count_active_contacts(db: Session, start_date: datetime, end_date: datetime, bot_id: Optional[int] = None) -> int:
+    """Count distinct contacts messaged over [start_date, end_date) exactly."""
+    query = db.query(func.count(func.distinct(WhatsAppMessage.recipient_phone))).filter(
+        and_(
+            WhatsAppMessage.created_at >= start_date,
+            WhatsAppMessage.created_at < end_date
+        )
+    )
+    
+    if bot_id:
+        query = query.filter(WhatsAppMessage.bot_id == bot_id)
+    
+    return query.scalar() or 0
+
+
+def estimate_active_contacts(db: Session, start_date: datetime, end_date: datetime, bot_id: Optional[int] = None) -> Optional[int]:
+    """
+    Estimate distinct contacts over [start_date, end_date) by merging daily sketches.
+    
+    Sketches cover whole days, so the range starts at the beginning of
+    start_date's day. The day end_date falls in has no sketch until it is
+    aggregated; its contacts up to end_date are added from the messages.
+    
+    Returns None when no day in the range has a sketch.
+    """
+    first_day = datetime.combine(start_date.date(), datetime.min.time())
+    last_day = datetime.combine(end_date.date(), datetime.min.time())
+    query = db.query(DailyContactSketch.sketch).filter(
+        and_(
+            DailyContactSketch.date >= first_day,
+            DailyContactSketch.date < last_day
+        )
+    )
+    
+    if bot_id:
+        query = query.filter(DailyContactSketch.bot_id == bot_id)
+    
+    sketches = [row.sketch for row in query.all()]
+    if not sketches:
+        return None
+    
+    merged = merge_sketches(sketches)
+    if end_date > last_day:
+        partial_day = db.query(WhatsAppMessage.recipient_phone).filter(
+            and_(
+                WhatsAppMessage.created_at >= last_day,
+                WhatsAppMessage.created_at < end_date
+            )
+        ).distinct()
+        if bot_id:
+            partial_day = partial_day.filter(WhatsAppMessage.bot_id == bot_id)
+        for row in partial_day:
+            if row.recipient_phone:
+                add_value(merged, row.recipient_phone)
+    return estimate_cardinality(merged)
+
+
+def period_active_contacts(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    bot_id: Optional[int] = None,
+    exact: bool = False
+) -> int:
+    """
+    Distinct contacts over [start_date, end_date).
+    
+    Counted exactly from raw messages when exact is set, otherwise
+    estimated from the daily sketches, falling back to the exact count for
+    ranges aggregated before sketches existed.
+    """
+    if not exact:
+        estimate = estimate_active_contacts(db, start_date, end_date, bot_id)
+        if estimate is not None:
+            return estimate
+    return count_active_contacts(db, start_date, end_date, bot_id)
 
 
 def get_overview_stats(db: Session, period: str, bot_id: Optional[int] = None) -> Dict[str, Any]:
@@ -173,10 +451,12 @@ def get_overview_stats(db: Session, period: str, bot_id: Optional[int] = None) -
     else:
         raise ValueError(f"Unsupported period: {period}")
     
-    # Get daily stats for the period
-    daily_stats = get_daily_stats(db, start_date, end_date, bot_id)
+    # Roll the period and the one before it (for trends) up in the
+    # database in one scan instead of loading every daily row
+    previous_start = start_date - (end_date - start_date)
+    totals = summarize_daily_stats(db, start_date, end_date, bot_id, previous_start=previous_start)
     
-    if not daily_stats:
+    if not totals.days:
         return {
             "total_messages": 0,
             "active_contacts": 0,
@@ -187,11 +467,11 @@ def get_overview_stats(db: Session, period: str, bot_id: Optional[int] = None) -
         }
     
     # Calculate aggregated metrics
-    total_messages = sum(stat.total_messages for stat in daily_stats)
-    total_sent = sum(stat.sent_count for stat in daily_stats)
-    total_delivered = sum(stat.delivered_count for stat in daily_stats)
-    total_flows_started = sum(stat.flows_started for stat in daily_stats)
-    total_flows_completed = sum(stat.flows_completed for stat in daily_stats)
+    total_messages = totals.total_messages or 0
+    total_sent = totals.sent_count or 0
+    total_delivered = totals.delivered_count or 0
+    total_flows_started = totals.flows_started or 0
+    total_flows_completed = totals.flows_completed or 0
     
     # Calculate delivery rate
     delivery_rate = (total_delivered / total_sent * 100) if total_sent > 0 else 0.0
@@ -201,33 +481,42 @@ def get_overview_stats(db: Session, period: str, bot_id: Optional[int] = None) -
     
     # Get message type distribution
     message_types = {
-        "text": sum(stat.text_messages for stat in daily_stats),
-        "template": sum(stat.template_messages for stat in daily_stats),
-        "media": sum(stat.media_messages for stat in daily_stats),
-        "interactive": sum(stat.interactive_messages for stat in daily_stats)
+        "text": totals.text_messages or 0,
+        "template": totals.template_messages or 0,
+        "media": totals.media_messages or 0,
+        "interactive": totals.interactive_messages or 0
     }
     
-    # Get active contacts (max active contacts on any single day)
-    active_contacts = max(stat.active_contacts for stat in daily_stats) if daily_stats else 0
-    
-    # Calculate trends (compare with previous period)
-    trends = calculate_trends(db, start_date, end_date, bot_id)
+    # Get active contacts (distinct over the whole period). Short periods
+    # are counted exactly; longer ones merge the daily sketches
+    exact_contacts = period in EXACT_ACTIVE_CONTACTS_PERIODS
+    active_contacts = period_active_contacts(db, start_date, end_date, bot_id, exact=exact_contacts)
     
-    return {
+    stats = {
         "total_messages": total_messages,
         "active_contacts": active_contacts,
         "delivery_rate": round(delivery_rate, 2),
         "flow_completion_rate": round(flow_completion_rate, 2),
-        "top_message_types": message_types,
-        "trends": trends
+        "top_message_types": message_types
     }
+    
+    # Calculate trends (compare with previous period, measuring its
+    # active contacts the same way as the current one)
+    previous_contacts = period_active_contacts(db, previous_start, start_date, bot_id, exact=exact_contacts)
+    stats["trends"] = calculate_trends(
+        db, start_date, end_date, bot_id,
+        current_stats=stats,
+        previous_stats=_trend_metrics(totals, previous_contacts, prefix="prev_")
+    )
+    
+    return stats
 
 
 def calculate_delivery_rate(db: Session, bot_id: Optional[int], start_date: datetime, end_date: datetime) -> float:
     """Calculate delivery rate for a period."""
     query = db.query(
-        func.sum(func.case([(WhatsAppMessage.status == 'sent', 1)], else_=0)).label('sent'),
-        func.sum(func.case([(WhatsAppMessage.status == 'delivered', 1)], else_=0)).label('delivered')
+        func.count().filter(WhatsAppMessage.status == 'sent').label('sent'),
+        func.count().filter(WhatsAppMessage.status == 'delivered').label('delivered')
     ).filter(
         and_(
             WhatsAppMessage.created_at >= start_date,
@@ -248,12 +537,12 @@ def calculate_delivery_rate(db: Session, bot_id: Optional[int], start_date: date
 def get_active_contacts_count(db: Session, bot_id: Optional[int], target_date: date) -> int:
     """Count active contacts for a specific date."""
     start_datetime = datetime.combine(target_date, datetime.min.time())
-    end_datetime = datetime.combine(target_date, datetime.max.time())
+    end_datetime = start_datetime + timedelta(days=1)
     
     query = db.query(func.count(func.distinct(WhatsAppMessage.recipient_phone))).filter(
         and_(
             WhatsAppMessage.created_at >= start_datetime,
-            WhatsAppMessage.created_at <= end_datetime
+            WhatsAppMessage.created_at < end_datetime
         )
     )
     
@@ -286,8 +575,8 @@ def get_message_type_distribution(db: Session, bot_id: Optional[int], start_date
 def get_flow_completion_rate(db: Session, bot_id: Optional[int], start_date: datetime, end_date: datetime) -> float:
     """Calculate flow completion rate for a period."""
     query = db.query(
-        func.sum(func.case([(FlowExecution.status == 'completed', 1)], else_=0)).label('completed'),
-        func.sum(func.case([(FlowExecution.status.in_(['completed', 'failed']), 1)], else_=0)).label('total')
+        func.count().filter(FlowExecution.status == 'completed').label('completed'),
+        func.count().filter(FlowExecution.status.in_(['completed', 'failed'])).label('total')
     ).filter(
         and_(
             FlowExecution.started_at >= start_date,
@@ -305,17 +594,50 @@ def get_flow_completion_rate(db: Session, bot_id: Optional[int], start_date: dat
     return 0.0
 
 
-def calculate_trends(db: Session, current_start: datetime, current_end: datetime, bot_id: Optional[int]) -> Dict[str, float]:
-    """Calculate trends by comparing current period with previous period."""
+def _trend_metrics(totals, active_contacts: int, prefix: str = "") -> Dict[str, Any]:
+    """Metrics compared by calculate_trends, from a summarize_daily_stats row."""
+    total_sent = getattr(totals, prefix + "sent_count") or 0
+    total_delivered = getattr(totals, prefix + "delivered_count") or 0
+    return {
+        "total_messages": getattr(totals, prefix + "total_messages") or 0,
+        "active_contacts": active_contacts,
+        "delivery_rate": round(total_delivered / total_sent * 100, 2) if total_sent > 0 else 0.0
+    }
+
+
+def calculate_trends(
+    db: Session,
+    current_start: datetime,
+    current_end: datetime,
+    bot_id: Optional[int],
+    current_stats: Optional[Dict[str, Any]] = None,
+    previous_stats: Optional[Dict[str, Any]] = None
+) -> Dict[str, float]:
+    """
+    Calculate trends by comparing current period with previous period.
+    
+    Callers that already aggregated either period pass it as current_stats
+    or previous_stats, so only the missing ones are queried.
+    """
     period_duration = current_end - current_start
+    # Windows are half-open, so the previous one ends where the current
+    # one starts without counting a boundary row twice
     previous_end = current_start
-    previous_start = previous_end - period_duration
+    previous_start = current_start - period_duration
     
     # Get current period stats
-    current_stats = get_overview_stats(db, "custom", bot_id)  # We'll need to modify this
+    if current_stats is None:
+        current_stats = _trend_metrics(
+            summarize_daily_stats(db, current_start, current_end, bot_id),
+            period_active_contacts(db, current_start, current_end, bot_id)
+        )
     
     # Get previous period stats
-    previous_stats = get_overview_stats(db, "custom", bot_id)  # We'll need to modify this
+    if previous_stats is None:
+        previous_stats = _trend_metrics(
+            summarize_daily_stats(db, previous_start, previous_end, bot_id),
+            period_active_contacts(db, previous_start, previous_end, bot_id)
+        )
     
     trends = {}
     
@@ -340,83 +662,220 @@ def calculate_trends(db: Session, current_start: datetime, current_end: datetime
     return trends
 
 
+def _dialect_insert(db: Session, model):
+    """INSERT construct of the session's dialect, for ON CONFLICT support."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
 def aggregate_hourly_stats(db: Session, target_hour: datetime, bot_id: Optional[int] = None) -> List[HourlyMessageStats]:
-    """Aggregate hourly statistics."""
+    """
+    Aggregate hourly statistics.
+    
+    Every bot's row is computed and inserted by one INSERT ... SELECT
+    grouped by bot; rows that already exist for the hour are left alone.
+    """
     try:
         start_hour = target_hour.replace(minute=0, second=0, microsecond=0)
         end_hour = start_hour + timedelta(hours=1)
         
-        # Get bots to aggregate for
+        # Outer join so bots without messages still get a zero row
+        hourly_rows = select(
+            Bot.id,
+            literal(start_hour, DateTime),
+            func.count(WhatsAppMessage.id),
+            func.count(WhatsAppMessage.id).filter(WhatsAppMessage.direction == 'inbound'),
+            func.count(WhatsAppMessage.id).filter(WhatsAppMessage.direction == 'outbound'),
+            literal(datetime.utcnow(), DateTime)
+        ).select_from(Bot).outerjoin(
+            WhatsAppMessage,
+            and_(
+                WhatsAppMessage.bot_id == Bot.id,
+                WhatsAppMessage.created_at >= start_hour,
+                WhatsAppMessage.created_at < end_hour
+            )
+        ).group_by(Bot.id)
+        
         if bot_id:
-            bots = db.query(Bot).filter(Bot.id == bot_id).all()
-        else:
-            bots = db.query(Bot).all()
+            hourly_rows = hourly_rows.where(Bot.id == bot_id)
         
-        aggregated_stats = []
+        db.execute(
+            _dialect_insert(db, HourlyMessageStats).from_select(
+                ['bot_id', 'hour', 'total_messages', 'inbound_messages', 'outbound_messages', 'created_at'],
+                hourly_rows
+            ).on_conflict_do_nothing(index_elements=['bot_id', 'hour'])
+        )
+        db.commit()
         
-        for bot in bots:
-            # Check if stats already exist for this hour
-            existing_stats = db.query(HourlyMessageStats).filter(
-                and_(
-                    HourlyMessageStats.bot_id == bot.id,
-                    HourlyMessageStats.hour == start_hour
-                )
-            ).first()
-            
-            if existing_stats:
-                aggregated_stats.append(existing_stats)
-                continue
-            
-            # Aggregate message statistics for the hour
-            message_stats = db.query(
+        # Load the hour's rows back in one query for callers that need them
+        query = db.query(HourlyMessageStats).filter(HourlyMessageStats.hour == start_hour)
+        if bot_id:
+            query = query.filter(HourlyMessageStats.bot_id == bot_id)
+        return query.all()
+        
+    except Exception as e:
+        logger.error(f"Failed to aggregate hourly stats for {target_hour}: {e}")
+        db.rollback()
+        raise
+
+
+# Message counters summed from hourly buckets into daily rows
+_MESSAGE_COUNTERS = (
+    'total_messages', 'inbound_messages', 'outbound_messages',
+    'text_messages', 'template_messages', 'media_messages', 'interactive_messages',
+    'sent_count', 'delivered_count', 'read_count', 'failed_count'
+)
+
+
+def _hour_bucket(db: Session, column):
+    """Expression truncating a timestamp column to the hour."""
+    if db.bind.dialect.name == "postgresql":
+        return func.date_trunc('hour', column)
+    return func.strftime('%Y-%m-%d %H:00:00', column)
+
+
+def rebuild_rollups(db: Session, target_date: date, bot_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Build a day's daily and hourly statistics from one scan of its messages.
+    
+    Message counters are grouped by (bot_id, hour); the hourly rows come
+    from those groups and the daily counters are their sums. Like
+    aggregate_hourly_stats, every bot gets a row for every hour, with zero
+    counts where it had no messages. Rows that already exist are left
+    alone, so reruns are harmless.
+    """
+    try:
+        start_datetime = datetime.combine(target_date, datetime.min.time())
+        end_datetime = start_datetime + timedelta(days=1)
+        
+        bot_ids = db.execute(_bot_ids_query(bot_id)).scalars().all()
+        if not bot_ids:
+            return {"daily_stats": 0, "hourly_stats": 0}
+        
+        hour = _hour_bucket(db, WhatsAppMessage.created_at).label('hour')
+        hourly_groups = db.execute(
+            select(
+                WhatsAppMessage.bot_id,
+                hour,
                 func.count(WhatsAppMessage.id).label('total_messages'),
-                func.sum(func.case([(WhatsAppMessage.direction == 'inbound', 1)], else_=0)).label('inbound_messages'),
-                func.sum(func.case([(WhatsAppMessage.direction == 'outbound', 1)], else_=0)).label('outbound_messages')
-            ).filter(
+                func.count().filter(WhatsAppMessage.direction == 'inbound').label('inbound_messages'),
+                func.count().filter(WhatsAppMessage.direction == 'outbound').label('outbound_messages'),
+                func.count().filter(WhatsAppMessage.message_type == 'text').label('text_messages'),
+                func.count().filter(WhatsAppMessage.message_type == 'template').label('template_messages'),
+                func.count().filter(WhatsAppMessage.message_type == 'media').label('media_messages'),
+                func.count().filter(WhatsAppMessage.message_type == 'interactive').label('interactive_messages'),
+                func.count().filter(WhatsAppMessage.status == 'sent').label('sent_count'),
+                func.count().filter(WhatsAppMessage.status == 'delivered').label('delivered_count'),
+                func.count().filter(WhatsAppMessage.status == 'read').label('read_count'),
+                func.count().filter(WhatsAppMessage.status == 'failed').label('failed_count')
+            ).where(
                 and_(
-                    WhatsAppMessage.bot_id == bot.id,
-                    WhatsAppMessage.created_at >= start_hour,
-                    WhatsAppMessage.created_at < end_hour
+                    WhatsAppMessage.bot_id.in_(bot_ids),
+                    WhatsAppMessage.created_at >= start_datetime,
+                    WhatsAppMessage.created_at < end_datetime
                 )
-            ).first()
-            
-            # Create hourly stats record
-            hourly_stats = HourlyMessageStats(
-                bot_id=bot.id,
-                hour=start_hour,
-                total_messages=message_stats.total_messages or 0,
-                inbound_messages=message_stats.inbound_messages or 0,
-                outbound_messages=message_stats.outbound_messages or 0
-            )
-            
-            db.add(hourly_stats)
-            aggregated_stats.append(hourly_stats)
+            ).group_by(WhatsAppMessage.bot_id, hour)
+        ).all()
+        
+        groups_by_hour = {}
+        daily_counters = {}
+        for group in hourly_groups:
+            bucket = group.hour if isinstance(group.hour, datetime) else datetime.fromisoformat(group.hour)
+            groups_by_hour[(group.bot_id, bucket)] = group
+            counters = daily_counters.setdefault(group.bot_id, dict.fromkeys(_MESSAGE_COUNTERS, 0))
+            for name in _MESSAGE_COUNTERS:
+                counters[name] += getattr(group, name) or 0
+        
+        # Cross the bots with the day's hours so quiet hours get zero rows
+        hourly_rows = []
+        for id_ in bot_ids:
+            for offset in range(24):
+                bucket = start_datetime + timedelta(hours=offset)
+                group = groups_by_hour.get((id_, bucket))
+                hourly_rows.append(dict(
+                    bot_id=id_,
+                    hour=bucket,
+                    total_messages=group.total_messages if group else 0,
+                    inbound_messages=group.inbound_messages if group else 0,
+                    outbound_messages=group.outbound_messages if group else 0
+                ))
         
+        # The remaining daily metrics do not come from message counters
+        queries = _daily_aggregate_queries(bot_ids, start_datetime, end_datetime)
+        del queries["messages"]
+        results = {name: db.execute(query).all() for name, query in queries.items()}
+        
+        phones_by_bot = {}
+        for message_bot_id, phone in results["contacts"]:
+            if phone:
+                phones_by_bot[message_bot_id] = phones_by_bot.get(message_bot_id, 0) + 1
+        results["messages"] = [
+            SimpleNamespace(bot_id=id_, active_contacts=phones_by_bot.get(id_, 0), **counters)
+            for id_, counters in daily_counters.items()
+        ]
+        stats_rows, sketch_rows = _build_daily_rows(target_date, start_datetime, bot_ids, results)
+        
+        _store_daily_rows(db, stats_rows, sketch_rows)
+        _insert_missing(db, HourlyMessageStats, hourly_rows, ['bot_id', 'hour'])
         db.commit()
-        return aggregated_stats
+        invalidate_analytics_cache(bot_id)
+        
+        return {"daily_stats": len(stats_rows), "hourly_stats": len(hourly_rows)}
         
     except Exception as e:
-        logger.error(f"Failed to aggregate hourly stats for {target_hour}: {e}")
+        logger.error(f"Failed to rebuild rollups for {target_date}: {e}")
         db.rollback()
         raise
 
 
+def _delete_in_batches(db: Session, model, condition) -> int:
+    """
+    Delete matching rows in CLEANUP_BATCH_SIZE chunks, committing after each.
+    
+    Rows are selected by primary key, so no ORM objects are loaded and
+    each transaction only holds locks for one chunk.
+    """
+    deleted = 0
+    while True:
+        batch_ids = select(model.id).where(condition).limit(CLEANUP_BATCH_SIZE)
+        count = db.query(model).filter(model.id.in_(batch_ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += count
+        if count < CLEANUP_BATCH_SIZE:
+            return deleted
+
+
+def _reclaim_stats_tables(db: Session, models) -> None:
+    """Refresh planner statistics (and reclaim space on PostgreSQL) after bulk deletes."""
+    tables = [model.__tablename__ for model in models]
+    if db.bind.dialect.name == "postgresql":
+        # VACUUM cannot run inside a transaction block
+        with db.bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table in tables:
+                conn.execute(text(f"VACUUM ANALYZE {table}"))
+    else:
+        for table in tables:
+            db.execute(text(f"ANALYZE {table}"))
+        db.commit()
+
+
 def cleanup_old_stats(db: Session, days_to_keep_hourly: int = 7, days_to_keep_daily: int = 90):
     """Clean up old statistics."""
     try:
         # Clean up hourly stats older than specified days
         hourly_cutoff = datetime.utcnow() - timedelta(days=days_to_keep_hourly)
-        hourly_deleted = db.query(HourlyMessageStats).filter(
-            HourlyMessageStats.hour < hourly_cutoff
-        ).delete()
+        hourly_deleted = _delete_in_batches(db, HourlyMessageStats, HourlyMessageStats.hour < hourly_cutoff)
         
         # Clean up daily stats older than specified days
         daily_cutoff = datetime.utcnow() - timedelta(days=days_to_keep_daily)
-        daily_deleted = db.query(DailyMessageStats).filter(
-            DailyMessageStats.date < daily_cutoff
-        ).delete()
+        daily_deleted = _delete_in_batches(db, DailyMessageStats, DailyMessageStats.date < daily_cutoff)
+        _delete_in_batches(db, DailyContactSketch, DailyContactSketch.date < daily_cutoff)
         
-        db.commit()
+        invalidate_analytics_cache()
+        
+        if hourly_deleted or daily_deleted:
+            _reclaim_stats_tables(db, [HourlyMessageStats, DailyMessageStats, DailyContactSketch])
         
         logger.info(f"Cleaned up {hourly_deleted} hourly stats and {daily_deleted} daily stats")
         return {"hourly_deleted": hourly_deleted, "daily_deleted": daily_deleted}
@@ -0,0 +1,59 @@
+"""
+HyperLogLog sketches for approximate distinct counts.
+
+A sketch is a fixed-size byte string of registers. Sketches built from
+different days merge by taking the register-wise maximum, so distinct
+contacts over a date range can be estimated without rescanning messages.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+# 2**11 one-byte registers (2 KB per sketch), about 2.3% standard error
+HLL_PRECISION = 11
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HASH_BITS = 64 - HLL_PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+
+def new_sketch() -> bytearray:
+    """Create an empty sketch."""
+    return bytearray(HLL_REGISTERS)
+
+
+def add_value(sketch: bytearray, value: str) -> None:
+    """Add a value to a sketch in place."""
+    hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+    index = hashed >> _HASH_BITS
+    remainder = hashed & ((1 << _HASH_BITS) - 1)
+    rank = _HASH_BITS - remainder.bit_length() + 1
+    if rank > sketch[index]:
+        sketch[index] = rank
+
+
+def build_sketch(values: Iterable[str]) -> bytes:
+    """Build a sketch from an iterable of values."""
+    sketch = new_sketch()
+    for value in values:
+        add_value(sketch, value)
+    return bytes(sketch)
+
+
+def merge_sketches(sketches: Iterable[Optional[bytes]]) -> bytearray:
+    """Union several sketches by taking the register-wise maximum."""
+    merged = new_sketch()
+    for sketch in sketches:
+        if sketch:
+            merged = bytearray(map(max, merged, sketch))
+    return merged
+
+
+def estimate_cardinality(sketch: bytes) -> int:
+    """Estimate the number of distinct values added to a sketch."""
+    estimate = _ALPHA * HLL_REGISTERS * HLL_REGISTERS / sum(2.0 ** -register for register in sketch)
+    empty = sketch.count(0)
+    if estimate <= 2.5 * HLL_REGISTERS and empty:
+        # Small cardinalities are estimated more accurately by linear counting
+        estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / empty)
+    return int(round(estimate))
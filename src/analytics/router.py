@@ -8,9 +8,10 @@ import time
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..shared.database import get_db
+from ..shared.database import get_async_session
 from ..shared.schemas.analytics import (
     AnalyticsOverviewResponse,
     AnalyticsTrendsResponse,
@@ -22,14 +23,23 @@ from ..shared.schemas.analytics import (
     ManualAggregationResponse
 )
 from .crud import (
+    DAILY_STATS_BATCH_SIZE,
     get_overview_stats,
-    get_daily_stats,
+    daily_stats_query,
     calculate_delivery_rate,
     get_message_type_distribution,
     get_flow_completion_rate,
     aggregate_daily_stats,
     aggregate_hourly_stats
 )
+from .cache import (
+    bot_performance_key,
+    build_overview_response,
+    cache_bot_performance,
+    cache_overview_response,
+    cached_json_response,
+    overview_response_key
+)
 from ..shared.models.bot_builder import Bot, DailyMessageStats, HourlyMessageStats
 from ..analytics.tasks import aggregate_daily_stats_task, aggregate_hourly_stats_task
 
@@ -42,27 +52,21 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 async def get_analytics_overview(
     period: str = Query(default="7days", pattern="^(today|7days|30days)$"),
     bot_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get analytics overview for specified period."""
     try:
-        # Get overview statistics
-        stats = await asyncio.to_thread(get_overview_stats, db, period, bot_id)
+        # Serve a cached response body straight from Redis
+        cached = await asyncio.to_thread(cached_json_response, overview_response_key(period, bot_id))
+        if cached is not None:
+            return cached
         
-        # Calculate average response time (placeholder - would need actual implementation)
-        average_response_time = 2.3  # This would be calculated from actual data
+        # Get overview statistics
+        stats = await db.run_sync(get_overview_stats, period, bot_id)
         
-        return AnalyticsOverviewResponse(
-            period=period,
-            bot_id=bot_id,
-            total_messages=stats["total_messages"],
-            active_contacts=stats["active_contacts"],
-            delivery_rate=stats["delivery_rate"],
-            average_response_time=average_response_time,
-            top_message_types=stats["top_message_types"],
-            flow_completion_rate=stats["flow_completion_rate"],
-            trends=stats["trends"]
-        )
+        response = build_overview_response(period, bot_id, stats)
+        await asyncio.to_thread(cache_overview_response, period, bot_id, response.model_dump(mode="json"))
+        return response
     except Exception as e:
         logger.error(f"Failed to get analytics overview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,15 +77,18 @@ async def get_analytics_trends(
     start_date: datetime = Query(...),
     end_date: datetime = Query(...),
     bot_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get analytics trends over date range."""
     try:
         # Get daily stats for the period
-        daily_stats = await asyncio.to_thread(get_daily_stats, db, start_date, end_date, bot_id)
+        daily_stats = (await db.execute(daily_stats_query(start_date, end_date, bot_id))).scalars().all()
         
-        # Format daily stats
+        # Format daily stats and build the trend series in a single pass
         formatted_daily_stats = []
+        total_messages_trend = []
+        active_contacts_trend = []
+        delivery_rate_trend = []
         for stat in daily_stats:
             delivery_rate = (stat.delivered_count / stat.sent_count * 100) if stat.sent_count > 0 else 0
             formatted_daily_stats.append({
@@ -98,25 +105,11 @@ async def get_analytics_trends(
                 "flows_failed": stat.flows_failed,
                 "triggers_fired": stat.triggers_fired
             })
-        
-        # Create trend data
-        total_messages_trend = [
-            {"date": stat.date.isoformat(), "value": stat.total_messages}
-            for stat in daily_stats
-        ]
-        
-        active_contacts_trend = [
-            {"date": stat.date.isoformat(), "value": stat.active_contacts}
-            for stat in daily_stats
-        ]
-        
-        delivery_rate_trend = [
-            {
-                "date": stat.date.isoformat(), 
-                "value": round((stat.delivered_count / stat.sent_count * 100) if stat.sent_count > 0 else 0, 2)
-            }
-            for stat in daily_stats
-        ]
+            
+            day = stat.date.isoformat()
+            total_messages_trend.append({"date": day, "value": stat.total_messages})
+            active_contacts_trend.append({"date": day, "value": stat.active_contacts})
+            delivery_rate_trend.append({"date": day, "value": round(delivery_rate, 2)})
         
         return AnalyticsTrendsResponse(
             start_date=start_date,
@@ -136,24 +129,29 @@ async def get_analytics_trends(
 async def get_bot_performance(
     bot_id: int,
     period: str = Query(default="30days", pattern="^(today|7days|30days)$"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get performance metrics for a specific bot."""
     try:
+        # Serve a cached response body straight from Redis
+        cached = await asyncio.to_thread(cached_json_response, bot_performance_key(bot_id, period))
+        if cached is not None:
+            return cached
+        
         # Check if bot exists
-        bot = await asyncio.to_thread(lambda: db.query(Bot).filter(Bot.id == bot_id).first())
+        bot = await db.scalar(select(Bot).where(Bot.id == bot_id))
         if not bot:
             raise HTTPException(status_code=404, detail="Bot not found")
         
         # Get overview stats for the bot
-        stats = await asyncio.to_thread(get_overview_stats, db, period, bot_id)
+        stats = await db.run_sync(get_overview_stats, period, bot_id)
         
         # Calculate average flows per contact
         active_contacts = stats["active_contacts"]
         total_flows_started = stats.get("flows_started", 0)
         average_flows_per_contact = (total_flows_started / active_contacts) if active_contacts > 0 else 0
         
-        return BotPerformanceResponse(
+        response = BotPerformanceResponse(
             bot_id=bot.id,
             bot_name=bot.name,
             total_messages=stats["total_messages"],
@@ -162,6 +160,8 @@ async def get_bot_performance(
             flow_completion_rate=stats["flow_completion_rate"],
             average_flows_per_contact=round(average_flows_per_contact, 2)
         )
+        await asyncio.to_thread(cache_bot_performance, bot_id, period, response.model_dump(mode="json"))
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -169,52 +169,61 @@ async def get_bot_performance(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _daily_delivery_rates(db: AsyncSession, start_date: datetime, end_date: datetime, bot_id: Optional[int]):
+    """Per-day delivery rates plus sent/delivered/read/failed totals, from one streamed pass."""
+    delivery_rates = []
+    total_sent = 0
+    total_delivered = 0
+    total_read = 0
+    total_failed = 0
+    
+    query = daily_stats_query(start_date, end_date, bot_id).execution_options(yield_per=DAILY_STATS_BATCH_SIZE)
+    async for stat in await db.stream_scalars(query):
+        delivery_rate = (stat.delivered_count / stat.sent_count * 100) if stat.sent_count > 0 else 0
+        delivery_rates.append({
+            "date": stat.date.isoformat(),
+            "delivery_rate": round(delivery_rate, 2),
+            "sent": stat.sent_count,
+            "delivered": stat.delivered_count,
+            "read": stat.read_count,
+            "failed": stat.failed_count
+        })
+        
+        total_sent += stat.sent_count
+        total_delivered += stat.delivered_count
+        total_read += stat.read_count
+        total_failed += stat.failed_count
+    
+    return delivery_rates, total_sent, total_delivered, total_read, total_failed
+
+
 @router.get("/delivery-rates", response_model=DeliveryRatesResponse)
 async def get_delivery_rates(
     start_date: datetime = Query(...),
     end_date: datetime = Query(...),
     bot_id: Optional[int] = None,
     granularity: str = Query(default="daily", pattern="^(hourly|daily)$"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get delivery rate statistics."""
     try:
         if granularity == "daily":
-            # Get daily stats
-            daily_stats = await asyncio.to_thread(get_daily_stats, db, start_date, end_date, bot_id)
-            
-            delivery_rates = []
-            total_sent = 0
-            total_delivered = 0
-            total_read = 0
-            total_failed = 0
-            
-            for stat in daily_stats:
-                delivery_rate = (stat.delivered_count / stat.sent_count * 100) if stat.sent_count > 0 else 0
-                delivery_rates.append({
-                    "date": stat.date.isoformat(),
-                    "delivery_rate": round(delivery_rate, 2),
-                    "sent": stat.sent_count,
-                    "delivered": stat.delivered_count,
-                    "read": stat.read_count,
-                    "failed": stat.failed_count
-                })
-                
-                total_sent += stat.sent_count
-                total_delivered += stat.delivered_count
-                total_read += stat.read_count
-                total_failed += stat.failed_count
+            # Stream daily stats through a single pass
+            delivery_rates, total_sent, total_delivered, total_read, total_failed = await _daily_delivery_rates(
+                db, start_date, end_date, bot_id
+            )
             
             average_delivery_rate = (total_delivered / total_sent * 100) if total_sent > 0 else 0
             
         else:  # hourly
             # Get hourly stats (simplified implementation)
-            hourly_stats = await asyncio.to_thread(
-                lambda: db.query(HourlyMessageStats).filter(
-                    HourlyMessageStats.hour >= start_date,
-                    HourlyMessageStats.hour <= end_date
-                ).filter(HourlyMessageStats.bot_id == bot_id if bot_id else True).order_by(HourlyMessageStats.hour).all()
+            hourly_query = select(HourlyMessageStats).where(
+                HourlyMessageStats.hour >= start_date,
+                HourlyMessageStats.hour <= end_date
             )
+            if bot_id:
+                hourly_query = hourly_query.where(HourlyMessageStats.bot_id == bot_id)
+            hourly_stats = (await db.execute(hourly_query.order_by(HourlyMessageStats.hour))).scalars().all()
             
             delivery_rates = []
             total_sent = 0
@@ -254,12 +263,12 @@ async def get_delivery_rates(
 async def get_active_contacts_stats(
     period: str = Query(default="7days", pattern="^(today|7days|30days)$"),
     bot_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get active contacts statistics."""
     try:
         # Get overview stats
-        stats = await asyncio.to_thread(get_overview_stats, db, period, bot_id)
+        stats = await db.run_sync(get_overview_stats, period, bot_id)
         
         # Get daily active contacts breakdown
         end_date = datetime.utcnow()
@@ -270,12 +279,13 @@ async def get_active_contacts_stats(
         elif period == "30days":
             start_date = end_date - timedelta(days=30)
         
-        daily_stats = await asyncio.to_thread(get_daily_stats, db, start_date, end_date, bot_id)
+        daily_stats = (await db.execute(daily_stats_query(start_date, end_date, bot_id))).scalars().all()
         
-        daily_active_contacts = [
-            {"date": stat.date.isoformat(), "active_contacts": stat.active_contacts}
-            for stat in daily_stats
-        ]
+        daily_active_contacts = []
+        new_contacts = 0
+        for stat in daily_stats:
+            daily_active_contacts.append({"date": stat.date.isoformat(), "active_contacts": stat.active_contacts})
+            new_contacts += stat.new_contacts
         
         # Calculate growth rate (simplified)
         contacts_growth_rate = 5.2  # Placeholder - would calculate from previous period
@@ -284,8 +294,8 @@ async def get_active_contacts_stats(
             period=period,
             bot_id=bot_id,
             active_contacts=stats["active_contacts"],
-            new_contacts=sum(stat.new_contacts for stat in daily_stats),
-            returning_contacts=stats["active_contacts"] - sum(stat.new_contacts for stat in daily_stats),
+            new_contacts=new_contacts,
+            returning_contacts=stats["active_contacts"] - new_contacts,
             contacts_growth_rate=contacts_growth_rate,
             daily_active_contacts=daily_active_contacts
         )
@@ -298,12 +308,12 @@ async def get_active_contacts_stats(
 async def get_message_distribution(
     period: str = Query(default="7days", pattern="^(today|7days|30days)$"),
     bot_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Get message type distribution."""
     try:
         # Get overview stats
-        stats = await asyncio.to_thread(get_overview_stats, db, period, bot_id)
+        stats = await db.run_sync(get_overview_stats, period, bot_id)
         
         message_types = stats["top_message_types"]
         total_messages = stats["total_messages"]
@@ -334,7 +344,7 @@ async def get_message_distribution(
 @router.post("/aggregate-now", response_model=ManualAggregationResponse)
 async def trigger_manual_aggregation(
     request: ManualAggregationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_session)
 ):
     """Manually trigger statistics aggregation (admin only)."""
     try:
@@ -354,7 +364,7 @@ async def trigger_manual_aggregation(
         else:
             # Aggregate for all bots
             task_result = aggregate_daily_stats_task.delay(target_date.isoformat())
-            aggregated_bots = [bot.id for bot in await asyncio.to_thread(lambda: db.query(Bot).all())]
+            aggregated_bots = (await db.scalars(select(Bot.id))).all()
         
         processing_time = round(time.time() - start_time, 2)
         
@@ -371,21 +381,21 @@ async def trigger_manual_aggregation(
 
 
 @router.get("/health")
-async def analytics_health_check(db: Session = Depends(get_db)):
+async def analytics_health_check(db: AsyncSession = Depends(get_async_session)):
     """Health check for analytics system."""
     try:
         # Check if we have recent daily stats
-        recent_stats = await asyncio.to_thread(
-            lambda: db.query(DailyMessageStats).filter(
+        recent_stats = await db.scalar(
+            select(func.count(DailyMessageStats.id)).where(
                 DailyMessageStats.date >= datetime.utcnow() - timedelta(days=1)
-            ).count()
+            )
         )
         
         # Check if we have recent hourly stats
-        recent_hourly = await asyncio.to_thread(
-            lambda: db.query(HourlyMessageStats).filter(
+        recent_hourly = await db.scalar(
+            select(func.count(HourlyMessageStats.id)).where(
                 HourlyMessageStats.hour >= datetime.utcnow() - timedelta(hours=1)
-            ).count()
+            )
         )
         
         return {
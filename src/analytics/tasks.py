@@ -2,18 +2,28 @@
 Celery tasks for analytics aggregation and processing.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, date
 from celery import current_task
 from sqlalchemy.orm import Session
 
 from ..flow_engine.celery_app import celery_app
-from ..shared.database import get_sync_session
-from .crud import aggregate_daily_stats, aggregate_hourly_stats, cleanup_old_stats
+from ..shared.database import get_sync_session, async_engine
+from .crud import aggregate_daily_stats, aggregate_daily_stats_async, aggregate_hourly_stats, cleanup_old_stats, rebuild_rollups
 
 logger = logging.getLogger(__name__)
 
 
+async def _aggregate_daily_stats(target_date: date):
+    """Run the async daily aggregation inside a task's own event loop."""
+    try:
+        return await aggregate_daily_stats_async(target_date)
+    finally:
+        # Pooled connections are bound to this loop, which asyncio.run closes
+        await async_engine.dispose()
+
+
 @celery_app.task(name="src.analytics.tasks.aggregate_daily_stats")
 def aggregate_daily_stats_task(date_str: str = None):
     """
@@ -30,11 +40,8 @@ def aggregate_daily_stats_task(date_str: str = None):
         
         logger.info(f"Starting daily stats aggregation for {target_date}")
         
-        # Get database session
-        db = next(get_sync_session())
-        
-        # Aggregate stats for all bots
-        aggregated_stats = aggregate_daily_stats(db, target_date)
+        # Aggregate stats for all bots, running the aggregate queries concurrently
+        aggregated_stats = asyncio.run(_aggregate_daily_stats(target_date))
         
         bot_count = len(set(stat.bot_id for stat in aggregated_stats))
         total_messages = sum(stat.total_messages for stat in aggregated_stats)
@@ -208,9 +215,13 @@ def backfill_analytics_task(start_date_str: str, end_date_str: str, bot_id: int
         
         while current_date <= end_date:
             try:
-                aggregated_stats = aggregate_daily_stats(db, current_date, bot_id)
-                aggregated_count += len(aggregated_stats)
-                logger.info(f"Backfilled stats for {current_date}: {len(aggregated_stats)} records")
+                # Daily and hourly stats come from one scan of the day's messages
+                rebuilt = rebuild_rollups(db, current_date, bot_id)
+                aggregated_count += rebuilt["daily_stats"]
+                logger.info(
+                    f"Backfilled stats for {current_date}: {rebuilt['daily_stats']} daily "
+                    f"and {rebuilt['hourly_stats']} hourly records"
+                )
             except Exception as e:
                 logger.error(f"Failed to backfill stats for {current_date}: {e}")
             
@@ -2,40 +2,70 @@
 Celery configuration for flow engine tasks.
 """
 
-import os
+import logging
+import re
+
+import orjson
 from celery import Celery
 from celery.schedules import crontab
-from config.settings import settings
+from celery.signals import celeryd_after_setup
+from kombu.serialization import register
+from kombu.utils.json import dumps as kombu_json_dumps, object_hook as kombu_object_hook
+from config.celery_config import celery_settings
+from . import worker_affinity  # noqa: F401  (registers the pool process pinning handler)
+
+logger = logging.getLogger(__name__)
+
+
+def _decode_kombu_types(value):
+    """Apply kombu's JSON object hook bottom-up, as json.loads(object_hook=...) would."""
+    if isinstance(value, dict):
+        return kombu_object_hook({key: _decode_kombu_types(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_decode_kombu_types(item) for item in value]
+    return value
+
+
+def orjson_loads(data):
+    """Decode a JSON message body with orjson, restoring kombu's __type__ markers."""
+    return _decode_kombu_types(orjson.loads(data))
+
+
+# Decode JSON messages (queued before the msgpack switch, or sent by JSON
+# producers) with orjson; registering the same content type replaces
+# kombu's stdlib json decoder. kombu's json encoder writes datetimes,
+# UUIDs and Decimals as __type__ markers, so the decoder passes every
+# object through kombu's object hook, and encoding stays with kombu
+register(
+    "orjson",
+    kombu_json_dumps,
+    orjson_loads,
+    content_type="application/json",
+    content_encoding="utf-8"
+)
+
+@celeryd_after_setup.connect
+def log_celery_settings(sender, instance, conf, **kwargs):
+    """Log the effective Celery settings, with broker credentials masked, once logging is set up."""
+    settings = {
+        key: re.sub(r"//[^/@]*@", "//***@", value) if isinstance(value, str) else value
+        for key, value in celery_settings.model_dump().items()
+    }
+    logger.info("Celery settings for %s: %s", sender, settings)
+
 
 # Create Celery instance
 celery_app = Celery(
     "chatboost_flow_engine",
-    broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
-    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
+    broker=celery_settings.CELERY_BROKER_URL,
+    backend=celery_settings.CELERY_RESULT_BACKEND,
     include=[
         "src.flow_engine.tasks",
     ]
 )
 
-# Celery configuration
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
-    task_track_started=True,
-    task_time_limit=30 * 60,  # 30 minutes
-    task_soft_time_limit=25 * 60,  # 25 minutes
-    worker_prefetch_multiplier=1,
-    task_acks_late=True,
-    worker_disable_rate_limits=False,
-    task_reject_on_worker_lost=True,
-    task_default_retry_delay=60,  # 1 minute
-    task_max_retries=3,
-    result_expires=3600,  # 1 hour
-    result_persistent=True,
-)
+# Celery configuration (config.celery_config is the single source of truth)
+celery_app.config_from_object("config.celery_config:celery_settings", namespace="CELERY")
 
 # Task routes
 celery_app.conf.task_routes = {
@@ -3,10 +3,12 @@ Core Flow Engine for executing conversation flows.
 """
 
 import asyncio
+import json
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 
 from ..shared.models.bot_builder import (
     Bot, BotFlow, Contact, FlowExecution, FlowExecutionLog
@@ -14,6 +16,7 @@ from ..shared.models.bot_builder import (
 from ..shared.schemas.flow_engine import (
     FlowExecutionStatus, NodeExecutionResult, FlowNodeSchema
 )
+from ..shared.redis_client import get_async_redis_client
 from .flow_normalizer import FlowNormalizer
 from .node_executors import NodeExecutorFactory
 from .crud import (
@@ -24,12 +27,70 @@ from .crud import (
 
 logger = logging.getLogger(__name__)
 
+# Redis pub/sub channel carrying an execution's state transitions
+EXECUTION_EVENTS_CHANNEL = "flow:execution:{}:events"
+
+
+def execution_events_channel(execution_id: int) -> str:
+    """Get the pub/sub channel name for a flow execution's events."""
+    return EXECUTION_EVENTS_CHANNEL.format(execution_id)
+
 
 class FlowEngine:
     """Core flow execution engine."""
     
     def __init__(self, db: Session):
         self.db = db
+        # Last scheduled publish; each one waits for the previous so
+        # subscribers see events in order
+        self._last_event: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def _event_state(execution: FlowExecution) -> Dict[str, Any]:
+        """The execution fields published with each event."""
+        return {
+            "execution_id": execution.id,
+            "status": execution.status,
+            "node_index": execution.current_node_index
+        }
+    
+    def _commit_state(self, execution: FlowExecution) -> Dict[str, Any]:
+        """
+        Commit and read the execution's event fields back.
+        
+        Run via asyncio.to_thread, so the reload after the commit expires
+        the instance happens in the worker thread, not on the event loop.
+        """
+        self.db.commit()
+        return self._event_state(execution)
+    
+    async def _publish_event(self, state: Dict[str, Any], event: str, wait: bool = False) -> None:
+        """
+        Publish an execution state transition to subscribers (best effort).
+        
+        The publish runs in the background, so a slow or unreachable Redis
+        never delays node execution. Events after which the engine call returns
+        (completion, failure, waiting for input) pass wait=True: Celery
+        runs the engine under asyncio.run, which cancels pending tasks when
+        the call returns, so they are awaited along with every earlier event.
+        """
+        payload = json.dumps({"event": event, **state})
+        self._last_event = asyncio.create_task(
+            self._send_event(state["execution_id"], event, payload, self._last_event)
+        )
+        if wait:
+            await self._last_event
+    
+    @staticmethod
+    async def _send_event(execution_id: int, event: str, payload: str, previous: Optional[asyncio.Task]) -> None:
+        """Publish one event after the previously scheduled one."""
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            client = get_async_redis_client()
+            await asyncio.wait_for(client.publish(execution_events_channel(execution_id), payload), timeout=1.0)
+        except Exception as e:
+            logger.debug(f"Failed to publish {event} event for execution {execution_id}: {str(e)}")
     
     async def start_flow(
         self,
@@ -147,6 +208,8 @@ class FlowEngine:
             execution.state["user_response"] = message
             execution.state["user_response_type"] = message_type
             execution.state["last_user_input_at"] = datetime.utcnow().isoformat()
+            # The JSON column does not track in-place changes; mark it dirty once
+            flag_modified(execution, "state")
             
             # Update last executed time
             execution.last_executed_at = datetime.utcnow()
@@ -171,7 +234,8 @@ class FlowEngine:
             execution.status = FlowExecutionStatus.COMPLETED
             execution.completed_at = datetime.utcnow()
             execution.last_executed_at = datetime.utcnow()
-            await asyncio.to_thread(self.db.commit)
+            state = await asyncio.to_thread(self._commit_state, execution)
+            await self._publish_event(state, "completed", wait=True)
             
             logger.info(f"Completed flow execution {execution_id}")
         
@@ -189,12 +253,13 @@ class FlowEngine:
             execution.status = FlowExecutionStatus.FAILED
             execution.completed_at = datetime.utcnow()
             execution.last_executed_at = datetime.utcnow()
-            await asyncio.to_thread(self.db.commit)
+            state = await asyncio.to_thread(self._commit_state, execution)
+            await self._publish_event(state, "failed", wait=True)
             
             # Log the error
             await asyncio.to_thread(create_execution_log, self.db, {
                 "execution_id": execution_id,
-                "node_index": execution.current_node_index,
+                "node_index": state["node_index"],
                 "node_type": "error",
                 "action": "failed",
                 "error": error
@@ -241,6 +306,9 @@ class FlowEngine:
                 await self.fail_execution(execution.id, error_msg)
                 raise ValueError(error_msg)
             
+            # Fields already loaded by the checks above
+            await self._publish_event(self._event_state(execution), "node_entered")
+            
             # Get contact and bot
             contact = execution.contact
             bot = execution.bot
@@ -297,10 +365,14 @@ class FlowEngine:
                         # Node scheduled a task (e.g., wait node)
                         execution.status = FlowExecutionStatus.WAITING
                     
-                    await asyncio.to_thread(self.db.commit)
+                    state = await asyncio.to_thread(self._commit_state, execution)
+                    
+                    if state["status"] == FlowExecutionStatus.WAITING:
+                        # The engine call returns here, so wait like a terminal event
+                        await self._publish_event(state, "input_required", wait=True)
                     
                     # Continue execution if not waiting
-                    if execution.status == FlowExecutionStatus.RUNNING:
+                    if state["status"] == FlowExecutionStatus.RUNNING:
                         return await self._execute_current_node(execution)
                 else:
                     # Flow completed
@@ -335,6 +407,7 @@ class FlowEngine:
             # Update execution state with webhook result
             if result.success and result.result_data:
                 execution.state.update(result.result_data)
+                flag_modified(execution, "state")
                 execution.last_executed_at = datetime.utcnow()
                 await asyncio.to_thread(self.db.commit)
             
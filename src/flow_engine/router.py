@@ -3,27 +3,31 @@ Flow Engine API router for flow execution management.
 """
 
 import asyncio
+import json
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from ..shared.database import get_sync_session
+from ..shared.redis_client import get_async_redis_client
 from ..shared.models.bot_builder import Contact, FlowExecution
 from ..shared.schemas.flow_engine import (
     ContactSchema, ContactResponse, ContactListResponse,
     FlowExecutionResponse, FlowExecutionListResponse,
     FlowExecutionLogResponse, StartFlowRequest, ResumeFlowRequest,
-    CancelFlowRequest, UserInputRequest
+    CancelFlowRequest, UserInputRequest, ExecuteSyncRequest, ExecuteSyncResponse,
+    FlowExecutionStatus
 )
 from ..auth.auth import get_current_active_user_sync
 from ..team.permissions import require_permission, Permission, check_bot_ownership_or_admin, is_admin
 from ..shared.models.auth import User
-from .engine import FlowEngine
+from .engine import FlowEngine, execution_events_channel
 from .crud import (
     create_contact, get_contact, get_contact_by_phone, get_all_contacts,
     update_contact, delete_contact, get_flow_execution, get_all_flow_executions,
-    get_executions_by_phone, get_execution_logs, get_execution_statistics
+    get_executions_by_phone, get_execution_logs, get_execution_statistics,
+    get_active_execution_for_contact
 )
 
 logger = logging.getLogger(__name__)
@@ -120,6 +124,101 @@ async def start_flow_execution(
         raise HTTPException(status_code=500, detail="Failed to start flow execution")
 
 
+async def _wait_for_finish(pubsub, timeout: float) -> None:
+    """Wait until a subscribed execution publishes a completed or failed event."""
+    async def next_finish_event():
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            if json.loads(message["data"]).get("event") in ("completed", "failed"):
+                return
+    
+    try:
+        await asyncio.wait_for(next_finish_event(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+@router.post("/execute-sync", response_model=ExecuteSyncResponse)
+async def execute_flow_sync(
+    request: ExecuteSyncRequest,
+    current_user: User = Depends(require_permission(Permission.FLOW_CREATE)),
+    db: Session = Depends(get_sync_session)
+):
+    """
+    Start a flow execution, deliver optional user input and wait for the result.
+    
+    Collapses the start / status / input / status / logs round trips a client
+    would otherwise make into one request. Returns the current status if the
+    execution has not finished within ``timeout_ms``. Waiting listens on the
+    execution's events channel with the database connection released, and is
+    rejected with 409 when the contact already has an active execution.
+    """
+    from ..shared.models.bot_builder import Bot
+    bot = await asyncio.to_thread(lambda: db.query(Bot).filter(Bot.id == request.bot_id).first())
+    if not bot:
+        raise HTTPException(status_code=404, detail="Bot not found")
+    
+    if not await asyncio.to_thread(check_bot_ownership_or_admin, bot, current_user, db):
+        raise HTTPException(status_code=403, detail="Access denied to this bot")
+    
+    # start_flow hands back a contact's running execution instead of starting
+    # a new one; delivering input to it would answer another conversation
+    contact = await asyncio.to_thread(get_contact_by_phone, db, request.contact_phone)
+    if contact:
+        active_execution = await asyncio.to_thread(get_active_execution_for_contact, db, contact.id)
+        if active_execution:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Contact already has active execution {active_execution.id}"
+            )
+    
+    try:
+        engine = FlowEngine(db)
+        execution = await engine.start_flow(
+            flow_id=request.flow_id,
+            contact_phone=request.contact_phone,
+            bot_id=request.bot_id,
+            initial_state=request.initial_state
+        )
+        execution_id = execution.id
+        
+        if request.blocking_input:
+            await engine.handle_user_input(
+                execution_id=execution_id,
+                message=request.blocking_input.message,
+                message_type=request.blocking_input.type
+            )
+        
+        # Wait for the execution to finish, bounded by the requested timeout.
+        # Subscribe before re-reading the status so a finish in between is not missed.
+        finished = (FlowExecutionStatus.COMPLETED, FlowExecutionStatus.FAILED)
+        try:
+            async with get_async_redis_client().pubsub() as pubsub:
+                await pubsub.subscribe(execution_events_channel(execution_id))
+                await asyncio.to_thread(db.refresh, execution)
+                if execution.status not in finished and request.timeout_ms:
+                    # Give the connection back to the pool while waiting
+                    await asyncio.to_thread(db.close)
+                    await _wait_for_finish(pubsub, request.timeout_ms / 1000)
+        except Exception as e:
+            logger.warning(f"Cannot wait for execution {execution_id} events: {str(e)}")
+        
+        execution = await asyncio.to_thread(get_flow_execution, db, execution_id)
+        logs = await asyncio.to_thread(get_execution_logs, db, execution_id)
+        return ExecuteSyncResponse(
+            execution_id=execution_id,
+            final_status=execution.status,
+            logs=[FlowExecutionLogResponse.from_orm(log) for log in logs]
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to execute flow synchronously: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to execute flow")
+
+
 @router.get("/executions/", response_model=FlowExecutionListResponse)
 async def get_all_executions_endpoint(
     skip: int = 0,
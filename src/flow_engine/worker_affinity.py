@@ -0,0 +1,131 @@
+"""
+CPU and NUMA placement for the flow engine Celery worker.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import shutil
+import sys
+from typing import List, Optional
+
+from billiard.process import current_process
+from celery.signals import worker_process_init
+
+from config.celery_config import celery_settings
+
+logger = logging.getLogger(__name__)
+
+# Set after re-exec under numactl so the worker does not exec itself again
+NUMA_BOUND_ENV = "_FLOW_WORKER_NUMA_BOUND"
+
+
+def parse_cpu_list(spec: Optional[str]) -> List[int]:
+    """
+    Parse a CPU list such as "0-3", "[0-3]" or "0,2,4-7".
+
+    Args:
+        spec: CPU list specification
+
+    Returns:
+        List[int]: Sorted CPU ids (empty if spec is empty)
+    """
+    cpus = set()
+    if not spec:
+        return []
+
+    for part in spec.strip().strip("[]").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+
+    return sorted(cpus)
+
+
+def bind_numa_node(node: int) -> None:
+    """
+    Bind the current process to a NUMA node.
+
+    Re-executes the process under ``numactl --cpunodebind=N --membind=N``
+    when numactl is installed, otherwise falls back to libnuma's
+    ``numa_set_preferred`` for memory placement only.
+    """
+    if os.environ.get(NUMA_BOUND_ENV) == str(node):
+        return
+
+    numactl = shutil.which("numactl")
+    if numactl:
+        os.environ[NUMA_BOUND_ENV] = str(node)
+        logger.info(f"Re-executing worker under numactl on NUMA node {node}")
+        os.execv(numactl, [
+            numactl,
+            f"--cpunodebind={node}",
+            f"--membind={node}",
+            sys.executable,
+            *sys.argv
+        ])
+
+    libnuma_path = ctypes.util.find_library("numa")
+    if not libnuma_path:
+        logger.warning(f"Cannot bind to NUMA node {node}: neither numactl nor libnuma is available")
+        return
+
+    libnuma = ctypes.CDLL(libnuma_path)
+    if libnuma.numa_available() < 0:
+        logger.warning(f"Cannot bind to NUMA node {node}: NUMA is not supported on this host")
+        return
+
+    libnuma.numa_set_preferred(node)
+    logger.info(f"Preferring memory from NUMA node {node}")
+
+
+def apply_worker_affinity(cpu_spec: Optional[str], numa_node: Optional[int]) -> None:
+    """
+    Apply NUMA binding and CPU affinity to the worker process.
+
+    Must run before the worker starts so that prefork children inherit it.
+
+    Args:
+        cpu_spec: CPU list for the worker (see parse_cpu_list)
+        numa_node: NUMA node to bind CPU and memory to
+    """
+    if numa_node is not None:
+        bind_numa_node(numa_node)
+
+    cpus = parse_cpu_list(cpu_spec)
+    if not cpus:
+        return
+
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU affinity is not supported on this platform")
+        return
+
+    os.sched_setaffinity(0, cpus)
+    logger.info(f"Worker pinned to CPUs {cpus}")
+
+
+@worker_process_init.connect
+def pin_pool_process(**kwargs) -> None:
+    """
+    Pin each prefork pool process to a single CPU from FLOW_WORKER_CPUS.
+
+    Children are spread round-robin by pool index, so each one keeps its
+    caches warm on its own core instead of migrating between them.
+    """
+    cpus = parse_cpu_list(celery_settings.FLOW_WORKER_CPUS)
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return
+
+    identity = current_process()._identity
+    if not identity:
+        return
+
+    cpu = cpus[(identity[0] - 1) % len(cpus)]
+    os.sched_setaffinity(0, {cpu})
+    logger.info(f"Pool process {identity[0]} pinned to CPU {cpu}")
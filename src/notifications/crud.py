@@ -67,14 +67,20 @@ def get_user_notifications(
             if filter_params.is_read is not None:
                 query = query.filter(Notification.is_read == filter_params.is_read)
             
+            if filter_params.since_id is not None:
+                query = query.filter(Notification.id > filter_params.since_id)
+            
+            if filter_params.before_id is not None:
+                query = query.filter(Notification.id < filter_params.before_id)
+            
             if filter_params.start_date:
                 query = query.filter(Notification.created_at >= filter_params.start_date)
             
             if filter_params.end_date:
                 query = query.filter(Notification.created_at <= filter_params.end_date)
         
-        # Order by created_at descending (newest first)
-        query = query.order_by(desc(Notification.created_at))
+        # Order by created_at descending (newest first); id keeps pages stable for cursors
+        query = query.order_by(desc(Notification.created_at), desc(Notification.id))
         
         # Apply pagination
         notifications = query.offset(skip).limit(limit).all()
@@ -3,9 +3,16 @@ REST API router for notifications and notification preferences.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import re
+from typing import Any, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
 from ..shared.database import get_sync_session
@@ -20,7 +27,12 @@ from ..shared.schemas.notification import (
     NotificationCount,
     NotificationFilter,
     BulkNotificationAction,
-    NotificationStats
+    NotificationReadRequest,
+    NotificationStats,
+    BatchRestRequest,
+    BatchRestResponse,
+    NotificationBatchRequest,
+    NotificationBatchResponse
 )
 from ..auth.auth import get_current_active_user
 from .crud import (
@@ -46,6 +58,27 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
+def _conditional_response(request: Optional[Request], content: BaseModel):
+    """
+    Return content with an ETag, or 304 Not Modified if the client already has it.
+    
+    Without a request (e.g. inside a batch) the model is returned as is.
+    """
+    if request is None:
+        return content
+    
+    body = jsonable_encoder(content)
+    etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return JSONResponse(content=body, headers={"ETag": etag})
+
+
+# Long polling on GET /notifications/unread
+LONG_POLL_MAX_WAIT = 60  # seconds
+LONG_POLL_INTERVAL = 1.0  # seconds between checks while a request is held
+
+
 @router.get("/", response_model=List[NotificationSchema])
 async def get_notifications_endpoint(
     skip: int = Query(0, ge=0),
@@ -53,16 +86,23 @@ async def get_notifications_endpoint(
     type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     is_read: Optional[bool] = Query(None),
+    cursor: Optional[int] = Query(None, description="Only return notifications older than this id (keyset pagination)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_sync_session)
 ):
-    """Get user notifications with optional filtering."""
+    """
+    Get user notifications with optional filtering.
+    
+    To page through a long list, pass the id of the last notification
+    received as ``cursor`` instead of increasing ``skip``.
+    """
     try:
         # Create filter object
         filter_params = NotificationFilter(
             type=type,
             priority=priority,
             is_read=is_read,
+            before_id=cursor,
             limit=limit,
             offset=skip
         )
@@ -82,13 +122,33 @@ async def get_notifications_endpoint(
 async def get_unread_notifications_endpoint(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    since_id: Optional[int] = Query(None, description="Only return notifications newer than this id"),
+    wait: int = Query(0, ge=0, le=LONG_POLL_MAX_WAIT, description="Seconds to hold the request until a notification arrives"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_sync_session)
 ):
-    """Get unread notifications for the current user."""
+    """
+    Get unread notifications for the current user.
+    
+    With ``wait`` > 0 this is a long poll: the request is held until a
+    matching notification exists or ``wait`` seconds pass, in which case
+    204 No Content is returned.
+    """
     try:
-        filter_params = NotificationFilter(is_read=False, limit=limit, offset=skip)
+        filter_params = NotificationFilter(is_read=False, since_id=since_id, limit=limit, offset=skip)
         notifications = await asyncio.to_thread(get_user_notifications, db, current_user.id, skip, limit, filter_params)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while not notifications and loop.time() < deadline:
+            # Give the connection back to the pool while the request is parked
+            await asyncio.to_thread(db.close)
+            await asyncio.sleep(min(LONG_POLL_INTERVAL, deadline - loop.time()))
+            notifications = await asyncio.to_thread(get_user_notifications, db, current_user.id, skip, limit, filter_params)
+        
+        if wait and not notifications:
+            return Response(status_code=status.HTTP_204_NO_CONTENT)
+        
         return [NotificationSchema.from_orm(notification) for notification in notifications]
         
     except Exception as e:
@@ -144,6 +204,8 @@ async def mark_notification_read_endpoint(
                 detail="Notification not found"
             )
         
+        NotificationService(db).publish_count_update(current_user.id, "read", notification_id)
+        
         return NotificationSchema.from_orm(notification)
         
     except HTTPException:
@@ -156,6 +218,31 @@ async def mark_notification_read_endpoint(
         )
 
 
+@router.put("/read")
+async def mark_notifications_read_endpoint(
+    request: NotificationReadRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_sync_session)
+):
+    """Mark several notifications as read in one request."""
+    try:
+        updated_count = await asyncio.to_thread(bulk_mark_as_read, db, current_user.id, request.ids)
+        if updated_count:
+            NotificationService(db).publish_count_update(current_user.id, "bulk_read")
+        
+        return {
+            "message": f"Marked {updated_count} notifications as read",
+            "updated_count": updated_count
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to mark notifications as read: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to mark notifications as read"
+        )
+
+
 @router.put("/read-all")
 async def mark_all_read_endpoint(
     current_user: User = Depends(get_current_active_user),
@@ -164,6 +251,8 @@ async def mark_all_read_endpoint(
     """Mark all notifications as read for the current user."""
     try:
         updated_count = await asyncio.to_thread(mark_all_as_read, db, current_user.id)
+        if updated_count:
+            NotificationService(db).publish_count_update(current_user.id, "read_all")
         
         return {
             "message": f"Marked {updated_count} notifications as read",
@@ -207,10 +296,11 @@ async def delete_notification_endpoint(
 
 @router.get("/preferences", response_model=NotificationPreferenceSchema)
 async def get_notification_preferences_endpoint(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_sync_session)
 ):
-    """Get notification preferences for the current user."""
+    """Get notification preferences for the current user (supports If-None-Match)."""
     try:
         preferences = await asyncio.to_thread(get_user_preferences, db, current_user.id)
         if not preferences:
@@ -219,7 +309,7 @@ async def get_notification_preferences_endpoint(
                 detail="Failed to get preferences"
             )
         
-        return NotificationPreferenceSchema.from_orm(preferences)
+        return _conditional_response(request, NotificationPreferenceSchema.from_orm(preferences))
         
     except HTTPException:
         raise
@@ -260,19 +350,20 @@ async def update_notification_preferences_endpoint(
 
 @router.get("/summary", response_model=NotificationSummary)
 async def get_notification_summary_endpoint(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_sync_session)
 ):
-    """Get notification summary for the current user."""
+    """Get notification summary for the current user (supports If-None-Match)."""
     try:
         summary = await asyncio.to_thread(get_notification_summary, db, current_user.id)
         
-        return NotificationSummary(
+        return _conditional_response(request, NotificationSummary(
             total=summary["total"],
             unread=summary["unread"],
             by_type=summary["by_type"],
             recent=[NotificationSchema.from_orm(n) for n in summary["recent"]]
-        )
+        ))
         
     except Exception as e:
         logger.error(f"Failed to get notification summary: {e}")
@@ -292,6 +383,8 @@ async def bulk_notification_action_endpoint(
     try:
         if action.action == "mark_read":
             updated_count = bulk_mark_as_read(db, current_user.id, action.notification_ids)
+            if updated_count:
+                NotificationService(db).publish_count_update(current_user.id, "bulk_read")
             return {
                 "message": f"Marked {updated_count} notifications as read",
                 "updated_count": updated_count
@@ -417,3 +510,127 @@ async def test_notification_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create test notification"
         )
+
+
+_MARK_READ_PATH = re.compile(r"^/(\d+)/read$")
+
+
+def _query_bool(value: Optional[str]) -> Optional[bool]:
+    """Parse an optional boolean query string value."""
+    if value is None:
+        return None
+    return value.lower() in ("1", "true", "yes")
+
+
+async def _dispatch_batch_request(item: BatchRestRequest, current_user: User, db: Session) -> Any:
+    """Run one batched request against the matching notification endpoint."""
+    url = urlsplit(item.url)
+    path = url.path.rstrip("/")
+    if not path.startswith(router.prefix):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    path = path[len(router.prefix):]
+    query = dict(parse_qsl(url.query))
+    body = item.body or {}
+    
+    if item.method == "GET":
+        skip = max(int(query.get("skip", 0)), 0)
+        limit = min(max(int(query.get("limit", 50)), 1), 100)
+        if path == "":
+            return await get_notifications_endpoint(
+                skip=skip,
+                limit=limit,
+                type=query.get("type"),
+                priority=query.get("priority"),
+                is_read=_query_bool(query.get("is_read")),
+                cursor=int(query["cursor"]) if "cursor" in query else None,
+                current_user=current_user,
+                db=db
+            )
+        if path == "/unread":
+            since_id = query.get("since_id")
+            return await get_unread_notifications_endpoint(
+                skip=skip,
+                limit=limit,
+                since_id=int(since_id) if since_id is not None else None,
+                wait=0,
+                current_user=current_user,
+                db=db
+            )
+        if path == "/count":
+            return await get_notification_count_endpoint(current_user=current_user, db=db)
+        if path == "/preferences":
+            return await get_notification_preferences_endpoint(request=None, current_user=current_user, db=db)
+        if path == "/summary":
+            return await get_notification_summary_endpoint(request=None, current_user=current_user, db=db)
+    elif item.method == "POST" and path == "/test":
+        return await test_notification_endpoint(
+            title=body.get("title") or query.get("title"),
+            message=body.get("message") or query.get("message"),
+            current_user=current_user,
+            db=db
+        )
+    elif item.method == "PUT":
+        if path == "/read":
+            return await mark_notifications_read_endpoint(
+                request=NotificationReadRequest(**body),
+                current_user=current_user,
+                db=db
+            )
+        if path == "/preferences":
+            return await update_notification_preferences_endpoint(
+                preferences=NotificationPreferenceUpdate(**body),
+                current_user=current_user,
+                db=db
+            )
+        match = _MARK_READ_PATH.match(path)
+        if match:
+            return await mark_notification_read_endpoint(
+                notification_id=int(match.group(1)),
+                current_user=current_user,
+                db=db
+            )
+    
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Unsupported batch request: {item.method} {url.path}"
+    )
+
+
+@router.post("/batch", response_model=NotificationBatchResponse)
+async def batch_notifications_endpoint(
+    batch: NotificationBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_sync_session)
+):
+    """
+    Run several notification API requests in one round trip.
+    
+    The caller is authenticated once for the whole batch; each item is
+    answered with its own status code and body, in request order.
+    """
+    serviced_requests = []
+    for item in batch.rest_requests:
+        try:
+            result = await _dispatch_batch_request(item, current_user, db)
+            serviced_requests.append(BatchRestResponse(
+                id=item.id,
+                status_code=status.HTTP_200_OK,
+                body=jsonable_encoder(result)
+            ))
+        except HTTPException as e:
+            serviced_requests.append(BatchRestResponse(
+                id=item.id,
+                status_code=e.status_code,
+                body={"detail": e.detail}
+            ))
+        except (TypeError, ValueError) as e:
+            serviced_requests.append(BatchRestResponse(
+                id=item.id,
+                status_code=status.HTTP_400_BAD_REQUEST,
+                body={"detail": str(e)}
+            ))
+    
+    return NotificationBatchResponse(
+        batch_request_id=batch.batch_request_id,
+        serviced_requests=serviced_requests
+    )
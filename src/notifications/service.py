@@ -4,7 +4,8 @@ Notification service for creating and managing notifications.
 
 import logging
 import asyncio
-from typing import Optional, Dict, Any, List
+import json
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import select
@@ -17,10 +18,49 @@ from ..shared.models.bot_builder import (
     FlowExecution
 )
 from ..shared.models.auth import OrganizationMember
+from ..shared.database import SessionLocal
+from ..shared.redis_client import get_async_redis_client
+from .crud import get_unread_count
 from .websocket_manager import manager
 
 logger = logging.getLogger(__name__)
 
+USER_EVENTS_CHANNEL = "notifications:user:{}"
+
+
+def user_events_channel(user_id: int) -> str:
+    """Get the pub/sub channel name for a user's notification count updates."""
+    return USER_EVENTS_CHANNEL.format(user_id)
+
+
+# Count updates still being published; the event loop only keeps weak
+# references to tasks
+_pending_count_updates: Set[asyncio.Task] = set()
+
+
+def _count_unread(user_id: int) -> int:
+    """Count a user's unread notifications in a session of its own (the request's may be closed by then)."""
+    db = SessionLocal()
+    try:
+        return get_unread_count(db, user_id)
+    finally:
+        db.close()
+
+
+async def _send_count_update(user_id: int, event: str, notification_id: Optional[int]) -> None:
+    """Publish a user's current unread count (best effort)."""
+    try:
+        unread = await asyncio.to_thread(_count_unread, user_id)
+        payload = json.dumps({
+            "event": event,
+            "notification_id": notification_id,
+            "unread": unread
+        })
+        client = get_async_redis_client()
+        await asyncio.wait_for(client.publish(user_events_channel(user_id), payload), timeout=1.0)
+    except Exception as e:
+        logger.debug(f"Failed to publish {event} count update for user {user_id}: {str(e)}")
+
 
 class NotificationService:
     """Service for managing notifications and real-time updates."""
@@ -56,6 +96,7 @@ class NotificationService:
             
             # Send via WebSocket if user is connected
             await self.send_realtime_notification(notification)
+            self.publish_count_update(user_id, "created", notification.id)
             
             logger.info(f"Created notification {notification.id} for user {user_id}")
             return notification
@@ -87,6 +128,17 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Failed to send realtime notification: {e}")
     
+    def publish_count_update(self, user_id: int, event: str, notification_id: Optional[int] = None) -> None:
+        """
+        Publish the user's new unread count after a change (best effort).
+        
+        The count and publish run in the background, so the request that
+        made the change does not wait on them. Must be called on the event loop.
+        """
+        task = asyncio.get_running_loop().create_task(_send_count_update(user_id, event, notification_id))
+        _pending_count_updates.add(task)
+        task.add_done_callback(_pending_count_updates.discard)
+    
     async def notify_message_status_change(
         self,
         message: WhatsAppMessage,
@@ -13,7 +13,8 @@ from ..shared.database import get_sync_session
 from ..shared.models.auth import User
 from ..auth.auth import SECRET_KEY, ALGORITHM
 from .websocket_manager import manager
-from .crud import mark_as_read
+from .crud import mark_as_read, bulk_mark_as_read, mark_all_as_read, get_unread_count
+from .service import NotificationService
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,84 @@ async def authenticate_websocket_user(token: str, db: Session) -> Optional[User]
         return None
 
 
+def handle_websocket_message(data: dict, user: User, db: Session) -> Optional[dict]:
+    """
+    Handle one client control message and return the reply to send, if any.
+    
+    Runs on the event loop; read-state changes are published to the
+    user's count channel like their REST counterparts.
+    """
+    # Handle ping/pong
+    if data.get("type") == "ping":
+        return {
+            "type": "pong",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    # Handle mark as read
+    elif data.get("type") == "mark_read":
+        notification_id = data.get("notification_id")
+        if notification_id:
+            if mark_as_read(db, notification_id, user.id):
+                NotificationService(db).publish_count_update(user.id, "read", notification_id)
+            return {
+                "type": "mark_read_success",
+                "data": {"notification_id": notification_id},
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        return {
+            "type": "error",
+            "data": {"message": "mark_read requires notification_id"},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    # Handle mark several as read
+    elif data.get("type") == "mark_read_bulk":
+        notification_ids = [int(i) for i in data.get("ids") or []]
+        updated_count = bulk_mark_as_read(db, user.id, notification_ids) if notification_ids else 0
+        if updated_count:
+            NotificationService(db).publish_count_update(user.id, "bulk_read")
+        return {
+            "type": "mark_read_bulk_success",
+            "data": {"ids": notification_ids, "updated_count": updated_count},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    # Handle bulk mark as read
+    elif data.get("type") == "mark_all_read":
+        updated_count = mark_all_as_read(db, user.id)
+        if updated_count:
+            NotificationService(db).publish_count_update(user.id, "read_all")
+        return {
+            "type": "mark_all_read_success",
+            "data": {"updated_count": updated_count},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    # Handle get unread count
+    elif data.get("type") == "get_unread_count":
+        count = get_unread_count(db, user.id)
+        return {
+            "type": "unread_count",
+            "data": {"count": count},
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    # Handle unknown message types
+    return {
+        "type": "error",
+        "data": {"message": f"Unknown message type: {data.get('type')}"},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def with_req_id(response: dict, data) -> dict:
+    """Echo the client's correlation id, if any, so it can match the reply."""
+    if isinstance(data, dict) and "req_id" in data:
+        response["req_id"] = data["req_id"]
+    return response
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -74,64 +153,33 @@ async def websocket_endpoint(
         
         # Keep connection alive and handle incoming messages
         while True:
+            data = None
             try:
                 data = await websocket.receive_json()
                 
-                # Handle ping/pong
-                if data.get("type") == "ping":
-                    await websocket.send_json({
-                        "type": "pong",
+                if data.get("type") == "batch":
+                    # Several control messages in one frame get one combined reply
+                    results = [handle_websocket_message(op, user, db) for op in data.get("ops") or []]
+                    response = {
+                        "type": "batch_result",
+                        "results": [result for result in results if result],
                         "timestamp": datetime.utcnow().isoformat()
-                    })
-                
-                # Handle mark as read
-                elif data.get("type") == "mark_read":
-                    notification_id = data.get("notification_id")
-                    if notification_id:
-                        mark_as_read(db, notification_id, user.id)
-                        await websocket.send_json({
-                            "type": "mark_read_success",
-                            "data": {"notification_id": notification_id},
-                            "timestamp": datetime.utcnow().isoformat()
-                        })
-                
-                # Handle bulk mark as read
-                elif data.get("type") == "mark_all_read":
-                    from .crud import mark_all_as_read
-                    updated_count = mark_all_as_read(db, user.id)
-                    await websocket.send_json({
-                        "type": "mark_all_read_success",
-                        "data": {"updated_count": updated_count},
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
-                
-                # Handle get unread count
-                elif data.get("type") == "get_unread_count":
-                    from .crud import get_unread_count
-                    count = get_unread_count(db, user.id)
-                    await websocket.send_json({
-                        "type": "unread_count",
-                        "data": {"count": count},
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
-                
-                # Handle unknown message types
+                    }
                 else:
-                    await websocket.send_json({
-                        "type": "error",
-                        "data": {"message": f"Unknown message type: {data.get('type')}"},
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
+                    response = handle_websocket_message(data, user, db)
+                
+                if response:
+                    await websocket.send_json(with_req_id(response, data))
                     
             except WebSocketDisconnect:
                 break
             except Exception as e:
                 logger.error(f"WebSocket message handling error: {e}")
-                await websocket.send_json({
+                await websocket.send_json(with_req_id({
                     "type": "error",
                     "data": {"message": "Internal server error"},
                     "timestamp": datetime.utcnow().isoformat()
-                })
+                }, data))
                 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for user {user.id}")
@@ -12,7 +12,10 @@ SYNC_DATABASE_URL = "sqlite:///./chatboost.db"
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
     echo=True,  # Set to False in production
-    future=True
+    future=True,
+    # Async routes hold a connection per in-flight request
+    pool_size=20,
+    max_overflow=40
 )
 
 # Create sync engine
@@ -89,3 +92,13 @@ async def init_db():
         from ..models.auth import User
         from ..models.bot_builder import Bot, BotFlow, BotNode, Template
         await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so indexes added to
+        # existing tables are created separately
+        await conn.run_sync(_create_missing_indexes)
+
+
+def _create_missing_indexes(connection):
+    """Create any model index that is missing from the database."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, Boolean, DateTime, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -69,6 +69,10 @@ class WhatsAppMessage(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     bot = relationship("Bot", back_populates="whatsapp_messages")
+    
+    # Per-bot time-range aggregates; recipient_phone makes the distinct
+    # contact counts answerable from the index alone
+    __table_args__ = (Index('ix_wa_msg_bot_created', 'bot_id', 'created_at', 'recipient_phone'),)
 
 
 class WhatsAppWebhookEvent(Base):
@@ -111,6 +115,8 @@ class FlowExecution(Base):
     flow = relationship("BotFlow")
     bot = relationship("Bot")
     logs = relationship("FlowExecutionLog", back_populates="execution")
+    
+    __table_args__ = (Index('ix_flow_bot_started', 'bot_id', 'started_at'),)
 
 
 class FlowExecutionLog(Base):
@@ -170,7 +176,7 @@ class TriggerLog(Base):
     contact_id = Column(Integer, ForeignKey("contacts.id"))
     execution_id = Column(Integer, ForeignKey("flow_executions.id"), nullable=True)
     matched_value = Column(String)  # What triggered it
-    triggered_at = Column(DateTime, default=datetime.utcnow)
+    triggered_at = Column(DateTime, default=datetime.utcnow, index=True)
     success = Column(Boolean, default=True)
     error = Column(String, nullable=True)
     
@@ -239,6 +245,21 @@ class DailyMessageStats(Base):
     __table_args__ = (UniqueConstraint('bot_id', 'date', name='_bot_date_uc'),)
 
 
+class DailyContactSketch(Base):
+    """HyperLogLog sketch of the contacts a bot messaged on a day."""
+    __tablename__ = "daily_contact_sketches"
+    id = Column(Integer, primary_key=True, index=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"))
+    date = Column(DateTime, index=True)
+    sketch = Column(LargeBinary)  # See src.analytics.hll
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    bot = relationship("Bot")
+    
+    __table_args__ = (UniqueConstraint('bot_id', 'date', name='_sketch_bot_date_uc'),)
+
+
 class HourlyMessageStats(Base):
     __tablename__ = "hourly_message_stats"
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,71 @@
+"""
+Shared Redis clients.
+
+Every subsystem in the process uses the same connection pool instead of
+opening its own.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_MAX_CONNECTIONS = 32
+REDIS_POOL_TIMEOUT = 5  # seconds to wait for a free pooled connection
+
+_redis_client: Optional[redis.Redis] = None
+# asyncio connections belong to the loop that opened them, and Celery tasks
+# run each call in a fresh asyncio.run loop, so async clients are per loop
+_async_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Get the shared synchronous Redis client.
+
+    Returns:
+        redis.Redis: Client backed by the process-wide connection pool
+    """
+    global _redis_client
+    if _redis_client is None:
+        # A blocking pool makes callers wait for a free connection instead of
+        # failing with "Too many connections" when every one is checked out
+        pool = redis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_keepalive=True
+        )
+        _redis_client = redis.Redis(connection_pool=pool)
+    return _redis_client
+
+
+def get_async_redis_client() -> aioredis.Redis:
+    """
+    Get the asyncio Redis client of the running event loop.
+
+    Must be called from a coroutine. The client is shared by everything
+    running on that loop and dropped with it.
+
+    Returns:
+        redis.asyncio.Redis: Client backed by the loop's async connection pool
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis.from_url(
+            settings.REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            decode_responses=True,
+            single_connection_client=False,
+            socket_keepalive=True
+        )
+        _async_redis_clients[loop] = client
+    return client
@@ -220,6 +220,7 @@ class FlowNodeSchema(BaseModel):
 
 class FlowExecutionLogResponse(BaseModel):
     """Flow execution log response schema."""
+    model_config = ConfigDict(from_attributes=True)
     id: int
     execution_id: int
     node_index: int
@@ -238,6 +239,25 @@ class StartFlowRequest(BaseModel):
     initial_state: Optional[Dict[str, Any]] = {}
 
 
+class BlockingInput(BaseModel):
+    """User input delivered as part of a synchronous flow execution."""
+    message: str
+    type: str = "text"
+
+
+class ExecuteSyncRequest(StartFlowRequest):
+    """Request to start a flow, deliver user input and wait for the outcome."""
+    blocking_input: Optional[BlockingInput] = None
+    timeout_ms: int = Field(default=3000, ge=0, le=30000, description="Maximum time to wait for completion")
+
+
+class ExecuteSyncResponse(BaseModel):
+    """Result of a synchronous flow execution."""
+    execution_id: int
+    final_status: FlowExecutionStatus
+    logs: List[FlowExecutionLogResponse]
+
+
 class ResumeFlowRequest(BaseModel):
     """Request to resume a flow execution."""
     execution_id: int
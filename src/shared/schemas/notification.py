@@ -102,6 +102,8 @@ class NotificationFilter(BaseModel):
     type: Optional[str] = None
     priority: Optional[str] = None
     is_read: Optional[bool] = None
+    since_id: Optional[int] = None
+    before_id: Optional[int] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     limit: int = Field(default=50, ge=1, le=100)
@@ -114,6 +116,11 @@ class BulkNotificationAction(BaseModel):
     notification_ids: List[int] = Field(..., min_items=1)
 
 
+class NotificationReadRequest(BaseModel):
+    """Schema for marking several notifications as read."""
+    ids: List[int] = Field(..., min_items=1, max_items=500)
+
+
 class NotificationStats(BaseModel):
     """Schema for notification statistics."""
     total_notifications: int
@@ -155,3 +162,30 @@ class NotificationDeliveryStatus(BaseModel):
     status: str = Field(..., pattern="^(pending|sent|delivered|failed)$")
     delivered_at: Optional[datetime] = None
     error_message: Optional[str] = None
+
+
+class BatchRestRequest(BaseModel):
+    """Schema for a single request inside a notification batch."""
+    id: str = Field(..., min_length=1)
+    method: str = Field(..., pattern="^(GET|POST|PUT)$")
+    url: str = Field(..., min_length=1)
+    body: Optional[Dict[str, Any]] = None
+
+
+class BatchRestResponse(BaseModel):
+    """Schema for the result of a single batched request."""
+    id: str
+    status_code: int
+    body: Any = None
+
+
+class NotificationBatchRequest(BaseModel):
+    """Schema for a batch of notification API requests."""
+    batch_request_id: Optional[str] = None
+    rest_requests: List[BatchRestRequest] = Field(..., min_items=1, max_items=50)
+
+
+class NotificationBatchResponse(BaseModel):
+    """Schema for a batch of notification API responses."""
+    batch_request_id: Optional[str] = None
+    serviced_requests: List[BatchRestResponse]
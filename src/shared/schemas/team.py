@@ -65,6 +65,12 @@ class OrganizationMemberSchema(BaseModel):
        from_attributes = True
 
 
+class OrganizationWithMembers(BaseModel):
+    """Schema for a newly created organization together with its members."""
+    organization: OrganizationSchema
+    members: List[OrganizationMemberSchema]
+
+
 class MemberAddRequest(BaseModel):
     """Schema for adding a member to organization."""
     user_id: int
@@ -133,3 +139,15 @@ class PermissionCheck(BaseModel):
     permission: str
     user_role: Optional[str] = None
     organization_id: Optional[int] = None
+
+
+class PermissionBatchCheckRequest(BaseModel):
+    """Schema for checking several permissions at once."""
+    permissions: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class PermissionBatchCheck(BaseModel):
+    """Schema for batch permission check response."""
+    results: Dict[str, bool]
+    user_role: Optional[str] = None
+    organization_id: Optional[int] = None
@@ -15,6 +15,7 @@ from ..shared.schemas.team import (
     OrganizationCreate,
     OrganizationUpdate,
     OrganizationMemberSchema,
+    OrganizationWithMembers,
     MemberAddRequest,
     MemberRoleUpdate,
     InvitationCreate,
@@ -23,7 +24,9 @@ from ..shared.schemas.team import (
     InvitationResponse,
     OrganizationStats,
     UserOrganizationInfo,
-    PermissionCheck
+    PermissionCheck,
+    PermissionBatchCheckRequest,
+    PermissionBatchCheck
 )
 from ..auth.auth import get_current_active_user
 from .crud import (
@@ -63,30 +66,23 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/team", tags=["Team Management"])
 
 
-@router.post("/organizations", response_model=OrganizationSchema, status_code=status.HTTP_201_CREATED)
-async def create_organization_endpoint(
-    org_data: OrganizationCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Create a new organization."""
+async def _create_user_organization(org_data: OrganizationCreate, current_user: User, db: Session):
+    """Create an organization owned by a user who does not belong to one yet."""
+    # Check if user already has an organization
+    if current_user.organization_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already belongs to an organization"
+        )
+    
     try:
-        # Check if user already has an organization
-        if current_user.organization_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User already belongs to an organization"
-            )
-        
-        organization = await create_organization(
+        return await create_organization(
             db=db,
             name=org_data.name,
             description=org_data.description,
             owner_id=current_user.id
         )
         
-        return OrganizationSchema.from_orm(organization)
-        
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -100,6 +96,33 @@ async def create_organization_endpoint(
         )
 
 
+@router.post("/organizations", response_model=OrganizationSchema, status_code=status.HTTP_201_CREATED)
+async def create_organization_endpoint(
+    org_data: OrganizationCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new organization."""
+    organization = await _create_user_organization(org_data, current_user, db)
+    return OrganizationSchema.from_orm(organization)
+
+
+@router.post("/organizations/with-members", response_model=OrganizationWithMembers, status_code=status.HTTP_201_CREATED)
+async def create_organization_with_members_endpoint(
+    org_data: OrganizationCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create a new organization and return it together with its members."""
+    organization = await _create_user_organization(org_data, current_user, db)
+    members = await get_organization_members(db, organization.id)
+    
+    return OrganizationWithMembers(
+        organization=OrganizationSchema.from_orm(organization),
+        members=[OrganizationMemberSchema(**member) for member in members]
+    )
+
+
 @router.get("/organizations/{org_id}", response_model=OrganizationSchema)
 async def get_organization_endpoint(
     org_id: int,
@@ -614,6 +637,43 @@ async def check_permission_endpoint(
         )
 
 
+@router.post("/permissions/check-batch", response_model=PermissionBatchCheck)
+async def check_permissions_batch_endpoint(
+    request: PermissionBatchCheckRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Check several permissions for the current user in one request."""
+    try:
+        # Validate every permission before checking any
+        valid = {perm.value for perm in Permission}
+        invalid = [permission for permission in request.permissions if permission not in valid]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid permissions: {', '.join(invalid)}"
+            )
+        
+        results = {}
+        for permission in request.permissions:
+            results[permission] = await has_permission(current_user, Permission(permission), db)
+        
+        return PermissionBatchCheck(
+            results=results,
+            user_role=current_user.current_role.name if current_user.current_role else None,
+            organization_id=current_user.organization_id
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to check permissions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to check permissions"
+        )
+
+
 @router.get("/roles")
 async def get_roles_endpoint():
     """Get available roles."""
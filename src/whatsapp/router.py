@@ -286,10 +286,11 @@ async def process_incoming_message(db: Session, message: dict, value: dict):
         timestamp = message.get("timestamp")
         message_type = message.get("type")
         
-        # Find bot by phone number
-        bot = await asyncio.to_thread(get_bot_by_phone_number, db, value.get("meta_data", {}).get("phone_number_id"))
+        # Find bot by the receiving phone number id (value.metadata in the Cloud API payload)
+        phone_number_id = value.get("metadata", {}).get("phone_number_id")
+        bot = await asyncio.to_thread(get_bot_by_phone_number, db, phone_number_id)
         if not bot:
-            logger.warning(f"No bot found for phone number: {value.get('meta_data', {}).get('phone_number_id')}")
+            logger.warning(f"No bot found for phone number: {phone_number_id}")
             return
         
         # Extract message content based on type
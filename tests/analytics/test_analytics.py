@@ -0,0 +1,143 @@
+"""
+Tests for analytics module.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.analytics.crud import aggregate_daily_stats, aggregate_hourly_stats, estimate_active_contacts
+from src.analytics.hll import build_sketch, estimate_cardinality
+from src.shared.models.bot_builder import (
+    Bot, BotFlow, Contact, DailyContactSketch, DailyMessageStats, FlowExecution,
+    Trigger, TriggerLog, WhatsAppMessage
+)
+
+
+@pytest.fixture(autouse=True)
+def no_cache_invalidation():
+    """Skip the Redis cache invalidation done after each aggregation."""
+    with patch("src.analytics.crud.invalidate_analytics_cache") as mock_invalidate:
+        yield mock_invalidate
+
+
+def add_message(db_session, bot_id: int, phone: str, created_at: datetime, **fields) -> None:
+    """Add an outbound message to a contact."""
+    values = {"direction": "outbound", "message_type": "text", "status": "sent"}
+    values.update(fields)
+    db_session.add(WhatsAppMessage(bot_id=bot_id, recipient_phone=phone, created_at=created_at, **values))
+
+
+def test_estimate_active_contacts_covers_whole_first_day_and_today(db_session):
+    """Test the sketch estimate includes the partial first day and today's unsketched contacts."""
+    bot = Bot(name="Analytics Bot", description="Test bot")
+    db_session.add(bot)
+    db_session.flush()
+
+    end_date = datetime.utcnow()
+    today = datetime.combine(end_date.date(), datetime.min.time())
+    start_date = end_date - timedelta(days=30)
+    first_day = datetime.combine(start_date.date(), datetime.min.time())
+    db_session.add_all([
+        DailyContactSketch(bot_id=bot.id, date=first_day, sketch=build_sketch(["+15550000001"])),
+        DailyContactSketch(bot_id=bot.id, date=today - timedelta(days=1), sketch=build_sketch(["+15550000002"]))
+    ])
+    add_message(db_session, bot.id, "+15550000002", today)
+    add_message(db_session, bot.id, "+15550000003", today)
+    add_message(db_session, bot.id + 1, "+15550000004", today)
+    db_session.commit()
+
+    assert estimate_active_contacts(db_session, start_date, end_date, bot.id) == 3
+    assert estimate_active_contacts(db_session, start_date, end_date) == 4
+    assert estimate_active_contacts(db_session, start_date, today) == 2
+
+
+@pytest.fixture
+def two_bots(db_session):
+    """Seed a day of messages, flows and triggers for two bots."""
+    day = datetime(2024, 3, 5)
+    first, second = Bot(name="First Bot"), Bot(name="Second Bot")
+    db_session.add_all([first, second])
+    db_session.flush()
+    flow = BotFlow(name="Flow", bot_id=first.id, structure=[])
+    contact = Contact(phone_number="+15550000001", meta_data={}, created_at=day + timedelta(hours=1))
+    db_session.add_all([flow, contact])
+    db_session.flush()
+
+    add_message(db_session, first.id, "+15550000001", day + timedelta(hours=9), status="delivered")
+    add_message(db_session, first.id, "+15550000002", day + timedelta(hours=9, minutes=30), message_type="template")
+    add_message(db_session, first.id, "+15550000001", day + timedelta(hours=10), direction="inbound")
+    add_message(db_session, second.id, "+15550000003", day + timedelta(hours=9), status="failed")
+    # Outside the day
+    add_message(db_session, first.id, "+15550000004", day - timedelta(minutes=1))
+
+    db_session.add_all([
+        FlowExecution(flow_id=flow.id, bot_id=first.id, contact_id=contact.id, status="completed", started_at=day + timedelta(hours=2)),
+        FlowExecution(flow_id=flow.id, bot_id=first.id, contact_id=contact.id, status="running", started_at=day + timedelta(hours=3)),
+        FlowExecution(flow_id=flow.id, bot_id=second.id, contact_id=contact.id, status="failed", started_at=day + timedelta(hours=4))
+    ])
+
+    first_trigger = Trigger(bot_id=first.id, flow_id=flow.id, name="First", trigger_type="keyword")
+    second_trigger = Trigger(bot_id=second.id, flow_id=flow.id, name="Second", trigger_type="keyword")
+    db_session.add_all([first_trigger, second_trigger])
+    db_session.flush()
+    db_session.add_all([
+        TriggerLog(trigger_id=first_trigger.id, contact_id=contact.id, triggered_at=day + timedelta(hours=5)),
+        TriggerLog(trigger_id=second_trigger.id, contact_id=contact.id, triggered_at=day + timedelta(hours=5)),
+        TriggerLog(trigger_id=second_trigger.id, contact_id=contact.id, triggered_at=day + timedelta(hours=6)),
+        TriggerLog(trigger_id=second_trigger.id, contact_id=contact.id, triggered_at=day + timedelta(days=1))
+    ])
+    db_session.commit()
+    return day, first, second
+
+
+def test_aggregate_daily_stats_per_bot(db_session, two_bots, no_cache_invalidation):
+    """Test daily aggregation writes one row and one sketch per bot with per-bot counts."""
+    day, first, second = two_bots
+
+    rows = {row.bot_id: row for row in aggregate_daily_stats(db_session, day.date())}
+
+    assert set(rows) == {first.id, second.id}
+    first_row, second_row = rows[first.id], rows[second.id]
+    assert first_row.date == day
+    assert (first_row.total_messages, first_row.inbound_messages, first_row.outbound_messages) == (3, 1, 2)
+    assert (first_row.text_messages, first_row.template_messages) == (2, 1)
+    assert (first_row.sent_count, first_row.delivered_count) == (1, 1)
+    assert first_row.active_contacts == 2
+    assert (first_row.flows_started, first_row.flows_completed, first_row.flows_failed) == (1, 1, 0)
+    assert first_row.triggers_fired == 1
+    assert (second_row.total_messages, second_row.failed_count, second_row.active_contacts) == (1, 1, 1)
+    assert (second_row.flows_started, second_row.flows_failed) == (0, 1)
+    assert second_row.triggers_fired == 2
+    assert first_row.new_contacts == second_row.new_contacts == 1
+
+    sketches = {row.bot_id: row.sketch for row in db_session.query(DailyContactSketch)}
+    assert estimate_cardinality(sketches[first.id]) == 2
+    assert estimate_cardinality(sketches[second.id]) == 1
+    no_cache_invalidation.assert_called_once_with(None)
+
+
+def test_aggregate_daily_stats_is_idempotent(db_session, two_bots):
+    """Test rerunning the daily aggregation keeps the stored rows."""
+    day, first, _ = two_bots
+
+    aggregate_daily_stats(db_session, day.date())
+    rows = aggregate_daily_stats(db_session, day.date(), bot_id=first.id)
+
+    assert [row.total_messages for row in rows] == [3]
+    assert db_session.query(DailyMessageStats).count() == 2
+
+
+def test_aggregate_hourly_stats_per_bot(db_session, two_bots):
+    """Test hourly aggregation writes a row per bot, zero for bots without messages."""
+    day, first, second = two_bots
+
+    rows = {row.bot_id: row for row in aggregate_hourly_stats(db_session, day + timedelta(hours=9, minutes=45))}
+
+    assert set(rows) == {first.id, second.id}
+    assert rows[first.id].hour == day + timedelta(hours=9)
+    assert (rows[first.id].total_messages, rows[first.id].outbound_messages) == (2, 2)
+    assert rows[second.id].total_messages == 1
+
+    quiet = {row.bot_id: row.total_messages for row in aggregate_hourly_stats(db_session, day + timedelta(hours=11))}
+    assert quiet == {first.id: 0, second.id: 0}
@@ -0,0 +1,40 @@
+"""
+Tests for the HyperLogLog sketches used by analytics.
+"""
+
+from src.analytics.hll import (
+    HLL_REGISTERS, build_sketch, estimate_cardinality, merge_sketches, new_sketch
+)
+
+
+def test_empty_sketch_estimates_zero():
+    """Test an empty sketch has every register at zero and estimates nothing."""
+    sketch = build_sketch([])
+    assert len(sketch) == HLL_REGISTERS
+    assert estimate_cardinality(sketch) == 0
+    assert estimate_cardinality(new_sketch()) == 0
+
+
+def test_small_cardinality_uses_linear_counting():
+    """Test small sets are counted closely and duplicates are ignored."""
+    phones = [f"+1555{index:07d}" for index in range(100)]
+    sketch = build_sketch(phones + phones[:50])
+    assert abs(estimate_cardinality(sketch) - 100) <= 3
+
+
+def test_large_cardinality_within_error():
+    """Test the estimate stays within a few standard errors for larger sets."""
+    sketch = build_sketch(f"+1555{index:07d}" for index in range(20000))
+    assert abs(estimate_cardinality(sketch) - 20000) <= 20000 * 0.07
+
+
+def test_merge_estimates_union():
+    """Test merged sketches estimate the union of overlapping sets."""
+    first = build_sketch(f"+1555{index:07d}" for index in range(0, 300))
+    second = build_sketch(f"+1555{index:07d}" for index in range(200, 500))
+
+    merged = merge_sketches([first, second, None])
+
+    assert abs(estimate_cardinality(merged) - 500) <= 25
+    assert merge_sketches([first]) == bytearray(first)
+    assert estimate_cardinality(merge_sketches([])) == 0
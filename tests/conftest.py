@@ -8,7 +8,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from main import app
-from src.shared.database import Base
+from src.auth.auth import get_current_active_user, get_current_active_user_sync
+from src.shared.database import Base, get_db, get_sync_session
+from src.shared.models.auth import Organization, Role, User
 
 # Test database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -34,3 +36,32 @@ def db_session():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def current_user(db_session):
+    """Create an active member in an organization and serve every request as them from the test database."""
+    role = Role(name="member", description="Member", permissions=[])
+    db_session.add(role)
+    db_session.flush()
+    user = User(email="owner@example.com", username="owner", hashed_password="not-used", current_role_id=role.id)
+    db_session.add(user)
+    db_session.flush()
+    organization = Organization(name="Test Organization", owner_id=user.id)
+    db_session.add(organization)
+    db_session.flush()
+    user.organization_id = organization.id
+    db_session.commit()
+    db_session.refresh(user)
+    
+    def override_sync_session():
+        yield db_session
+    
+    app.dependency_overrides[get_current_active_user] = lambda: user
+    app.dependency_overrides[get_current_active_user_sync] = lambda: user
+    app.dependency_overrides[get_sync_session] = override_sync_session
+    app.dependency_overrides[get_db] = override_sync_session
+    try:
+        yield user
+    finally:
+        app.dependency_overrides.clear()
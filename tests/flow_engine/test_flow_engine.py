@@ -0,0 +1,99 @@
+"""
+Tests for flow engine module.
+"""
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.flow_engine.engine import FlowEngine
+from src.shared.models.bot_builder import Bot, BotFlow, Contact, FlowExecution
+
+
+class FakePubSub:
+    """Async pub/sub stand-in that finishes the execution once it is listened to."""
+
+    def __init__(self, on_listen):
+        self.subscribe = AsyncMock()
+        self.on_listen = on_listen
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def listen(self):
+        yield {"type": "subscribe", "data": 1}
+        self.on_listen()
+        yield {"type": "message", "data": json.dumps({"event": "completed"})}
+
+
+@pytest.fixture
+def bot_flow(db_session, current_user):
+    """Create a bot owned by the current user with one flow."""
+    bot = Bot(name="Flow Bot", description="Test bot", created_by_id=current_user.id)
+    db_session.add(bot)
+    db_session.flush()
+    flow = BotFlow(name="Flow", bot_id=bot.id, structure=[])
+    db_session.add(flow)
+    db_session.commit()
+    return flow
+
+
+def add_execution(db_session, flow, phone: str, status: str) -> FlowExecution:
+    """Create a contact with an execution of the flow in the given status."""
+    contact = Contact(phone_number=phone, meta_data={})
+    db_session.add(contact)
+    db_session.flush()
+    execution = FlowExecution(flow_id=flow.id, bot_id=flow.bot_id, contact_id=contact.id, status=status, state={})
+    db_session.add(execution)
+    db_session.commit()
+    return execution
+
+
+def test_execute_sync_rejects_active_execution(client: TestClient, db_session, bot_flow):
+    """Test execute-sync returns 409 instead of answering a contact's running execution."""
+    execution = add_execution(db_session, bot_flow, "+15550000001", "waiting")
+
+    with patch.object(FlowEngine, "handle_user_input", AsyncMock()) as handle_user_input:
+        response = client.post("/flows/execute-sync", json={
+            "flow_id": bot_flow.id,
+            "bot_id": bot_flow.bot_id,
+            "contact_phone": "+15550000001",
+            "blocking_input": {"message": "yes"}
+        })
+
+    assert response.status_code == 409
+    assert str(execution.id) in response.json()["detail"]
+    handle_user_input.assert_not_called()
+    assert db_session.query(FlowExecution).count() == 1
+
+
+def test_execute_sync_waits_for_completed_event(client: TestClient, db_session, bot_flow):
+    """Test execute-sync waits on the execution's events channel and returns the final status."""
+    execution = add_execution(db_session, bot_flow, "+15550000002", "running")
+    execution_id = execution.id
+
+    def complete_execution():
+        db_session.query(FlowExecution).filter(FlowExecution.id == execution_id).update({"status": "completed"})
+        db_session.commit()
+
+    pubsub = FakePubSub(complete_execution)
+    redis_client = MagicMock()
+    redis_client.pubsub.return_value = pubsub
+
+    with patch.object(FlowEngine, "start_flow", AsyncMock(return_value=execution)), \
+            patch("src.flow_engine.router.get_async_redis_client", return_value=redis_client):
+        response = client.post("/flows/execute-sync", json={
+            "flow_id": bot_flow.id,
+            "bot_id": bot_flow.bot_id,
+            "contact_phone": "+15550000003",
+            "timeout_ms": 30000
+        })
+
+    assert response.status_code == 200
+    assert response.json()["execution_id"] == execution_id
+    assert response.json()["final_status"] == "completed"
+    pubsub.subscribe.assert_awaited_once_with(f"flow:execution:{execution_id}:events")
@@ -0,0 +1,222 @@
+"""
+Tests for notifications module.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.auth.auth import create_access_token
+from src.notifications import router as notifications_router
+from src.shared.models.bot_builder import Notification
+
+
+@pytest.fixture(autouse=True)
+def no_count_updates():
+    """Skip the Redis unread count publishes made after each change."""
+    with patch("src.notifications.service.NotificationService.publish_count_update") as mock_publish:
+        yield mock_publish
+
+
+def add_notifications(db_session, user, count: int):
+    """Create unread notifications for a user, oldest first."""
+    notifications = [
+        Notification(
+            user_id=user.id,
+            organization_id=user.organization_id,
+            type="system",
+            title=f"Notification {index}",
+            message="Test notification"
+        )
+        for index in range(count)
+    ]
+    db_session.add_all(notifications)
+    db_session.commit()
+    return [notification.id for notification in notifications]
+
+
+def test_batch_get_requests(client: TestClient, db_session, current_user):
+    """Test batched GET requests are answered in request order."""
+    add_notifications(db_session, current_user, 3)
+
+    response = client.post("/notifications/batch", json={
+        "batch_request_id": "batch-1",
+        "rest_requests": [
+            {"id": "count", "method": "GET", "url": "/notifications/count"},
+            {"id": "page", "method": "GET", "url": "/notifications/?limit=2"}
+        ]
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["batch_request_id"] == "batch-1"
+    count, page = data["serviced_requests"]
+    assert count["id"] == "count"
+    assert count["status_code"] == 200
+    assert count["body"]["unread"] == 3
+    assert page["status_code"] == 200
+    assert len(page["body"]) == 2
+
+
+def test_batch_post_test_notification(client: TestClient, db_session, current_user):
+    """Test a batched POST /test creates the notification."""
+    response = client.post("/notifications/batch", json={
+        "rest_requests": [{
+            "id": "test",
+            "method": "POST",
+            "url": "/notifications/test",
+            "body": {"title": "Batched", "message": "Created in a batch"}
+        }]
+    })
+
+    assert response.status_code == 200
+    result = response.json()["serviced_requests"][0]
+    assert result["status_code"] == 200
+    notification = db_session.get(Notification, result["body"]["notification_id"])
+    assert notification.title == "Batched"
+    assert notification.user_id == current_user.id
+
+
+def test_batch_put_read(client: TestClient, db_session, current_user):
+    """Test a batched PUT /read marks the notifications as read."""
+    ids = add_notifications(db_session, current_user, 3)
+
+    response = client.post("/notifications/batch", json={
+        "rest_requests": [{"id": "read", "method": "PUT", "url": "/notifications/read", "body": {"ids": ids[:2]}}]
+    })
+
+    assert response.status_code == 200
+    result = response.json()["serviced_requests"][0]
+    assert result["status_code"] == 200
+    assert result["body"]["updated_count"] == 2
+
+
+def test_batch_unknown_path(client: TestClient, current_user):
+    """Test a batched request to an unsupported path returns 404 for that item only."""
+    response = client.post("/notifications/batch", json={
+        "rest_requests": [
+            {"id": "unknown", "method": "GET", "url": "/notifications/unknown"},
+            {"id": "other", "method": "GET", "url": "/bots/"},
+            {"id": "count", "method": "GET", "url": "/notifications/count"}
+        ]
+    })
+
+    assert response.status_code == 200
+    unknown, other, count = response.json()["serviced_requests"]
+    assert unknown["status_code"] == 404
+    assert other["status_code"] == 404
+    assert count["status_code"] == 200
+
+
+def test_batch_bad_int(client: TestClient, current_user):
+    """Test a batched request with a non-integer query parameter returns 400."""
+    response = client.post("/notifications/batch", json={
+        "rest_requests": [
+            {"id": "limit", "method": "GET", "url": "/notifications/?limit=abc"},
+            {"id": "since", "method": "GET", "url": "/notifications/unread?since_id=abc"}
+        ]
+    })
+
+    assert response.status_code == 200
+    assert [item["status_code"] for item in response.json()["serviced_requests"]] == [400, 400]
+
+
+def test_unread_long_poll_returns_204_when_nothing_arrives(client: TestClient, db_session, current_user, monkeypatch):
+    """Test the unread long poll returns 204 once wait expires with nothing newer than since_id."""
+    monkeypatch.setattr(notifications_router, "LONG_POLL_INTERVAL", 0.05)
+    ids = add_notifications(db_session, current_user, 2)
+
+    response = client.get("/notifications/unread", params={"wait": 1, "since_id": ids[-1]})
+
+    assert response.status_code == 204
+
+
+def test_unread_since_id(client: TestClient, db_session, current_user):
+    """Test since_id only returns newer unread notifications, without waiting when some exist."""
+    ids = add_notifications(db_session, current_user, 3)
+
+    response = client.get("/notifications/unread", params={"wait": 1, "since_id": ids[0]})
+
+    assert response.status_code == 200
+    assert sorted(notification["id"] for notification in response.json()) == ids[1:]
+
+
+def test_mark_several_read(client: TestClient, db_session, current_user, no_count_updates):
+    """Test PUT /notifications/read marks only the given notifications."""
+    ids = add_notifications(db_session, current_user, 3)
+
+    response = client.put("/notifications/read", json={"ids": ids[:2]})
+
+    assert response.status_code == 200
+    assert response.json()["updated_count"] == 2
+    no_count_updates.assert_called_once_with(current_user.id, "bulk_read")
+
+    unread = client.get("/notifications/unread").json()
+    assert [notification["id"] for notification in unread] == [ids[2]]
+
+
+def test_mark_several_read_requires_ids(client: TestClient, current_user):
+    """Test PUT /notifications/read rejects an empty id list."""
+    response = client.put("/notifications/read", json={"ids": []})
+    assert response.status_code == 422
+
+
+def test_cursor_paging(client: TestClient, db_session, current_user):
+    """Test cursor paging walks every notification once, newest first."""
+    ids = add_notifications(db_session, current_user, 5)
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        page = client.get("/notifications/", params=params).json()
+        seen.extend(notification["id"] for notification in page)
+        if len(page) < 2:
+            break
+        params = {"limit": 2, "cursor": page[-1]["id"]}
+
+    assert seen == sorted(ids, reverse=True)
+
+
+@pytest.mark.parametrize("url", ["/notifications/preferences", "/notifications/summary"])
+def test_etag_not_modified(client: TestClient, db_session, current_user, url):
+    """Test conditional GETs return 304 for a matching ETag and 200 after a change."""
+    add_notifications(db_session, current_user, 1)
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert not second.content
+
+    stale = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_websocket_mark_read_requires_notification_id(client: TestClient, current_user):
+    """Test mark_read without notification_id gets an error reply carrying the req_id."""
+    token = create_access_token({"sub": current_user.email})
+    with client.websocket_connect(f"/ws?token={token}") as websocket:
+        assert websocket.receive_json()["type"] == "connected"
+        websocket.send_json({"type": "mark_read", "req_id": "r1"})
+        reply = websocket.receive_json()
+
+    assert reply["type"] == "error"
+    assert reply["req_id"] == "r1"
+
+
+def test_websocket_error_echoes_req_id(client: TestClient, current_user):
+    """Test a failing message gets the internal error reply with its req_id."""
+    token = create_access_token({"sub": current_user.email})
+    with patch("src.notifications.websocket_router.get_unread_count", side_effect=RuntimeError("boom")):
+        with client.websocket_connect(f"/ws?token={token}") as websocket:
+            assert websocket.receive_json()["type"] == "connected"
+            websocket.send_json({"type": "get_unread_count", "req_id": "r2"})
+            reply = websocket.receive_json()
+
+    assert reply["type"] == "error"
+    assert reply["data"]["message"] == "Internal server error"
+    assert reply["req_id"] == "r2"
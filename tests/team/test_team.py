@@ -0,0 +1,71 @@
+"""
+Tests for team management module.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.shared.models.auth import Role
+
+
+@pytest.fixture
+def user_without_organization(db_session, current_user):
+    """The current user, taken out of their organization, with an admin role available."""
+    db_session.add(Role(name="admin", description="Administrator", permissions=[]))
+    current_user.organization_id = None
+    db_session.commit()
+    return current_user
+
+
+def test_create_organization_with_members(client: TestClient, user_without_organization):
+    """Test creating an organization returns it together with the owner as admin member."""
+    response = client.post("/team/organizations/with-members", json={
+        "name": "New Organization",
+        "description": "Created with members"
+    })
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["organization"]["name"] == "New Organization"
+    assert data["organization"]["owner_id"] == user_without_organization.id
+    assert [(member["user_id"], member["role_name"]) for member in data["members"]] == [
+        (user_without_organization.id, "admin")
+    ]
+    assert user_without_organization.organization_id == data["organization"]["id"]
+
+
+@pytest.mark.parametrize("url", ["/team/organizations", "/team/organizations/with-members"])
+def test_create_organization_rejects_member_of_organization(client: TestClient, current_user, url):
+    """Test both create paths return 400 when the user already belongs to an organization."""
+    response = client.post(url, json={"name": "Second Organization"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User already belongs to an organization"
+
+
+@pytest.mark.parametrize("url", ["/team/organizations", "/team/organizations/with-members"])
+def test_create_organization_rejects_duplicate_name(client: TestClient, user_without_organization, url):
+    """Test both create paths return 400 for a name that is already taken."""
+    response = client.post(url, json={"name": "Test Organization"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Organization name already exists"
+
+
+def test_check_permissions_batch(client: TestClient, current_user):
+    """Test several permissions are checked in one request."""
+    response = client.post("/team/permissions/check-batch", json={"permissions": ["bot:read", "bot:delete"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["results"] == {"bot:read": True, "bot:delete": True}
+    assert data["user_role"] == "member"
+    assert data["organization_id"] == current_user.organization_id
+
+
+def test_check_permissions_batch_rejects_unknown_permission(client: TestClient, current_user):
+    """Test an unknown permission name fails the whole batch with 400."""
+    response = client.post("/team/permissions/check-batch", json={"permissions": ["bot:read", "bot:fly"]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid permissions: bot:fly"